@@ -0,0 +1,31 @@
+"""add_tts_input_hash_to_segments
+
+Revision ID: 3c9e1f7a2b40
+Revises: a576da28b9f9
+Create Date: 2026-10-17 09:12:41.118230
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9e1f7a2b40"
+down_revision: Union[str, Sequence[str], None] = "a576da28b9f9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("segments", sa.Column("tts_input_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("segments") as batch_op:
+        batch_op.drop_column("tts_input_hash")
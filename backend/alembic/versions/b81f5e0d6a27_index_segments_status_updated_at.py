@@ -0,0 +1,30 @@
+"""index_segments_status_updated_at
+
+Revision ID: b81f5e0d6a27
+Revises: 7d2a4c8e9f13
+Create Date: 2026-10-17 13:40:12.874301
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b81f5e0d6a27"
+down_revision: Union[str, Sequence[str], None] = "7d2a4c8e9f13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_segments_status_updated_at", "segments", ["status", "updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_segments_status_updated_at", table_name="segments")
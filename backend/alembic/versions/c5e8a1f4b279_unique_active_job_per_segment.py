@@ -0,0 +1,54 @@
+"""unique_active_job_per_segment
+
+Revision ID: c5e8a1f4b279
+Revises: e4a7c2d9b315
+Create Date: 2026-10-17 18:24:51.390762
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8a1f4b279"
+down_revision: Union[str, Sequence[str], None] = "e4a7c2d9b315"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('QUEUED', 'RUNNING')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the oldest of duplicate active jobs, so the unique index can be built
+    op.execute(
+        f"""
+        UPDATE jobs SET status = 'FAILED', locked_until = NULL,
+            error_message = 'Duplicate of an earlier job for the same segment'
+        WHERE {ACTIVE} AND EXISTS (
+            SELECT 1 FROM jobs AS earlier
+            WHERE earlier.segment_id = jobs.segment_id
+                AND earlier.kind = jobs.kind
+                AND earlier.{ACTIVE}
+                AND (earlier.created_at < jobs.created_at
+                    OR (earlier.created_at = jobs.created_at AND earlier.id < jobs.id))
+        )
+        """
+    )
+    op.create_index(
+        "uq_jobs_active_segment_kind",
+        "jobs",
+        ["segment_id", "kind"],
+        unique=True,
+        sqlite_where=sa.text(ACTIVE),
+        postgresql_where=sa.text(ACTIVE),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_jobs_active_segment_kind", table_name="jobs")
@@ -13,6 +13,23 @@ class Settings(BaseSettings):
 
     # OpenAI
     openai_api_key: str = ""
+    # Clients are reused per API key; idle ones are closed after the timeout
+    openai_max_clients: int = 32
+    openai_client_idle_timeout: float = 600.0
+    # Requests per API key wait for the budget reported in OpenAI's rate-limit
+    # headers. Throttled and failed ones are retried with jittered backoff, and
+    # concurrency halves on throttling, then grows back by one per round
+    openai_max_retries: int = 4
+    openai_retry_base_delay: float = 0.5
+    openai_retry_max_delay: float = 30.0
+    openai_max_concurrency: int = 16
+    # Concurrent OpenAI requests when analyzing a whole project
+    analysis_concurrency: int = 8
+    # Concurrent TTS requests when generating a whole project, per provider
+    # (per server for ChatterBox). ChatterBox synthesizes on its GPU, so match
+    # the GPUs each server runs on.
+    openai_tts_concurrency: int = 8
+    chatterbox_tts_concurrency: int = 1
 
     # Firebase
     firebase_project_id: str = ""
@@ -20,13 +37,78 @@ class Settings(BaseSettings):
 
     # ChatterBox TTS
     chatterbox_base_url: str = "http://localhost:8004"
+    # Several servers, as a JSON list, replace the base URL. Requests go to the
+    # one with the fewest in flight, preferring servers that already hold a
+    # custom voice. After failure_threshold consecutive failures a server is
+    # skipped for breaker_cooldown seconds, then tried again with one request.
+    chatterbox_urls: list[str] = []
+    chatterbox_failure_threshold: int = 3
+    chatterbox_breaker_cooldown: float = 30.0
+    # Pooled HTTP client shared by all ChatterBox requests
+    chatterbox_timeout: float = 120.0
+    chatterbox_connect_timeout: float = 5.0
+    chatterbox_max_connections: int = 10
+    chatterbox_max_keepalive_connections: int = 10
+    chatterbox_keepalive_expiry: float = 60.0
+    # Requires the h2 package (pip install "httpx[http2]")
+    chatterbox_http2: bool = False
+    # Seconds between background health probes
+    chatterbox_health_interval: float = 15.0
+
+    # Background jobs (?async=true on extract, analyze and generate-tts)
+    job_workers: int = 2
+    job_max_attempts: int = 3
+    # Retries wait base * 2^(attempt - 1) seconds, up to the max
+    job_retry_base_delay: float = 5.0
+    job_retry_max_delay: float = 300.0
+    # A running job is picked up again when its lease runs out (its worker died);
+    # the lease is renewed every third of it while the job runs
+    job_lease_seconds: float = 900.0
+    job_poll_interval: float = 1.0
+    # Segments left extracting/analyzing/generating by an interrupted request are
+    # resolved at startup and by a sweep every interval, once unchanged for
+    # stale_after seconds (longer than any request, project batches included)
+    segment_stale_after: float = 3600.0
+    segment_sweep_interval: float = 300.0
+    # Analysis results are reused for identical audio and prompts; the least
+    # recently used ones are dropped beyond this size
+    analysis_cache_max_mb: int = 20
+    # GET /projects/{id}/events: recent changes kept per project for clients
+    # resuming with Last-Event-ID, and seconds between keep-alive comments
+    segment_event_history: int = 256
+    segment_event_heartbeat: float = 15.0
 
     # Paths
     projects_dir: Path = Path("./projects")
     voices_dir: Path = Path("./voices")
+    # Derived files that can be rebuilt at any time (export archives, ...)
+    cache_dir: Path = Path("./cache")
+    export_cache_max_mb: int = 1024
+    # Synthesized segment audio, reused when a segment is rendered again with
+    # the same text, voice and parameters
+    tts_cache_max_mb: int = 2048
+    audio_cache_max_mb: int = 2048
+
+    # FFmpeg process pool
+    ffmpeg_max_concurrency: int = 4
+    # Extractions fed by a video upload, which wait on the network and so have
+    # their own limit instead of taking slots of the pool above
+    ffmpeg_stream_max_concurrency: int = 4
+    # Wall-clock limits per process, in seconds
+    ffmpeg_extract_timeout: float = 3600.0
+    ffmpeg_segment_timeout: float = 300.0
+    ffprobe_timeout: float = 30.0
+    # Time a process gets to exit after SIGTERM before it is killed
+    ffmpeg_kill_grace_period: float = 5.0
 
     # Upload limits
     max_upload_size_mb: int = 2000
+    # Chunk size of resumable uploads
+    upload_chunk_size_mb: int = 8
+    # Open resumable uploads per project (a new one replaces the least recently
+    # active), and hours without a chunk after which an upload is removed
+    upload_max_sessions_per_project: int = 2
+    upload_session_ttl_hours: float = 24.0
     allowed_video_extensions: list[str] = [".mp4", ".mov", ".avi", ".mkv", ".webm"]
 
     # CORS
@@ -42,6 +124,14 @@ class Settings(BaseSettings):
     def max_upload_size_bytes(self) -> int:
         return self.max_upload_size_mb * 1024 * 1024
 
+    @property
+    def upload_chunk_size_bytes(self) -> int:
+        return self.upload_chunk_size_mb * 1024 * 1024
+
+    @property
+    def chatterbox_backend_urls(self) -> list[str]:
+        return self.chatterbox_urls or [self.chatterbox_base_url]
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Annotated, cast
+
+from fastapi import Depends, Request
+
+from app.config import Settings, get_settings
+from app.services.chatterbox_health import ChatterBoxHealthMonitor
+from app.services.chatterbox_pool import ChatterBoxBackends, ChatterBoxPool
+from app.services.openai_client_registry import OpenAIClientRegistry
+
+
+def get_chatterbox_backends(request: Request) -> ChatterBoxBackends:
+    """Application-wide state of the ChatterBox servers, created in ``main.lifespan``."""
+    return cast(ChatterBoxBackends, request.app.state.chatterbox_backends)
+
+
+def get_chatterbox_pool(
+    backends: Annotated[ChatterBoxBackends, Depends(get_chatterbox_backends)],
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> ChatterBoxPool:
+    return backends.pool(settings.chatterbox_backend_urls)
+
+
+def get_chatterbox_health(request: Request) -> ChatterBoxHealthMonitor:
+    """Background ChatterBox health monitor, started in ``main.lifespan``."""
+    return cast(ChatterBoxHealthMonitor, request.app.state.chatterbox_health)
+
+
+def get_openai_clients(request: Request) -> OpenAIClientRegistry:
+    """Application-wide OpenAI client registry, created in ``main.lifespan``."""
+    return cast(OpenAIClientRegistry, request.app.state.openai_clients)
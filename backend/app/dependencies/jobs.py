@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from typing import cast
+
+from fastapi import Request
+
+from app.services.job_queue import JobQueue
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Application-wide background job queue, started in ``main.lifespan``."""
+    return cast(JobQueue, request.app.state.job_queue)
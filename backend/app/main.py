@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
@@ -6,10 +7,20 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.database import create_tables
+from app.database import async_session_maker, create_tables
 from app.middleware.auth import FirebaseAuthMiddleware, init_firebase
-from app.routers import files, projects, segments, voices
+from app.routers import files, jobs, metrics, projects, segments, voices
 from app.routers import settings as settings_router
+from app.services.chatterbox_health import ChatterBoxHealthMonitor
+from app.services.chatterbox_pool import ChatterBoxBackends
+from app.services.chatterbox_service import create_chatterbox_client
+from app.services.file_service import FileService
+from app.services.job_queue import create_job_queue
+from app.services.openai_client_registry import OpenAIClientRegistry
+from app.services.openai_rate_limiter import RateLimitPolicy
+from app.services.segment_jobs import SegmentJobHandlers
+from app.services.segment_reconciler import SegmentReconciler
+from app.services.upload_service import UploadService
 
 # Configure logging
 logging.basicConfig(
@@ -23,9 +34,58 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     settings = get_settings()
     settings.projects_dir.mkdir(parents=True, exist_ok=True)
     settings.voices_dir.mkdir(parents=True, exist_ok=True)
+    settings.cache_dir.mkdir(parents=True, exist_ok=True)
+    # Uploads abandoned while the server was down
+    await asyncio.to_thread(UploadService(settings, FileService(settings)).sweep_stale)
     init_firebase()
     await create_tables()
-    yield
+    app.state.chatterbox_client = create_chatterbox_client(settings)
+    app.state.chatterbox_backends = ChatterBoxBackends(
+        app.state.chatterbox_client,
+        settings.chatterbox_failure_threshold,
+        settings.chatterbox_breaker_cooldown,
+    )
+    app.state.openai_clients = OpenAIClientRegistry(
+        settings.openai_max_clients,
+        settings.openai_client_idle_timeout,
+        rate_limits=RateLimitPolicy.from_settings(settings),
+    )
+    app.state.chatterbox_health = ChatterBoxHealthMonitor(
+        app.state.chatterbox_backends.pool(settings.chatterbox_backend_urls),
+        settings.chatterbox_health_interval,
+    )
+    app.state.chatterbox_health.start()
+    app.state.job_queue = create_job_queue(
+        async_session_maker,
+        SegmentJobHandlers(
+            settings,
+            app.state.chatterbox_backends,
+            app.state.openai_clients,
+            app.state.chatterbox_health,
+        ).as_dict(),
+        settings,
+    )
+    app.state.segment_reconciler = SegmentReconciler(
+        async_session_maker,
+        app.state.job_queue,
+        settings,
+        stale_after=settings.segment_stale_after,
+        interval=settings.segment_sweep_interval,
+    )
+    # Segments left in progress by the previous process. Only stale ones: other
+    # workers, or the old process during a rolling restart, may still own the rest
+    await app.state.segment_reconciler.reconcile()
+    app.state.job_queue.start()
+    app.state.segment_reconciler.start()
+    try:
+        yield
+    finally:
+        await app.state.segment_reconciler.stop()
+        # Jobs in progress go back to the queue, to be resumed on the next start
+        await app.state.job_queue.stop()
+        await app.state.chatterbox_health.stop()
+        await app.state.chatterbox_client.aclose()
+        await app.state.openai_clients.close()
 
 
 def create_app() -> FastAPI:
@@ -53,6 +113,8 @@ def create_app() -> FastAPI:
     app.include_router(files.router, prefix="/api")
     app.include_router(settings_router.router, prefix="/api")
     app.include_router(voices.router, prefix="/api")
+    app.include_router(metrics.router, prefix="/api")
+    app.include_router(jobs.router, prefix="/api")
 
     return app
 
@@ -1,6 +1,19 @@
+from app.models.analysis_cache import AnalysisCacheEntry
 from app.models.app_settings import AppSettings, UserSettings
 from app.models.custom_voice import CustomVoice
+from app.models.job import Job, JobKind, JobStatus
 from app.models.project import Project
 from app.models.segment import Segment, SegmentStatus
 
-__all__ = ["AppSettings", "UserSettings", "CustomVoice", "Project", "Segment", "SegmentStatus"]
+__all__ = [
+    "AnalysisCacheEntry",
+    "AppSettings",
+    "UserSettings",
+    "CustomVoice",
+    "Job",
+    "JobKind",
+    "JobStatus",
+    "Project",
+    "Segment",
+    "SegmentStatus",
+]
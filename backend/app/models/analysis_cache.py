@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class AnalysisCacheEntry(Base):
+    """An OpenAI audio analysis, keyed by the audio and everything sent with it."""
+
+    __tablename__ = "analysis_cache"
+    __table_args__ = (Index("ix_analysis_cache_last_used_at", "last_used_at"),)
+
+    # Hash of the audio bytes, system and user prompt, model and mode
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    mode: Mapped[str] = mapped_column(String(20), nullable=False)  # "standard" or "chatterbox"
+    result: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    # Size of the serialized result, counted against analysis_cache_max_mb
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import enum
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import JSON, DateTime, Enum, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.base import TimestampMixin, UUIDMixin
+from app.models.segment import SegmentStatus
+
+
+class JobKind(str, enum.Enum):
+    EXTRACT = "extract"
+    ANALYZE = "analyze"
+    GENERATE_TTS = "generate_tts"
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+# Segment status while a job is queued, running or waiting for a retry
+JOB_SEGMENT_STATUS = {
+    JobKind.EXTRACT: SegmentStatus.EXTRACTING,
+    JobKind.ANALYZE: SegmentStatus.ANALYZING,
+    JobKind.GENERATE_TTS: SegmentStatus.GENERATING_TTS,
+}
+
+
+# Statuses of a job that has not finished, as stored (enum names)
+ACTIVE_JOB_CONDITION = "status IN ('QUEUED', 'RUNNING')"
+
+
+class Job(Base, UUIDMixin, TimestampMixin):
+    """Segment work run by the background workers (see ``JobQueue``)."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_user_id", "user_id"),
+        # At most one queued or running job of each kind per segment
+        Index(
+            "uq_jobs_active_segment_kind",
+            "segment_id",
+            "kind",
+            unique=True,
+            sqlite_where=text(ACTIVE_JOB_CONDITION),
+            postgresql_where=text(ACTIVE_JOB_CONDITION),
+        ),
+    )
+
+    kind: Mapped[JobKind] = mapped_column(Enum(JobKind), nullable=False)
+    user_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    segment_id: Mapped[str] = mapped_column(
+        ForeignKey("segments.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Request options, e.g. the TTSRequest of a generate_tts job
+    payload: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus),
+        default=JobStatus.QUEUED,
+        nullable=False,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Not picked up before this time (UTC); pushed back by retries
+    run_after: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # A running job whose lease has expired is picked up again
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import enum
 from typing import TYPE_CHECKING, Any, Optional
 
-from sqlalchemy import JSON, Enum, Float, ForeignKey, String, Text
+from sqlalchemy import JSON, Enum, Float, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -26,6 +26,8 @@ class SegmentStatus(str, enum.Enum):
 
 class Segment(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "segments"
+    # Finds segments left in a transient status (see SegmentReconciler)
+    __table_args__ = (Index("ix_segments_status_updated_at", "status", "updated_at"),)
 
     project_id: Mapped[str] = mapped_column(
         ForeignKey("projects.id", ondelete="CASCADE"),
@@ -39,6 +41,8 @@ class Segment(Base, UUIDMixin, TimestampMixin):
     analysis_json: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
     tts_voice: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     tts_result_file: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    # Fingerprint of the text, voice and parameters tts_result_file was made from
+    tts_input_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     status: Mapped[SegmentStatus] = mapped_column(
         Enum(SegmentStatus),
         default=SegmentStatus.CREATED,
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import AnalysisCacheEntry
+
+
+class AnalysisCacheRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Cached analysis for ``key``, marked as recently used."""
+        entry = await self.session.get(AnalysisCacheEntry, key)
+        if entry is None:
+            return None
+        result = entry.result
+        entry.last_used_at = func.now()
+        await self.session.flush()
+        return result
+
+    async def put(self, key: str, model: str, mode: str, result: dict[str, Any]) -> None:
+        await self.session.merge(
+            AnalysisCacheEntry(
+                key=key,
+                model=model,
+                mode=mode,
+                result=result,
+                size=len(json.dumps(result)),
+                last_used_at=func.now(),
+            )
+        )
+        await self.session.flush()
+
+    async def evict(self, max_bytes: int) -> int:
+        """Remove least recently used entries until all fit ``max_bytes``.
+
+        Returns:
+            Number of entries removed
+        """
+        total: int = (
+            await self.session.scalar(select(func.coalesce(func.sum(AnalysisCacheEntry.size), 0)))
+            or 0
+        )
+        if total <= max_bytes:
+            return 0
+
+        result = await self.session.execute(
+            select(AnalysisCacheEntry.key, AnalysisCacheEntry.size).order_by(
+                AnalysisCacheEntry.last_used_at, AnalysisCacheEntry.created_at
+            )
+        )
+        evicted = []
+        for key, size in result.all():
+            if total <= max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+        await self.session.execute(
+            delete(AnalysisCacheEntry).where(AnalysisCacheEntry.key.in_(evicted))
+        )
+        return len(evicted)
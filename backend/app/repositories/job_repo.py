@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Optional, cast
+
+from sqlalchemy import CursorResult, and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Job, JobKind, JobStatus
+
+
+class JobRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(
+        self,
+        kind: JobKind,
+        user_id: str,
+        segment_id: str,
+        max_attempts: int,
+        run_after: datetime,
+        payload: Optional[dict[str, Any]] = None,
+    ) -> Job:
+        job = Job(
+            kind=kind,
+            user_id=user_id,
+            segment_id=segment_id,
+            payload=payload,
+            status=JobStatus.QUEUED,
+            attempts=0,
+            max_attempts=max_attempts,
+            run_after=run_after,
+        )
+        self.session.add(job)
+        await self.session.flush()
+        return job
+
+    async def get_by_id(self, job_id: str, user_id: Optional[str] = None) -> Optional[Job]:
+        query = select(Job).where(Job.id == job_id)
+        if user_id is not None:
+            query = query.where(Job.user_id == user_id)
+        result = await self.session.execute(query.execution_options(populate_existing=True))
+        return result.scalar_one_or_none()
+
+    async def get_active(self, segment_id: str, kind: JobKind) -> Optional[Job]:
+        """The queued or running job of ``kind`` for a segment, if any."""
+        result = await self.session.execute(
+            select(Job).where(
+                Job.segment_id == segment_id,
+                Job.kind == kind,
+                Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def claim_next(self, now: datetime, lease: timedelta) -> Optional[Job]:
+        """Mark the next due job as running and return it, or None if there is none.
+
+        Queued jobs are due at ``run_after``; running jobs whose lease ran
+        out (their worker died) are due again. The conditional update makes
+        sure a job is claimed by a single worker, even across processes.
+        """
+        due = or_(
+            and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+            and_(Job.status == JobStatus.RUNNING, Job.locked_until < now),
+        )
+        result = await self.session.execute(
+            select(Job.id).where(due).order_by(Job.run_after).limit(10)
+        )
+        for job_id in result.scalars().all():
+            claimed = cast(
+                "CursorResult[Any]",
+                await self.session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, due)
+                    .values(
+                        status=JobStatus.RUNNING,
+                        attempts=Job.attempts + 1,
+                        locked_until=now + lease,
+                    )
+                ),
+            )
+            if claimed.rowcount == 1:
+                return await self.get_by_id(job_id)
+        return None
+
+    async def renew(self, job_id: str, locked_until: datetime) -> bool:
+        """Extend the lease of a running job; False if it is no longer running."""
+        renewed = cast(
+            "CursorResult[Any]",
+            await self.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+                .values(locked_until=locked_until)
+            ),
+        )
+        return renewed.rowcount == 1
+
+    async def update(self, job: Job, **kwargs: Any) -> Job:
+        for key, value in kwargs.items():
+            setattr(job, key, value)
+        await self.session.flush()
+        await self.session.refresh(job)
+        return job
+
+    async def commit(self) -> None:
+        """Explicitly commit the current transaction."""
+        await self.session.commit()
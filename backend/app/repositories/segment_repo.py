@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from typing import Optional
+from datetime import datetime
+from typing import Any, Optional
 
-from sqlalchemy import select
+from sqlalchemy import event, exists, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import LoaderCallableStatus, Session
 
-from app.models import Segment
+from app.models import Job, JobStatus, Project, Segment
 from app.models.segment import SegmentStatus
+from app.services.segment_events import SegmentEvent, get_segment_events
+
+# Key of the events waiting for the current transaction to commit, in Session.info
+PENDING_EVENTS = "segment_events"
 
 
 class SegmentRepository:
@@ -27,6 +33,11 @@ class SegmentRepository:
         )
         self.session.add(segment)
         await self.session.flush()
+        self._record(
+            segment,
+            "created",
+            {"start_time": start_time, "end_time": end_time, "status": segment.status},
+        )
         return segment
 
     async def get_by_id(self, segment_id: str) -> Optional[Segment]:
@@ -39,16 +50,110 @@ class SegmentRepository:
         )
         return list(result.scalars().all())
 
+    async def list_stale(
+        self, statuses: list[SegmentStatus], updated_before: datetime
+    ) -> list[tuple[Segment, str]]:
+        """Segments in one of ``statuses`` since before ``updated_before``, with their owner.
+
+        Segments with a queued or running job are left out; the job queue
+        takes care of them. Uses the (status, updated_at) index.
+        """
+        active_job = exists().where(
+            Job.segment_id == Segment.id,
+            Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+        )
+        result = await self.session.execute(
+            select(Segment, Project.user_id)
+            .join(Project, Segment.project_id == Project.id)
+            .where(
+                Segment.status.in_(statuses),
+                Segment.updated_at < updated_before,
+                ~active_job,
+            )
+            .order_by(Segment.updated_at)
+        )
+        return [(segment, user_id) for segment, user_id in result.all()]
+
     async def delete(self, segment: Segment) -> None:
         await self.session.delete(segment)
+        self._record(segment, "deleted", {})
 
     async def update(self, segment: Segment, **kwargs) -> Segment:
+        before = _loaded_values(segment, kwargs)
         for key, value in kwargs.items():
             setattr(segment, key, value)
         await self.session.flush()
         await self.session.refresh(segment)
+        self._record_changes(segment, before)
         return segment
 
+    async def update_many(self, changes: list[tuple[Segment, dict[str, Any]]]) -> list[Segment]:
+        """Apply per-segment changes with a single flush and a single reload query."""
+        if not changes:
+            return []
+        before = {segment.id: _loaded_values(segment, values) for segment, values in changes}
+        for segment, values in changes:
+            for key, value in values.items():
+                setattr(segment, key, value)
+        await self.session.flush()
+
+        ids = [segment.id for segment, _ in changes]
+        result = await self.session.execute(
+            select(Segment).where(Segment.id.in_(ids)).execution_options(populate_existing=True)
+        )
+        by_id = {segment.id: segment for segment in result.scalars().all()}
+        for segment_id, values in before.items():
+            self._record_changes(by_id[segment_id], values)
+        return [by_id[segment_id] for segment_id in ids]
+
     async def commit(self) -> None:
         """Explicitly commit the current transaction."""
         await self.session.commit()
+
+    def _record_changes(self, segment: Segment, before: dict[str, Any]) -> None:
+        changes = {
+            key: getattr(segment, key)
+            for key, value in before.items()
+            if value is LoaderCallableStatus.NO_VALUE or getattr(segment, key) != value
+        }
+        if changes:
+            changes["updated_at"] = segment.updated_at
+            self._record(segment, "updated", changes)
+
+    def _record(self, segment: Segment, type: str, changes: dict[str, Any]) -> None:
+        """Queue an event for project subscribers, sent once the transaction commits."""
+        info = self.session.info
+        if PENDING_EVENTS not in info:
+            info[PENDING_EVENTS] = []
+            sync_session = self.session.sync_session
+            event.listen(sync_session, "after_commit", _publish_pending)
+            event.listen(sync_session, "after_rollback", _discard_pending)
+        info[PENDING_EVENTS].append(
+            SegmentEvent(
+                type=type,
+                project_id=segment.project_id,
+                segment_id=segment.id,
+                changes=changes,
+            )
+        )
+
+
+def _loaded_values(segment: Segment, keys: dict[str, Any]) -> dict[str, Any]:
+    """Current values of ``keys``, without loading expired attributes (NO_VALUE)."""
+    attrs = inspect(segment).attrs
+    return {key: attrs[key].loaded_value for key in keys}
+
+
+def _publish_pending(session: Session) -> None:
+    pending = session.info.get(PENDING_EVENTS)
+    if pending:
+        hub = get_segment_events()
+        for segment_event in pending:
+            hub.publish(segment_event)
+        pending.clear()
+
+
+def _discard_pending(session: Session) -> None:
+    pending = session.info.get(PENDING_EVENTS)
+    if pending:
+        pending.clear()
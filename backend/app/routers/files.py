@@ -1,18 +1,30 @@
-import tempfile
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings, get_settings
 from app.database import get_async_session
 from app.dependencies.auth import CurrentUser, get_current_user
 from app.repositories.project_repo import ProjectRepository
+from app.schemas.waveform import WaveformPeaks
+from app.services.audio_delivery_service import DELIVERY_FORMATS, AudioDeliveryService
+from app.services.export_cache import ExportCache
+from app.services.ffmpeg_service import FFmpegService
 from app.services.file_service import FileService
 from app.services.project_service import ProjectService
-from app.utils.exceptions import ProcessingError
+from app.services.waveform_service import PEAK_LEVELS, WaveformService
+from app.utils.exceptions import FileValidationError, ProcessingError
+from app.utils.http_cache import (
+    CACHE_REVALIDATE,
+    etag_matches,
+    file_etag,
+    make_etag,
+    not_modified,
+)
+from app.utils.zip_stream import ZipStream
 
 router = APIRouter(prefix="/files", tags=["files"])
 
@@ -23,6 +35,22 @@ def get_file_service(
     return FileService(settings)
 
 
+def get_audio_delivery_service(
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> AudioDeliveryService:
+    return AudioDeliveryService(settings, FFmpegService(settings))
+
+
+def get_waveform_service() -> WaveformService:
+    return WaveformService()
+
+
+def get_export_cache(
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> ExportCache:
+    return ExportCache(settings)
+
+
 def get_project_service(
     session: Annotated[AsyncSession, Depends(get_async_session)],
 ) -> ProjectService:
@@ -30,22 +58,117 @@ def get_project_service(
     return ProjectService(repo)
 
 
-@router.get("/{project_id}/audio/{filename}")
-async def get_audio_file(
+async def serve_project_file(
+    request: Request,
     project_id: str,
+    subdir: str,
     filename: str,
-    file_service: Annotated[FileService, Depends(get_file_service)],
-    project_service: Annotated[ProjectService, Depends(get_project_service)],
-    current_user: Annotated[CurrentUser, Depends(get_current_user)],
-) -> FileResponse:
-    """Serve project audio file."""
+    media_type: str,
+    file_service: FileService,
+    project_service: ProjectService,
+    audio_delivery: AudioDeliveryService,
+    current_user: CurrentUser,
+    audio_format: Optional[str] = None,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """Serve a project file with a strong ETag, byte ranges and revalidation.
+
+    A request whose If-None-Match matches the file's current ETag is answered
+    with 304 before the ownership query; the ETag is bound to the user it was
+    issued to, so it can only match for someone who was already served the file.
+    ``If-None-Match: *`` proves nothing of the kind and is only honored after
+    the ownership check.
+
+    WAV files are delivered as Opus or MP3 when asked for through
+    ``audio_format`` or ``Accept``; other files are always served as stored.
+    """
+    file_path = file_service.resolve_file_path(project_id, subdir, filename)
+    delivery_format = "wav"
+    if file_path.suffix.lower() == ".wav":
+        delivery_format = audio_delivery.negotiate(audio_format, request.headers.get("accept"))
+
+    etag = file_etag(file_path, current_user.user_id)
+    if etag is not None and delivery_format != "wav":
+        etag = make_etag(etag, delivery_format)
+    if (response := not_modified(request, etag, CACHE_REVALIDATE)) is not None:
+        response.headers["Vary"] = "Accept"
+        return response
+
     # Verify user owns the project
     await project_service.get_by_id(project_id, current_user.user_id)
-    file_path = file_service.get_file_path(project_id, "audio", filename)
+    if etag is None:
+        raise FileValidationError(f"File not found: {filename}")
+    if (response := not_modified(request, etag, CACHE_REVALIDATE, allow_wildcard=True)) is not None:
+        response.headers["Vary"] = "Accept"
+        return response
+
+    if delivery_format != "wav":
+        file_path = await audio_delivery.get_variant(file_path, delivery_format)
+        extension, media_type = DELIVERY_FORMATS[delivery_format]
+        filename = f"{Path(filename).stem}{extension}"
+        if headers and "Content-Disposition" in headers:
+            headers = {**headers, "Content-Disposition": f'attachment; filename="{filename}"'}
+
     return FileResponse(
         path=file_path,
-        media_type="audio/wav",
+        media_type=media_type,
         filename=filename,
+        headers={
+            **(headers or {}),
+            "ETag": etag,
+            "Cache-Control": CACHE_REVALIDATE,
+            "Vary": "Accept",
+        },
+    )
+
+
+@router.get("/{project_id}/audio/{filename}")
+async def get_audio_file(
+    project_id: str,
+    filename: str,
+    request: Request,
+    file_service: Annotated[FileService, Depends(get_file_service)],
+    project_service: Annotated[ProjectService, Depends(get_project_service)],
+    audio_delivery: Annotated[AudioDeliveryService, Depends(get_audio_delivery_service)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    audio_format: Annotated[Optional[str], Query(alias="format")] = None,
+) -> Response:
+    """Serve project audio file, optionally compressed for playback."""
+    return await serve_project_file(
+        request,
+        project_id,
+        "audio",
+        filename,
+        "audio/wav",
+        file_service,
+        project_service,
+        audio_delivery,
+        current_user,
+        audio_format=audio_format,
+    )
+
+
+@router.get("/{project_id}/peaks", response_model=WaveformPeaks)
+async def get_waveform_peaks(
+    project_id: str,
+    settings: Annotated[Settings, Depends(get_settings)],
+    project_service: Annotated[ProjectService, Depends(get_project_service)],
+    waveform_service: Annotated[WaveformService, Depends(get_waveform_service)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    start: float = 0.0,
+    end: Optional[float] = None,
+    samples_per_peak: int = PEAK_LEVELS[1],
+) -> WaveformPeaks:
+    """Serve precomputed min/max waveform peaks for a time window of the project audio."""
+    project = await project_service.get_by_id(project_id, current_user.user_id)
+    if not project.extracted_audio:
+        raise ProcessingError("Project has no extracted audio")
+    audio_path = settings.projects_dir / project.extracted_audio
+    return await waveform_service.get_peaks(
+        audio_path,
+        start_time=start,
+        end_time=end,
+        samples_per_peak=samples_per_peak,
     )
 
 
@@ -53,18 +176,25 @@ async def get_audio_file(
 async def get_segment_file(
     project_id: str,
     filename: str,
+    request: Request,
     file_service: Annotated[FileService, Depends(get_file_service)],
     project_service: Annotated[ProjectService, Depends(get_project_service)],
+    audio_delivery: Annotated[AudioDeliveryService, Depends(get_audio_delivery_service)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-) -> FileResponse:
-    """Serve segment audio file."""
-    # Verify user owns the project
-    await project_service.get_by_id(project_id, current_user.user_id)
-    file_path = file_service.get_file_path(project_id, "segments", filename)
-    return FileResponse(
-        path=file_path,
-        media_type="audio/wav",
-        filename=filename,
+    audio_format: Annotated[Optional[str], Query(alias="format")] = None,
+) -> Response:
+    """Serve segment audio file, optionally compressed for playback."""
+    return await serve_project_file(
+        request,
+        project_id,
+        "segments",
+        filename,
+        "audio/wav",
+        file_service,
+        project_service,
+        audio_delivery,
+        current_user,
+        audio_format=audio_format,
     )
 
 
@@ -72,25 +202,32 @@ async def get_segment_file(
 async def get_output_file(
     project_id: str,
     filename: str,
+    request: Request,
     file_service: Annotated[FileService, Depends(get_file_service)],
     project_service: Annotated[ProjectService, Depends(get_project_service)],
+    audio_delivery: Annotated[AudioDeliveryService, Depends(get_audio_delivery_service)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
     download: bool = False,
-) -> FileResponse:
-    """Serve TTS output file."""
-    # Verify user owns the project
-    await project_service.get_by_id(project_id, current_user.user_id)
-    file_path = file_service.get_file_path(project_id, "output", filename)
+    audio_format: Annotated[Optional[str], Query(alias="format")] = None,
+) -> Response:
+    """Serve TTS output file, optionally compressed for playback."""
     media_type = "audio/mpeg" if filename.endswith(".mp3") else "audio/wav"
 
     headers = {}
     if download:
         headers["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-    return FileResponse(
-        path=file_path,
-        media_type=media_type,
-        filename=filename,
+    return await serve_project_file(
+        request,
+        project_id,
+        "output",
+        filename,
+        media_type,
+        file_service,
+        project_service,
+        audio_delivery,
+        current_user,
+        audio_format=audio_format,
         headers=headers,
     )
 
@@ -98,43 +235,52 @@ async def get_output_file(
 @router.get("/{project_id}/download-all")
 async def download_all_tts(
     project_id: str,
+    request: Request,
     settings: Annotated[Settings, Depends(get_settings)],
     project_service: Annotated[ProjectService, Depends(get_project_service)],
+    export_cache: Annotated[ExportCache, Depends(get_export_cache)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-) -> FileResponse:
-    """Download all TTS output files as a zip archive."""
-    import subprocess
-
+) -> Response:
+    """Download all TTS output files as a zip archive, in segment order."""
     # Verify user owns the project
-    await project_service.get_by_id(project_id, current_user.user_id)
+    project = await project_service.get_by_id_with_segments(project_id, current_user.user_id)
 
-    output_dir = settings.projects_dir / project_id / "output"
-
-    if not output_dir.exists():
-        raise ProcessingError("No output files found for this project")
-
-    # Get all audio files in the output directory
-    audio_files = list(output_dir.glob("*.mp3")) + list(output_dir.glob("*.wav"))
+    audio_files: list[Path] = []
+    for segment in sorted(project.segments, key=lambda s: s.start_time):
+        if segment.tts_result_file:
+            path = settings.projects_dir / segment.tts_result_file
+            if path.is_file() and path not in audio_files:
+                audio_files.append(path)
 
     if not audio_files:
         raise ProcessingError("No TTS audio files found")
 
-    # Create a temporary zip file
-    temp_dir = Path(tempfile.gettempdir())
-    zip_path = temp_dir / f"{project_id}_tts_output.zip"
-
-    # Use system zip command (-j stores files without directory structure)
     try:
-        subprocess.run(
-            ["zip", "-j", str(zip_path)] + [str(f) for f in audio_files],
-            check=True,
-            capture_output=True,
+        archive = ZipStream([(path.name, path) for path in audio_files])
+    except ValueError as e:
+        raise ProcessingError(str(e)) from e
+
+    key = export_cache.key_for(archive)
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag, allow_wildcard=True):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    filename = f"{project_id}_tts_output.zip"
+    cached_path = export_cache.lookup(key)
+    if cached_path is not None:
+        # Cached archives also support byte ranges, e.g. for resumed downloads
+        return FileResponse(
+            path=cached_path,
+            media_type="application/zip",
+            filename=filename,
+            headers=headers,
         )
-    except subprocess.CalledProcessError as e:
-        raise ProcessingError(f"Failed to create zip archive: {e.stderr.decode()}") from e
 
-    return FileResponse(
-        path=zip_path,
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    headers["Content-Length"] = str(archive.content_length)
+    return StreamingResponse(
+        export_cache.stream_and_store(archive),
         media_type="application/zip",
-        filename=f"{project_id}_tts_output.zip",
+        headers=headers,
     )
@@ -0,0 +1,35 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_session
+from app.dependencies.auth import CurrentUser, get_current_user
+from app.repositories.job_repo import JobRepository
+from app.schemas.job import JobRead
+from app.utils.exceptions import JobNotFoundError
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def get_job_repo(
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+) -> JobRepository:
+    return JobRepository(session)
+
+
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job(
+    job_id: str,
+    job_repo: Annotated[JobRepository, Depends(get_job_repo)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> JobRead:
+    """Get a background job, e.g. one returned by an ``?async=true`` request.
+
+    The job's segment has the matching in-progress status until it succeeds,
+    and ``error`` once it has failed for good.
+    """
+    job = await job_repo.get_by_id(job_id, current_user.user_id)
+    if not job:
+        raise JobNotFoundError(job_id)
+    return JobRead.model_validate(job)
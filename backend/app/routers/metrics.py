@@ -0,0 +1,38 @@
+from dataclasses import asdict
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.config import Settings, get_settings
+from app.dependencies.auth import CurrentUser, get_current_user
+from app.dependencies.http_clients import get_chatterbox_backends
+from app.schemas.metrics import ChatterBoxBackendMetrics, MetricsResponse, ProcessPoolMetrics
+from app.services.chatterbox_pool import ChatterBoxBackends
+from app.services.process_scheduler import (
+    ProcessScheduler,
+    get_process_scheduler,
+    get_stream_scheduler,
+)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", response_model=MetricsResponse)
+async def get_metrics(
+    scheduler: Annotated[ProcessScheduler, Depends(get_process_scheduler)],
+    stream_scheduler: Annotated[ProcessScheduler, Depends(get_stream_scheduler)],
+    chatterbox_backends: Annotated[ChatterBoxBackends, Depends(get_chatterbox_backends)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    _current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> MetricsResponse:
+    """Report load and wait times of the FFmpeg schedulers and each ChatterBox server."""
+    return MetricsResponse(
+        ffmpeg=[
+            ProcessPoolMetrics(scheduler="shared", **asdict(scheduler.stats())),
+            ProcessPoolMetrics(scheduler="stream", **asdict(stream_scheduler.stats())),
+        ],
+        chatterbox=[
+            ChatterBoxBackendMetrics.model_validate(chatterbox_backends.get(url).stats())
+            for url in settings.chatterbox_backend_urls
+        ],
+    )
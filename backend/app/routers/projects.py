@@ -1,6 +1,10 @@
-from typing import Annotated
+import contextlib
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, UploadFile, status
+from fastapi import APIRouter, Depends, Query, Request, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings, get_settings
@@ -9,9 +13,16 @@ from app.dependencies.auth import CurrentUser, get_current_user
 from app.repositories.project_repo import ProjectRepository
 from app.schemas import ProjectCreate, ProjectList, ProjectRead
 from app.schemas.project import ProjectReadWithSegments, ProjectUpdate
+from app.schemas.upload import UploadCommit, UploadCreate, UploadSessionRead
 from app.services.ffmpeg_service import FFmpegService
 from app.services.file_service import FileService
 from app.services.project_service import ProjectService
+from app.services.upload_service import UploadService
+from app.services.waveform_service import WaveformService
+from app.utils.disconnect import cancel_on_disconnect
+from app.utils.exceptions import ProcessingError
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -35,6 +46,32 @@ def get_ffmpeg_service(
     return FFmpegService(settings)
 
 
+def get_waveform_service() -> WaveformService:
+    return WaveformService()
+
+
+@contextlib.contextmanager
+def replacing_audio(audio_path: Path) -> Iterator[Path]:
+    """Temporary path to extract into, renamed over ``audio_path`` once the block succeeds.
+
+    The project and its segments keep pointing to the previous audio, so a
+    failed extraction must leave it in place rather than a partial file.
+    """
+    partial_path = audio_path.with_name(f"{audio_path.name}.part")
+    try:
+        yield partial_path
+        partial_path.replace(audio_path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+
+
+def get_upload_service(
+    settings: Annotated[Settings, Depends(get_settings)],
+    file_service: Annotated[FileService, Depends(get_file_service)],
+) -> UploadService:
+    return UploadService(settings, file_service)
+
+
 @router.post("", response_model=ProjectRead, status_code=status.HTTP_201_CREATED)
 async def create_project(
     data: ProjectCreate,
@@ -125,12 +162,144 @@ async def upload_video(
     return ProjectRead.model_validate(project)
 
 
+@router.post(
+    "/{project_id}/uploads",
+    response_model=UploadSessionRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_upload(
+    project_id: str,
+    data: UploadCreate,
+    service: Annotated[ProjectService, Depends(get_project_service)],
+    upload_service: Annotated[UploadService, Depends(get_upload_service)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> UploadSessionRead:
+    """Start a resumable upload; chunks are then PUT in any order."""
+    await service.get_by_id(project_id, current_user.user_id)
+    session = await upload_service.create(project_id, data.filename, data.size)
+    return UploadSessionRead.model_validate(session)
+
+
+@router.get("/{project_id}/uploads/{upload_id}", response_model=UploadSessionRead)
+async def get_upload(
+    project_id: str,
+    upload_id: str,
+    service: Annotated[ProjectService, Depends(get_project_service)],
+    upload_service: Annotated[UploadService, Depends(get_upload_service)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> UploadSessionRead:
+    """Get upload progress, e.g. to resume after a dropped connection."""
+    await service.get_by_id(project_id, current_user.user_id)
+    session = await upload_service.get(project_id, upload_id)
+    return UploadSessionRead.model_validate(session)
+
+
+@router.put(
+    "/{project_id}/uploads/{upload_id}/chunks/{index}",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def upload_chunk(
+    project_id: str,
+    upload_id: str,
+    index: int,
+    request: Request,
+    service: Annotated[ProjectService, Depends(get_project_service)],
+    upload_service: Annotated[UploadService, Depends(get_upload_service)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> None:
+    """Store one chunk, sent as the raw request body."""
+    await service.get_by_id(project_id, current_user.user_id)
+    await upload_service.write_chunk(project_id, upload_id, index, request.stream())
+
+
+@router.post("/{project_id}/uploads/{upload_id}/commit", response_model=ProjectRead)
+async def commit_upload(
+    project_id: str,
+    upload_id: str,
+    data: UploadCommit,
+    service: Annotated[ProjectService, Depends(get_project_service)],
+    upload_service: Annotated[UploadService, Depends(get_upload_service)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> ProjectRead:
+    """Verify the checksum of a complete upload and set it as the project video."""
+    await service.get_by_id(project_id, current_user.user_id)
+    relative_path = await upload_service.commit(project_id, upload_id, data.sha256)
+    project = await service.update_source_video(project_id, current_user.user_id, relative_path)
+    return ProjectRead.model_validate(project)
+
+
+@router.delete("/{project_id}/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    project_id: str,
+    upload_id: str,
+    service: Annotated[ProjectService, Depends(get_project_service)],
+    upload_service: Annotated[UploadService, Depends(get_upload_service)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> None:
+    await service.get_by_id(project_id, current_user.user_id)
+    await upload_service.abort(project_id, upload_id)
+
+
+@router.post("/{project_id}/upload/stream", response_model=ProjectRead)
+async def upload_video_stream(
+    project_id: str,
+    request: Request,
+    filename: Annotated[str, Query(min_length=1)],
+    service: Annotated[ProjectService, Depends(get_project_service)],
+    file_service: Annotated[FileService, Depends(get_file_service)],
+    ffmpeg_service: Annotated[FFmpegService, Depends(get_ffmpeg_service)],
+    waveform_service: Annotated[WaveformService, Depends(get_waveform_service)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> ProjectRead:
+    """Upload a video as the raw request body and extract its audio on the fly.
+
+    The body is written to disk and piped into FFmpeg at the same time, so the
+    audio is ready when the upload finishes. Containers that cannot be read
+    from a pipe (e.g. MP4 with the index at the end) are extracted from the
+    saved file afterwards.
+    """
+    await service.get_by_id(project_id, current_user.user_id)
+    file_service.validate_video_extension(filename)
+
+    audio_path = file_service.get_audio_path(project_id) / "full_audio.wav"
+    relative_video: Optional[str] = None
+    with replacing_audio(audio_path) as partial_audio:
+        try:
+            async with ffmpeg_service.extract_audio_from_stream(partial_audio) as audio_stream:
+                relative_video = await file_service.save_stream(
+                    project_id, request.stream(), filename, on_chunk=audio_stream.write
+                )
+        except ProcessingError as e:
+            if relative_video is None:
+                raise
+            logger.info(
+                f"Streaming extraction failed for {project_id}, retrying from file: {e.detail}"
+            )
+            video_path = settings.projects_dir / relative_video
+            await cancel_on_disconnect(
+                request, ffmpeg_service.extract_audio(video_path, partial_audio)
+            )
+
+    try:
+        await waveform_service.generate_peaks(audio_path)
+    except ProcessingError as e:
+        logger.warning(f"Could not build waveform peaks for {project_id}: {e.detail}")
+
+    await service.update_source_video(project_id, current_user.user_id, relative_video)
+    relative_audio = str(audio_path.relative_to(settings.projects_dir))
+    project = await service.update_extracted_audio(project_id, current_user.user_id, relative_audio)
+    return ProjectRead.model_validate(project)
+
+
 @router.post("/{project_id}/extract-audio", response_model=ProjectRead)
 async def extract_audio(
     project_id: str,
+    request: Request,
     service: Annotated[ProjectService, Depends(get_project_service)],
     file_service: Annotated[FileService, Depends(get_file_service)],
     ffmpeg_service: Annotated[FFmpegService, Depends(get_ffmpeg_service)],
+    waveform_service: Annotated[WaveformService, Depends(get_waveform_service)],
     settings: Annotated[Settings, Depends(get_settings)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
 ) -> ProjectRead:
@@ -138,15 +307,19 @@ async def extract_audio(
     project = await service.get_by_id(project_id, current_user.user_id)
 
     if not project.source_video:
-        from app.utils.exceptions import ProcessingError
-
         raise ProcessingError("No video uploaded for this project")
 
     video_path = settings.projects_dir / project.source_video
     audio_dir = file_service.get_audio_path(project_id)
     audio_path = audio_dir / "full_audio.wav"
 
-    await ffmpeg_service.extract_audio(video_path, audio_path)
+    with replacing_audio(audio_path) as partial_audio:
+        await cancel_on_disconnect(request, ffmpeg_service.extract_audio(video_path, partial_audio))
+    try:
+        await waveform_service.generate_peaks(audio_path)
+    except ProcessingError as e:
+        # Peaks are rebuilt on first request, so extraction still succeeds
+        logger.warning(f"Could not build waveform peaks for {project_id}: {e.detail}")
 
     relative_path = str(audio_path.relative_to(settings.projects_dir))
     project = await service.update_extracted_audio(project_id, current_user.user_id, relative_path)
@@ -1,31 +1,71 @@
-from typing import Annotated, Optional
+from collections.abc import AsyncGenerator
+from typing import Annotated, Optional, Union
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings, get_settings
 from app.database import get_async_session
 from app.dependencies.auth import CurrentUser, get_current_user
-from app.prompts import build_system_prompt, get_user_prompt
+from app.dependencies.http_clients import (
+    get_chatterbox_health,
+    get_chatterbox_pool,
+    get_openai_clients,
+)
+from app.dependencies.jobs import get_job_queue
+from app.models import Job, JobKind, Segment
 from app.repositories.custom_voice_repo import CustomVoiceRepository
 from app.repositories.project_repo import ProjectRepository
 from app.repositories.segment_repo import SegmentRepository
+from app.schemas.job import JobRead
 from app.schemas.segment import (
+    CHATTERBOX_TTS_VOICES,
+    OPENAI_TTS_VOICES,
+    ProjectAnalysisSummary,
+    ProjectTTSRequest,
+    ProjectTTSSummary,
     SegmentCreate,
+    SegmentFailure,
     SegmentRead,
     SegmentUpdateAnalysis,
     SegmentUpdateTranslation,
     TTSRequest,
 )
+from app.services.chatterbox_health import ChatterBoxHealthMonitor
+from app.services.chatterbox_pool import ChatterBoxPool
 from app.services.ffmpeg_service import FFmpegService
+from app.services.job_queue import JobQueue
+from app.services.openai_client_registry import OpenAIClientRegistry
 from app.services.openai_service import OpenAIService
 from app.services.project_service import ProjectService
-from app.services.segment_service import SegmentService
+from app.services.segment_events import (
+    SegmentEventHub,
+    get_segment_events,
+    stream_project_events,
+)
+from app.services.segment_jobs import (
+    analyze_segment_for_user,
+    build_analysis_service,
+    generate_segment_tts,
+    require_chatterbox,
+    resolve_custom_voice_path,
+)
+from app.services.segment_service import SegmentService, TTSInputs
 from app.services.settings_service import SettingsService
-from app.utils.exceptions import NotFoundError, ProcessingError
+from app.utils.exceptions import ExternalAPIError, ProcessingError
+from app.utils.streams import aclosing, prime_stream
 
 router = APIRouter(tags=["segments"])
 
+# What the segment editor sends for ChatterBox when the analysis has no value
+CHATTERBOX_DEFAULT_PARAMS = {
+    "temperature": 0.8,
+    "exaggeration": 0.8,
+    "cfg_weight": 0.5,
+    "speed_factor": 1.0,
+}
+
 
 def get_project_service(
     session: Annotated[AsyncSession, Depends(get_async_session)],
@@ -49,11 +89,25 @@ def get_custom_voice_repo(
 def get_segment_service(
     session: Annotated[AsyncSession, Depends(get_async_session)],
     settings: Annotated[Settings, Depends(get_settings)],
+    chatterbox: Annotated[ChatterBoxPool, Depends(get_chatterbox_pool)],
 ) -> SegmentService:
     repo = SegmentRepository(session)
     ffmpeg = FFmpegService(settings)
-    # OpenAI service will be created per-request with project context
-    return SegmentService(repo, ffmpeg, settings, openai=None)
+    # OpenAI service is created per-request with project context, around a
+    # shared client from the registry
+    return SegmentService(repo, ffmpeg, settings, openai=None, chatterbox=chatterbox)
+
+
+# ?async=true: queue the work and answer 202 with the job (see /jobs/{job_id})
+RunAsync = Annotated[bool, Query(alias="async")]
+
+
+def job_accepted(job: Job) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=JobRead.model_validate(job).model_dump(mode="json"),
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
 
 
 @router.post(
@@ -94,6 +148,34 @@ async def list_segments(
     return [SegmentRead.model_validate(s) for s in segments]
 
 
+@router.get("/projects/{project_id}/events")
+async def project_events(
+    project_id: str,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    project_service: Annotated[ProjectService, Depends(get_project_service)],
+    hub: Annotated[SegmentEventHub, Depends(get_segment_events)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    last_event_id: Annotated[Optional[str], Header()] = None,
+) -> StreamingResponse:
+    """Stream segment changes of a project as server-sent events.
+
+    Each "created", "updated" or "deleted" event carries the segment ID and
+    the fields that changed. On "resync" the client should reload the
+    segments, as it may have missed changes.
+    """
+    await project_service.get_by_id(project_id, current_user.user_id)
+    # Return the connection to the pool instead of holding it while streaming
+    await session.close()
+    return StreamingResponse(
+        stream_project_events(
+            hub, project_id, last_event_id, heartbeat=settings.segment_event_heartbeat
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/segments/{segment_id}", response_model=SegmentRead)
 async def get_segment(
     segment_id: str,
@@ -122,20 +204,46 @@ async def delete_segment(
     await segment_service.delete(segment_id)
 
 
-@router.post("/segments/{segment_id}/extract", response_model=SegmentRead)
+@router.post(
+    "/segments/{segment_id}/extract",
+    response_model=SegmentRead,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobRead}},
+)
 async def extract_segment_audio(
     segment_id: str,
     project_service: Annotated[ProjectService, Depends(get_project_service)],
     segment_service: Annotated[SegmentService, Depends(get_segment_service)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    job_queue: Annotated[JobQueue, Depends(get_job_queue)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-) -> SegmentRead:
-    """Extract audio for a segment from project audio."""
+    run_async: RunAsync = False,
+) -> Union[SegmentRead, JSONResponse]:
+    """Extract audio for a segment from project audio.
+
+    With ``?async=true``, queues the extraction and returns 202 with the job.
+    """
     segment = await segment_service.get_by_id(segment_id)
     project = await project_service.get_by_id(segment.project_id, current_user.user_id)
+    if run_async:
+        job = await job_queue.enqueue(session, JobKind.EXTRACT, segment, current_user.user_id)
+        return job_accepted(job)
     segment = await segment_service.extract_audio(segment, project)
     return SegmentRead.model_validate(segment)
 
 
+@router.post("/projects/{project_id}/segments/extract-all", response_model=list[SegmentRead])
+async def extract_all_segments_audio(
+    project_id: str,
+    project_service: Annotated[ProjectService, Depends(get_project_service)],
+    segment_service: Annotated[SegmentService, Depends(get_segment_service)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> list[SegmentRead]:
+    """Extract audio for all segments of a project in a single pass."""
+    project = await project_service.get_by_id(project_id, current_user.user_id)
+    segments = await segment_service.extract_all(project)
+    return [SegmentRead.model_validate(s) for s in segments]
+
+
 @router.put("/segments/{segment_id}/translation", response_model=SegmentRead)
 async def update_translation(
     segment_id: str,
@@ -174,19 +282,30 @@ async def update_analysis(
     return SegmentRead.model_validate(segment)
 
 
-@router.post("/segments/{segment_id}/analyze", response_model=SegmentRead)
+@router.post(
+    "/segments/{segment_id}/analyze",
+    response_model=SegmentRead,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobRead}},
+)
 async def analyze_segment(
     segment_id: str,
     project_service: Annotated[ProjectService, Depends(get_project_service)],
     settings_service: Annotated[SettingsService, Depends(get_settings_service)],
     segment_service: Annotated[SegmentService, Depends(get_segment_service)],
+    openai_clients: Annotated[OpenAIClientRegistry, Depends(get_openai_clients)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    job_queue: Annotated[JobQueue, Depends(get_job_queue)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-) -> SegmentRead:
+    run_async: RunAsync = False,
+    force: bool = False,
+) -> Union[SegmentRead, JSONResponse]:
     """Analyze segment audio using OpenAI gpt-4o-audio-preview.
 
     Returns segment with status 'analyzed' on success or 'error' on failure.
     Uses ChatterBox-specific analysis (with temperature, exaggeration, cfg_weight)
-    when TTS provider is set to ChatterBox.
+    when TTS provider is set to ChatterBox. A cached analysis of the same audio
+    and prompts is reused unless ``?force=true``. With ``?async=true``, queues
+    the analysis and returns 202 with the job instead.
     """
     segment = await segment_service.get_by_id(segment_id)
 
@@ -198,33 +317,72 @@ async def analyze_segment(
     if not user_settings.openai_api_key:
         raise ProcessingError("OpenAI API key not configured in settings")
 
-    # Determine if we should use ChatterBox-specific analysis
-    use_chatterbox_analysis = user_settings.tts_provider == "chatterbox"
+    if run_async:
+        job = await job_queue.enqueue(
+            session,
+            JobKind.ANALYZE,
+            segment,
+            current_user.user_id,
+            payload={"force": True} if force else None,
+        )
+        return job_accepted(job)
 
-    # Build prompts dynamically (only used for standard OpenAI analysis)
-    system_prompt = build_system_prompt(
-        context=user_settings.context_description,
-        source_language=project.source_language,
-        target_language=project.target_language,
+    segment = await analyze_segment_for_user(
+        segment, project, user_settings, segment_service, openai_clients, force=force
     )
-    user_prompt = get_user_prompt()
+    return SegmentRead.model_validate(segment)
 
-    # Create OpenAI service with project-specific prompts
-    openai_service = OpenAIService(
-        api_key=user_settings.openai_api_key,
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-    )
 
-    segment = await segment_service.analyze_segment(
-        segment,
-        openai=openai_service,
-        use_chatterbox_analysis=use_chatterbox_analysis,
+@router.post("/projects/{project_id}/analyze", response_model=ProjectAnalysisSummary)
+async def analyze_project(
+    project_id: str,
+    project_service: Annotated[ProjectService, Depends(get_project_service)],
+    settings_service: Annotated[SettingsService, Depends(get_settings_service)],
+    segment_service: Annotated[SegmentService, Depends(get_segment_service)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    openai_clients: Annotated[OpenAIClientRegistry, Depends(get_openai_clients)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> ProjectAnalysisSummary:
+    """Analyze all segments of a project that have not been analyzed yet.
+
+    Runs up to ``ANALYSIS_CONCURRENCY`` OpenAI requests at a time with one
+    client and one set of prompts. Segments that fail are marked as errored
+    and listed in the summary; the rest are still analyzed.
+    """
+    project = await project_service.get_by_id(project_id, current_user.user_id)
+
+    user_settings = await settings_service.get_settings(current_user.user_id)
+    if not user_settings.openai_api_key:
+        raise ProcessingError("OpenAI API key not configured in settings")
+
+    async with openai_clients.lease(user_settings.openai_api_key) as client:
+        result = await segment_service.analyze_all(
+            project,
+            openai=build_analysis_service(user_settings, project, client),
+            use_chatterbox_analysis=user_settings.tts_provider == "chatterbox",
+            concurrency=settings.analysis_concurrency,
+        )
+
+    return ProjectAnalysisSummary(
+        total=result.total,
+        analyzed=len(result.analyzed),
+        failed=len(result.failed),
+        skipped=result.skipped,
+        failures=[
+            SegmentFailure(segment_id=s.id, error=s.error_message or "") for s in result.failed
+        ],
+        segments=[
+            SegmentRead.model_validate(s)
+            for s in sorted(result.analyzed + result.failed, key=lambda s: s.start_time)
+        ],
     )
-    return SegmentRead.model_validate(segment)
 
 
-@router.post("/segments/{segment_id}/generate-tts", response_model=SegmentRead)
+@router.post(
+    "/segments/{segment_id}/generate-tts",
+    response_model=SegmentRead,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobRead}},
+)
 async def generate_tts(
     segment_id: str,
     data: TTSRequest,
@@ -233,11 +391,18 @@ async def generate_tts(
     segment_service: Annotated[SegmentService, Depends(get_segment_service)],
     custom_voice_repo: Annotated[CustomVoiceRepository, Depends(get_custom_voice_repo)],
     settings: Annotated[Settings, Depends(get_settings)],
+    openai_clients: Annotated[OpenAIClientRegistry, Depends(get_openai_clients)],
+    chatterbox_health: Annotated[ChatterBoxHealthMonitor, Depends(get_chatterbox_health)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    job_queue: Annotated[JobQueue, Depends(get_job_queue)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-) -> SegmentRead:
+    run_async: RunAsync = False,
+) -> Union[SegmentRead, JSONResponse]:
     """Generate TTS audio for segment.
 
-    Uses OpenAI gpt-4o-mini-tts or ChatterBox based on user settings.
+    Uses OpenAI gpt-4o-mini-tts or ChatterBox based on user settings. With
+    ``?async=true``, queues the generation and returns 202 with the job
+    instead, so slow ChatterBox runs do not hold the request open.
     """
     segment = await segment_service.get_by_id(segment_id)
     # Verify user owns the project and get target language
@@ -246,23 +411,156 @@ async def generate_tts(
     # Get user settings for TTS provider
     user_settings = await settings_service.get_settings(current_user.user_id)
 
-    # Resolve custom voice to file path if needed
+    if run_async:
+        job = await job_queue.enqueue(
+            session,
+            JobKind.GENERATE_TTS,
+            segment,
+            current_user.user_id,
+            payload=data.model_dump(exclude_defaults=True),
+            tts_voice=data.voice,
+        )
+        return job_accepted(job)
+
+    segment = await generate_segment_tts(
+        segment,
+        project,
+        user_settings,
+        data,
+        segment_service,
+        custom_voice_repo,
+        settings,
+        openai_clients,
+        chatterbox_health,
+    )
+    return SegmentRead.model_validate(segment)
+
+
+@router.post("/projects/{project_id}/generate-tts", response_model=ProjectTTSSummary)
+async def generate_project_tts(
+    project_id: str,
+    data: ProjectTTSRequest,
+    project_service: Annotated[ProjectService, Depends(get_project_service)],
+    settings_service: Annotated[SettingsService, Depends(get_settings_service)],
+    segment_service: Annotated[SegmentService, Depends(get_segment_service)],
+    custom_voice_repo: Annotated[CustomVoiceRepository, Depends(get_custom_voice_repo)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    openai_clients: Annotated[OpenAIClientRegistry, Depends(get_openai_clients)],
+    chatterbox_health: Annotated[ChatterBoxHealthMonitor, Depends(get_chatterbox_health)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> ProjectTTSSummary:
+    """Generate TTS audio for all segments of a project that have translated text.
+
+    Each segment keeps the voice of its last TTS and gets the instructions
+    (OpenAI) or parameters (ChatterBox) from its stored analysis. Segments
+    whose audio was made from the same text and inputs are skipped unless
+    ``force`` is set. Up to ``OPENAI_TTS_CONCURRENCY`` or
+    ``CHATTERBOX_TTS_CONCURRENCY`` requests run at a time; segments that
+    fail are marked as errored and listed in the summary.
+    """
+    project = await project_service.get_by_id(project_id, current_user.user_id)
+    user_settings = await settings_service.get_settings(current_user.user_id)
+    provider = user_settings.tts_provider
+    custom_voice_paths: dict[str, Optional[str]] = {}
+
+    async def inputs_for(segment: Segment) -> TTSInputs:
+        voice = data.voice or default_tts_voice(segment.tts_voice, provider)
+        request = TTSRequest.from_analysis(voice, segment.analysis_json)
+        if provider == "chatterbox":
+            if voice not in custom_voice_paths:
+                custom_voice_paths[voice] = await resolve_custom_voice_path(
+                    voice, custom_voice_repo, settings, current_user.user_id
+                )
+            params = {
+                key: value if value is not None else CHATTERBOX_DEFAULT_PARAMS[key]
+                for key, value in request.model_dump(include=set(CHATTERBOX_DEFAULT_PARAMS)).items()
+            }
+            return TTSInputs(
+                "chatterbox",
+                voice,
+                custom_voice_path=custom_voice_paths[voice],
+                temperature=params["temperature"],
+                exaggeration=params["exaggeration"],
+                cfg_weight=params["cfg_weight"],
+                speed=params["speed_factor"],
+            )
+        request.target_language = project.target_language
+        return TTSInputs("openai", voice, instructions=request.build_instructions() or None)
+
+    if provider == "chatterbox":
+        require_chatterbox(chatterbox_health)
+        result = await segment_service.generate_all_tts(
+            project,
+            inputs_for,
+            concurrency=settings.chatterbox_tts_concurrency * len(settings.chatterbox_backend_urls),
+            force=data.force,
+        )
+        if result.failed:
+            # The server may have gone down; refresh the cached state now
+            chatterbox_health.request_probe()
+    else:
+        if not user_settings.openai_api_key:
+            raise ProcessingError("OpenAI API key not configured in settings")
+        async with openai_clients.lease(user_settings.openai_api_key) as client:
+            result = await segment_service.generate_all_tts(
+                project,
+                inputs_for,
+                openai=OpenAIService(api_key=user_settings.openai_api_key, client=client),
+                concurrency=settings.openai_tts_concurrency,
+                force=data.force,
+            )
+
+    return ProjectTTSSummary(
+        total=result.total,
+        generated=len(result.generated),
+        failed=len(result.failed),
+        unchanged=result.unchanged,
+        skipped=result.skipped,
+        failures=[
+            SegmentFailure(segment_id=s.id, error=s.error_message or "") for s in result.failed
+        ],
+        segments=[
+            SegmentRead.model_validate(s)
+            for s in sorted(result.generated + result.failed, key=lambda s: s.start_time)
+        ],
+    )
+
+
+def default_tts_voice(previous: Optional[str], provider: str) -> str:
+    """Voice of a segment's last TTS if the provider has it, else the provider default."""
+    if provider == "chatterbox":
+        if previous and (previous in CHATTERBOX_TTS_VOICES or previous.startswith("custom:")):
+            return previous
+        return "Emily.wav"
+    if previous in OPENAI_TTS_VOICES:
+        return previous
+    return "alloy"
+
+
+async def _stream_tts_response(
+    segment_id: str,
+    data: TTSRequest,
+    project_service: ProjectService,
+    settings_service: SettingsService,
+    segment_service: SegmentService,
+    custom_voice_repo: CustomVoiceRepository,
+    settings: Settings,
+    openai_clients: OpenAIClientRegistry,
+    chatterbox_health: ChatterBoxHealthMonitor,
+    current_user: CurrentUser,
+) -> StreamingResponse:
+    segment = await segment_service.get_by_id(segment_id)
+    project = await project_service.get_by_id(segment.project_id, current_user.user_id)
+    user_settings = await settings_service.get_settings(current_user.user_id)
+
     voice = data.voice
-    custom_voice_path: Optional[str] = None
-    if voice.startswith("custom:"):
-        # Format: custom:voice_id:voice_name
-        parts = voice.split(":", 2)
-        if len(parts) >= 2:
-            voice_id = parts[1]
-            custom_voice = await custom_voice_repo.get_by_id(voice_id, current_user.user_id)
-            if not custom_voice:
-                raise NotFoundError(f"Custom voice not found: {voice_id}")
-            # Get absolute path to the custom voice file
-            custom_voice_path = str(settings.voices_dir / custom_voice.file_path)
+    custom_voice_path = await resolve_custom_voice_path(
+        voice, custom_voice_repo, settings, current_user.user_id
+    )
 
     if user_settings.tts_provider == "chatterbox":
-        # Use ChatterBox TTS (local)
-        segment = await segment_service.generate_tts_chatterbox(
+        require_chatterbox(chatterbox_health)
+        audio = segment_service.stream_tts_chatterbox(
             segment,
             voice=voice,
             custom_voice_path=custom_voice_path,
@@ -271,25 +569,103 @@ async def generate_tts(
             cfg_weight=data.cfg_weight,
             speed=data.speed_factor,
         )
+        media_type = "audio/wav"
     else:
-        # Use OpenAI TTS (default)
-        if not user_settings.openai_api_key:
+        api_key = user_settings.openai_api_key
+        if not api_key:
             raise ProcessingError("OpenAI API key not configured in settings")
-
-        # Create OpenAI service with API key
-        openai_service = OpenAIService(api_key=user_settings.openai_api_key)
-
-        # Set target language from project if not provided in request
         if not data.target_language:
             data.target_language = project.target_language
-
-        # Build TTS instructions from analysis fields
         instructions = data.build_instructions()
 
-        segment = await segment_service.generate_tts(
-            segment,
-            voice=voice,
-            instructions=instructions if instructions else None,
-            openai=openai_service,
-        )
-    return SegmentRead.model_validate(segment)
+        async def openai_audio() -> AsyncGenerator[bytes, None]:
+            # The client stays leased until the stream ends, after this handler returns
+            async with openai_clients.lease(api_key) as client:
+                openai_service = OpenAIService(api_key=api_key, client=client)
+                stream = segment_service.stream_tts(
+                    segment,
+                    voice=voice,
+                    instructions=instructions if instructions else None,
+                    openai=openai_service,
+                )
+                async with aclosing(stream):
+                    async for chunk in stream:
+                        yield chunk
+
+        audio = openai_audio()
+        media_type = "audio/mpeg"
+
+    try:
+        stream = await prime_stream(audio)
+    except ExternalAPIError:
+        if user_settings.tts_provider == "chatterbox":
+            chatterbox_health.request_probe()
+        raise
+
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        # Sent as generated; proxies must not buffer it
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/segments/{segment_id}/tts/stream")
+async def stream_tts(
+    segment_id: str,
+    data: Annotated[TTSRequest, Query()],
+    project_service: Annotated[ProjectService, Depends(get_project_service)],
+    settings_service: Annotated[SettingsService, Depends(get_settings_service)],
+    segment_service: Annotated[SegmentService, Depends(get_segment_service)],
+    custom_voice_repo: Annotated[CustomVoiceRepository, Depends(get_custom_voice_repo)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    openai_clients: Annotated[OpenAIClientRegistry, Depends(get_openai_clients)],
+    chatterbox_health: Annotated[ChatterBoxHealthMonitor, Depends(get_chatterbox_health)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> StreamingResponse:
+    """Generate TTS audio for segment, streaming it as it is synthesized.
+
+    Playable directly from an ``<audio>`` element; the TTS options are query
+    parameters. The audio is also saved as the segment's TTS result, with the
+    same status changes as ``generate-tts``.
+    """
+    return await _stream_tts_response(
+        segment_id,
+        data,
+        project_service,
+        settings_service,
+        segment_service,
+        custom_voice_repo,
+        settings,
+        openai_clients,
+        chatterbox_health,
+        current_user,
+    )
+
+
+@router.post("/segments/{segment_id}/tts/stream")
+async def stream_tts_post(
+    segment_id: str,
+    data: TTSRequest,
+    project_service: Annotated[ProjectService, Depends(get_project_service)],
+    settings_service: Annotated[SettingsService, Depends(get_settings_service)],
+    segment_service: Annotated[SegmentService, Depends(get_segment_service)],
+    custom_voice_repo: Annotated[CustomVoiceRepository, Depends(get_custom_voice_repo)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    openai_clients: Annotated[OpenAIClientRegistry, Depends(get_openai_clients)],
+    chatterbox_health: Annotated[ChatterBoxHealthMonitor, Depends(get_chatterbox_health)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> StreamingResponse:
+    """Same as the GET variant, with the TTS options as a JSON body."""
+    return await _stream_tts_response(
+        segment_id,
+        data,
+        project_service,
+        settings_service,
+        segment_service,
+        custom_voice_repo,
+        settings,
+        openai_clients,
+        chatterbox_health,
+        current_user,
+    )
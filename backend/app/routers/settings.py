@@ -3,11 +3,12 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import Settings, get_settings
 from app.database import get_async_session
 from app.dependencies.auth import CurrentUser, get_current_user
+from app.dependencies.http_clients import get_chatterbox_health, get_openai_clients
 from app.schemas.settings import ChatterBoxHealthResponse, SettingsResponse, SettingsUpdate
-from app.services.chatterbox_service import ChatterBoxService
+from app.services.chatterbox_health import ChatterBoxHealthMonitor
+from app.services.openai_client_registry import OpenAIClientRegistry
 from app.services.settings_service import SettingsService
 
 router = APIRouter(prefix="/settings", tags=["settings"])
@@ -15,8 +16,9 @@ router = APIRouter(prefix="/settings", tags=["settings"])
 
 def get_settings_service(
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    openai_clients: Annotated[OpenAIClientRegistry, Depends(get_openai_clients)],
 ) -> SettingsService:
-    return SettingsService(session)
+    return SettingsService(session, openai_clients)
 
 
 def mask_api_key(key: str) -> str:
@@ -26,29 +28,21 @@ def mask_api_key(key: str) -> str:
     return "*" * (len(key) - 4) + key[-4:]
 
 
-async def check_chatterbox_health(settings: Settings) -> bool:
-    """Check if ChatterBox server is reachable."""
-    service = ChatterBoxService(base_url=settings.chatterbox_base_url)
-    try:
-        return await service.check_health()
-    finally:
-        await service.close()
-
-
 @router.get("", response_model=SettingsResponse)
 async def get_settings_endpoint(
     service: Annotated[SettingsService, Depends(get_settings_service)],
-    settings: Annotated[Settings, Depends(get_settings)],
+    chatterbox_health: Annotated[ChatterBoxHealthMonitor, Depends(get_chatterbox_health)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
 ) -> SettingsResponse:
     user_settings = await service.get_settings(current_user.user_id)
-    chatterbox_available = await check_chatterbox_health(settings)
+    health = chatterbox_health.health
     return SettingsResponse(
         openai_api_key=mask_api_key(user_settings.openai_api_key),
         openai_api_key_set=bool(user_settings.openai_api_key),
         context_description=user_settings.context_description,
         tts_provider=user_settings.tts_provider,
-        chatterbox_available=chatterbox_available,
+        chatterbox_available=health.available,
+        chatterbox_checked_at=health.checked_at,
     )
 
 
@@ -56,7 +50,7 @@ async def get_settings_endpoint(
 async def update_settings(
     data: SettingsUpdate,
     service: Annotated[SettingsService, Depends(get_settings_service)],
-    settings: Annotated[Settings, Depends(get_settings)],
+    chatterbox_health: Annotated[ChatterBoxHealthMonitor, Depends(get_chatterbox_health)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
 ) -> SettingsResponse:
     user_settings = await service.update_settings(
@@ -65,24 +59,30 @@ async def update_settings(
         context_description=data.context_description,
         tts_provider=data.tts_provider,
     )
-    chatterbox_available = await check_chatterbox_health(settings)
+    health = chatterbox_health.health
     return SettingsResponse(
         openai_api_key=mask_api_key(user_settings.openai_api_key),
         openai_api_key_set=bool(user_settings.openai_api_key),
         context_description=user_settings.context_description,
         tts_provider=user_settings.tts_provider,
-        chatterbox_available=chatterbox_available,
+        chatterbox_available=health.available,
+        chatterbox_checked_at=health.checked_at,
     )
 
 
 @router.get("/chatterbox/health", response_model=ChatterBoxHealthResponse)
 async def check_chatterbox_health_endpoint(
-    settings: Annotated[Settings, Depends(get_settings)],
+    chatterbox_health: Annotated[ChatterBoxHealthMonitor, Depends(get_chatterbox_health)],
     _current_user: Annotated[CurrentUser, Depends(get_current_user)],
 ) -> ChatterBoxHealthResponse:
-    """Check if ChatterBox TTS server is available."""
-    available = await check_chatterbox_health(settings)
+    """Check if ChatterBox TTS server is available.
+
+    Probes right away (refreshing the cached state) since this backs the
+    explicit connection test in the UI.
+    """
+    health = await chatterbox_health.probe()
     return ChatterBoxHealthResponse(
-        available=available,
-        url=settings.chatterbox_base_url,
+        available=health.available,
+        url=chatterbox_health.base_url,
+        checked_at=health.checked_at,
     )
@@ -1,6 +1,6 @@
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, Form, UploadFile, status
+from fastapi import APIRouter, Depends, Form, Request, Response, UploadFile, status
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,6 +11,7 @@ from app.repositories.custom_voice_repo import CustomVoiceRepository
 from app.schemas.custom_voice import CustomVoiceRead, CustomVoiceUpdate
 from app.services.custom_voice_service import CustomVoiceService
 from app.utils.exceptions import ProcessingError
+from app.utils.http_cache import CACHE_IMMUTABLE, make_etag, not_modified
 
 router = APIRouter(prefix="/voices", tags=["voices"])
 
@@ -74,15 +75,28 @@ async def get_voice(
 @router.get("/{voice_id}/audio")
 async def get_voice_audio(
     voice_id: str,
+    request: Request,
     service: Annotated[CustomVoiceService, Depends(get_custom_voice_service)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-) -> FileResponse:
+) -> Response:
     """Get the audio file for a custom voice."""
+    # Voice audio never changes after upload, so the ETag needs no database lookup
+    etag = make_etag(current_user.user_id, voice_id)
+    if (response := not_modified(request, etag, CACHE_IMMUTABLE)) is not None:
+        return response
+
     voice = await service.get_by_id(voice_id, current_user.user_id)
     file_path = service.get_voice_file_path(voice)
     if not file_path.exists():
         raise ProcessingError("Voice file not found")
-    return FileResponse(file_path, media_type="audio/wav")
+    # "*" matches any voice id, so it is only answered for the user's own voices
+    if (response := not_modified(request, etag, CACHE_IMMUTABLE, allow_wildcard=True)) is not None:
+        return response
+    return FileResponse(
+        file_path,
+        media_type="audio/wav",
+        headers={"ETag": etag, "Cache-Control": CACHE_IMMUTABLE},
+    )
 
 
 @router.patch("/{voice_id}", response_model=CustomVoiceRead)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from app.models.job import JobKind, JobStatus
+
+
+class JobRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    kind: JobKind
+    segment_id: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    run_after: datetime  # Next attempt, while queued
+    error_message: Optional[str]  # Error of the last failed attempt
+    created_at: datetime
+    updated_at: Optional[datetime]
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ProcessPoolMetrics(BaseModel):
+    """Gauges of an FFmpeg/ffprobe process scheduler.
+
+    ``scheduler`` is "shared" for the pool used by all extraction and probing,
+    "stream" for the one fed by client uploads.
+    """
+
+    scheduler: str
+    max_concurrency: int
+    running: int
+    queue_depth: int
+    jobs_started: int
+    jobs_timed_out: int
+    last_wait_seconds: float
+    max_wait_seconds: float
+    avg_wait_seconds: float
+
+
+class ChatterBoxBackendMetrics(BaseModel):
+    """Circuit state, load and synthesis latency of one ChatterBox server."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    url: str
+    state: str
+    outstanding: int
+    requests: int
+    failures: int
+    reference_voices: int
+    avg_latency_seconds: float
+    p50_latency_seconds: float
+    p95_latency_seconds: float
+
+
+class MetricsResponse(BaseModel):
+    ffmpeg: list[ProcessPoolMetrics]
+    chatterbox: list[ChatterBoxBackendMetrics]
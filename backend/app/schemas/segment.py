@@ -53,6 +53,22 @@ class SegmentRead(BaseModel):
     updated_at: Optional[datetime]
 
 
+class SegmentFailure(BaseModel):
+    segment_id: str
+    error: str
+
+
+class ProjectAnalysisSummary(BaseModel):
+    """Result of analyzing all segments of a project."""
+
+    total: int  # Segments in the project
+    analyzed: int
+    failed: int
+    skipped: int  # Already analyzed or in progress
+    failures: list[SegmentFailure]
+    segments: list[SegmentRead]  # Segments processed by this run
+
+
 class SegmentUpdateTranslation(BaseModel):
     translated_text: str
 
@@ -120,6 +136,15 @@ CHATTERBOX_TTS_VOICES = [
 ALL_TTS_VOICES = OPENAI_TTS_VOICES + CHATTERBOX_TTS_VOICES
 
 
+def validate_tts_voice(v: str) -> str:
+    # Allow custom voices (format: custom:id:name)
+    if v.startswith("custom:"):
+        return v
+    if v not in ALL_TTS_VOICES:
+        raise ValueError(f"Invalid voice. Must be one of: {ALL_TTS_VOICES}")
+    return v
+
+
 class TTSRequest(BaseModel):
     voice: str = "alloy"
     # Analysis fields for TTS instructions (OpenAI)
@@ -138,16 +163,55 @@ class TTSRequest(BaseModel):
     exaggeration: Optional[float] = None
     cfg_weight: Optional[float] = None
     speed_factor: Optional[float] = None
+    # Synthesize again instead of reusing cached audio for the same inputs
+    force: bool = False
 
     @field_validator("voice")
     @classmethod
     def validate_voice(cls, v: str) -> str:
-        # Allow custom voices (format: custom:id:name)
-        if v.startswith("custom:"):
-            return v
-        if v not in ALL_TTS_VOICES:
-            raise ValueError(f"Invalid voice. Must be one of: {ALL_TTS_VOICES}")
-        return v
+        return validate_tts_voice(v)
+
+    @classmethod
+    def from_analysis(cls, voice: str, analysis: Optional[dict[str, Any]]) -> TTSRequest:
+        """Build a request from a segment's stored analysis, as the segment editor does."""
+        analysis = analysis or {}
+
+        def text(key: str) -> Optional[str]:
+            value = analysis.get(key)
+            return str(value) if value else None
+
+        def words(key: str) -> list[str]:
+            value = analysis.get(key) or []
+            if isinstance(value, str):
+                return [word.strip() for word in value.split(",") if word.strip()]
+            return [
+                str(item.get("word") or item.get("text") or item.get("value") or item)
+                if isinstance(item, dict)
+                else str(item)
+                for item in value
+            ]
+
+        def number(key: str) -> Optional[float]:
+            value = analysis.get(key)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return None
+            return float(value)
+
+        return cls(
+            voice=voice,
+            tone=text("tone"),
+            emotion=text("emotion"),
+            style=text("style"),
+            pace=text("pace"),
+            intonation=text("intonation"),
+            tempo=text("tempo"),
+            emphasis=words("emphasis"),
+            pause_before=words("pause_before"),
+            temperature=number("temperature"),
+            exaggeration=number("exaggeration"),
+            cfg_weight=number("cfg_weight"),
+            speed_factor=number("speed_factor"),
+        )
 
     def build_instructions(self) -> str:
         """Build TTS instructions from analysis fields (for OpenAI TTS)."""
@@ -176,6 +240,34 @@ class TTSRequest(BaseModel):
         return " ".join(parts) if parts else ""
 
 
+class ProjectTTSRequest(BaseModel):
+    """Generate TTS for all segments of a project.
+
+    Voice and parameters come from each segment's last TTS and analysis;
+    ``voice`` overrides the voice of every segment.
+    """
+
+    voice: Optional[str] = None
+    force: bool = False  # Also regenerate segments whose audio is up to date
+
+    @field_validator("voice")
+    @classmethod
+    def validate_voice(cls, v: Optional[str]) -> Optional[str]:
+        return validate_tts_voice(v) if v is not None else v
+
+
+class ProjectTTSSummary(BaseModel):
+    """Result of generating TTS for all segments of a project."""
+
+    total: int  # Segments in the project
+    generated: int
+    failed: int
+    unchanged: int  # Audio already matches the segment's text and parameters
+    skipped: int  # No translated text, or generation in progress
+    failures: list[SegmentFailure]
+    segments: list[SegmentRead]  # Segments processed by this run
+
+
 class SegmentUpdateChatterBoxParams(BaseModel):
     """Update ChatterBox TTS parameters for a segment."""
 
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Literal, Optional
 
 from pydantic import BaseModel
@@ -14,6 +15,7 @@ class SettingsResponse(BaseModel):
     context_description: str
     tts_provider: TTSProviderType
     chatterbox_available: bool = False  # Whether ChatterBox server is reachable
+    chatterbox_checked_at: Optional[datetime] = None  # When that was last probed
 
     model_config = {"from_attributes": True}
 
@@ -23,6 +25,7 @@ class ChatterBoxHealthResponse(BaseModel):
 
     available: bool
     url: str
+    checked_at: Optional[datetime] = None
 
 
 class SettingsUpdate(BaseModel):
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class UploadCreate(BaseModel):
+    filename: str
+    # Total file size in bytes
+    size: int = Field(gt=0)
+
+
+class UploadCommit(BaseModel):
+    # Hex SHA-256 of the complete file
+    sha256: str = Field(pattern=r"^[0-9a-fA-F]{64}$")
+
+
+class UploadSessionRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    filename: str
+    size: int
+    chunk_size: int
+    chunk_count: int
+    # Indexes of chunks stored so far; a resuming client sends the rest
+    received_chunks: list[int]
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class WaveformPeaks(BaseModel):
+    """A window of min/max waveform peaks (16-bit range, interleaved min/max)."""
+
+    sample_rate: int
+    samples_per_peak: int
+    # Time of the first peak in seconds (aligned down to samples_per_peak)
+    start_time: float
+    # Total audio duration in seconds
+    duration: float
+    # Number of peaks; data holds 2 * length values
+    length: int
+    data: list[int]
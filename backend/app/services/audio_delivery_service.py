@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from app.config import Settings
+from app.services.ffmpeg_service import FFmpegService
+from app.utils.disk_cache import cache_key, evict_lru, touch_cached
+from app.utils.exceptions import FileValidationError
+
+logger = logging.getLogger(__name__)
+
+# Delivery formats: file extension and media type
+DELIVERY_FORMATS = {
+    "wav": (".wav", "audio/wav"),
+    "opus": (".ogg", "audio/ogg"),
+    "mp3": (".mp3", "audio/mpeg"),
+}
+
+# Media types a client may list in Accept, by delivery format
+ACCEPT_TYPES = {
+    "audio/wav": "wav",
+    "audio/wave": "wav",
+    "audio/x-wav": "wav",
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+}
+
+# Per-variant transcode locks, shared by all requests in the process
+_transcode_locks: dict[str, asyncio.Lock] = {}
+
+
+class AudioDeliveryService:
+    """Compressed variants of project WAV files for playback.
+
+    The WAV stays the source of truth for all processing; variants are
+    encoded on first request and cached under ``cache_dir/audio``, keyed by
+    the source file's identity, so a regenerated WAV gets a fresh variant.
+    """
+
+    def __init__(self, settings: Settings, ffmpeg: FFmpegService) -> None:
+        self.settings = settings
+        self.ffmpeg = ffmpeg
+        self.cache_dir = settings.cache_dir / "audio"
+
+    @staticmethod
+    def negotiate(requested: Optional[str], accept: Optional[str]) -> str:
+        """Pick a delivery format from a ``format`` query parameter or ``Accept``.
+
+        An explicit parameter wins. Otherwise the listed audio type with the
+        highest quality value is used; wildcards and unknown types fall back
+        to WAV, so plain browser requests keep getting the original.
+
+        Args:
+            requested: Value of the ``format`` query parameter
+            accept: Raw ``Accept`` header
+
+        Returns:
+            Key of DELIVERY_FORMATS
+        """
+        if requested is not None:
+            if requested not in DELIVERY_FORMATS:
+                allowed = ", ".join(DELIVERY_FORMATS)
+                raise FileValidationError(f"Invalid audio format '{requested}'. Allowed: {allowed}")
+            return requested
+
+        best_format, best_quality = "wav", 0.0
+        for item in (accept or "").split(","):
+            media_type, *params = (part.strip() for part in item.split(";"))
+            audio_format = ACCEPT_TYPES.get(media_type.lower())
+            if audio_format is None:
+                continue
+            quality = 1.0
+            for param in params:
+                name, _, value = param.partition("=")
+                if name.strip().lower() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > best_quality:
+                best_format, best_quality = audio_format, quality
+        return best_format
+
+    def variant_key(self, source_path: Path, audio_format: str) -> str:
+        stat = source_path.stat()
+        return cache_key(source_path, stat.st_ino, stat.st_size, stat.st_mtime_ns, audio_format)
+
+    async def get_variant(self, source_path: Path, audio_format: str) -> Path:
+        """Return the cached ``audio_format`` encoding of a WAV, encoding it if needed.
+
+        Args:
+            source_path: Path to the source WAV file
+            audio_format: Compressed key of DELIVERY_FORMATS
+
+        Returns:
+            Path of the encoded file in the cache
+        """
+        key = self.variant_key(source_path, audio_format)
+        path = self.cache_dir / f"{key}{DELIVERY_FORMATS[audio_format][0]}"
+        if touch_cached(path):
+            return path
+
+        lock = _transcode_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have encoded it while this one waited
+                if touch_cached(path):
+                    return path
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+                logger.info(f"Encoding {source_path.name} as {audio_format}")
+                await self.ffmpeg.transcode_audio(source_path, tmp_path, audio_format)
+                tmp_path.replace(path)
+        finally:
+            if not lock.locked():
+                _transcode_locks.pop(key, None)
+
+        max_bytes = self.settings.audio_cache_max_mb * 1024 * 1024
+        await asyncio.to_thread(evict_lru, self.cache_dir, "*", max_bytes, path)
+        return path
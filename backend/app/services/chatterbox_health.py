@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+from app.services.chatterbox_pool import ChatterBoxPool
+from app.services.chatterbox_service import ChatterBoxService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ChatterBoxHealth:
+    """Last known ChatterBox state; ``checked_at`` is None until the first probe."""
+
+    available: bool = False
+    checked_at: Optional[datetime] = None
+
+
+class ChatterBoxHealthMonitor:
+    """Probes ChatterBox in the background and caches the result.
+
+    Endpoints read ``health`` instead of probing per request, so they never
+    wait on a down server. ``request_probe`` wakes the loop early, e.g. after
+    a failed TTS call, and concurrent probes share one request. With several
+    servers, ChatterBox is available while any of them is.
+    """
+
+    def __init__(
+        self, chatterbox: Union[ChatterBoxPool, ChatterBoxService], interval: float
+    ) -> None:
+        self.chatterbox = chatterbox
+        self.interval = interval
+        self.health = ChatterBoxHealth()
+        self._wakeup = asyncio.Event()
+        self._probe_task: Optional[asyncio.Task[ChatterBoxHealth]] = None
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def base_url(self) -> str:
+        return self.chatterbox.base_url
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [task for task in (self._task, self._probe_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._probe_task = None
+
+    def request_probe(self) -> None:
+        """Ask the background loop to re-probe now instead of at the next interval."""
+        self._wakeup.set()
+
+    async def probe(self) -> ChatterBoxHealth:
+        """Probe ChatterBox now, joining a probe that is already in flight."""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe())
+        return await asyncio.shield(self._probe_task)
+
+    async def _probe(self) -> ChatterBoxHealth:
+        available = await self.chatterbox.check_health()
+        if available != self.health.available or self.health.checked_at is None:
+            state = "available" if available else "unavailable"
+            logger.info(f"ChatterBox at {self.base_url} is {state}")
+        self.health = ChatterBoxHealth(available, datetime.now(timezone.utc))
+        return self.health
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            await self.probe()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
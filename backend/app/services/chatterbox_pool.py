@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.services.chatterbox_service import ChatterBoxService, reference_voice_name
+from app.utils.exceptions import ExternalAPIError
+from app.utils.streams import aclosing
+
+logger = logging.getLogger(__name__)
+
+# Successful requests per backend kept for latency percentiles
+LATENCY_WINDOW = 256
+# A backend that holds the custom voice counts as this many requests less
+# busy, about what uploading the voice to another one costs
+VOICE_AFFINITY_BONUS = 1
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops sending requests to a backend that keeps failing.
+
+    ``failure_threshold`` consecutive failures open the breaker: the backend
+    gets no requests for ``cooldown`` seconds. It is half-open after that and
+    lets a single trial request through, whose success closes the breaker
+    and whose failure opens it for another cooldown.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        cooldown: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if self._clock() - self._opened_at < self.cooldown:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    @property
+    def available(self) -> bool:
+        """Whether a request may be sent now."""
+        state = self.state
+        return state is CircuitState.CLOSED or (state is CircuitState.HALF_OPEN and not self._trial)
+
+    def on_dispatch(self) -> None:
+        if self.state is CircuitState.HALF_OPEN:
+            self._trial = True
+
+    def on_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def on_failure(self) -> None:
+        self.failures += 1
+        self._trial = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+
+    def on_abandon(self) -> None:
+        """A request ended without telling whether the backend works, e.g. it was cancelled."""
+        self._trial = False
+
+
+@dataclass
+class ChatterBoxBackendStats:
+    """Point-in-time gauges and counters of a ChatterBoxBackend."""
+
+    url: str
+    state: str
+    outstanding: int
+    requests: int
+    failures: int
+    reference_voices: int
+    avg_latency_seconds: float
+    p50_latency_seconds: float
+    p95_latency_seconds: float
+
+
+class ChatterBoxBackend:
+    """One ChatterBox server, with the state shared by all requests to it."""
+
+    def __init__(
+        self, url: str, breaker: CircuitBreaker, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.url = url
+        self.breaker = breaker
+        self._clock = clock
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        # Custom voices uploaded to the server (see ChatterBoxService)
+        self.reference_voices: set[str] = set()
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count a request as outstanding and feed its outcome to the breaker."""
+        self.breaker.on_dispatch()
+        self.outstanding += 1
+        self.requests += 1
+        started = self._clock()
+        try:
+            yield
+        except ExternalAPIError as e:
+            if is_backend_failure(e):
+                self.failures += 1
+                self._on_failure()
+            else:
+                # The server answered, so it works; the request was at fault
+                self._on_success()
+            raise
+        except BaseException:
+            self.breaker.on_abandon()
+            raise
+        else:
+            self._latencies.append(self._clock() - started)
+            self._on_success()
+        finally:
+            self.outstanding -= 1
+
+    def stats(self) -> ChatterBoxBackendStats:
+        latencies = sorted(self._latencies)
+        return ChatterBoxBackendStats(
+            url=self.url,
+            state=self.breaker.state.value,
+            outstanding=self.outstanding,
+            requests=self.requests,
+            failures=self.failures,
+            reference_voices=len(self.reference_voices),
+            avg_latency_seconds=sum(latencies) / len(latencies) if latencies else 0.0,
+            p50_latency_seconds=_percentile(latencies, 0.5),
+            p95_latency_seconds=_percentile(latencies, 0.95),
+        )
+
+    def _on_success(self) -> None:
+        if self.breaker.state is not CircuitState.CLOSED:
+            logger.info(f"ChatterBox at {self.url} recovered")
+        self.breaker.on_success()
+
+    def _on_failure(self) -> None:
+        was_closed = self.breaker.state is CircuitState.CLOSED
+        self.breaker.on_failure()
+        if self.breaker.state is CircuitState.OPEN:
+            cause = "failures" if was_closed else "failure of the trial request"
+            logger.warning(
+                f"ChatterBox at {self.url} skipped for {self.breaker.cooldown:.0f}s after {cause}"
+            )
+
+
+class ChatterBoxBackends:
+    """Application-wide state of the ChatterBox servers, by URL.
+
+    Backends are created on first use with their own circuit breaker, so the
+    configured URLs can change at runtime. All requests share ``client``.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._backends: dict[str, ChatterBoxBackend] = {}
+
+    def get(self, url: str) -> ChatterBoxBackend:
+        url = url.rstrip("/")
+        backend = self._backends.get(url)
+        if backend is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.cooldown, self._clock)
+            backend = self._backends[url] = ChatterBoxBackend(url, breaker, self._clock)
+        return backend
+
+    def pool(self, urls: Iterable[str]) -> ChatterBoxPool:
+        return ChatterBoxPool([self.get(url) for url in urls], self.client)
+
+
+class ChatterBoxPool:
+    """ChatterBox calls dispatched across several servers, with failover.
+
+    Offers the TTS calls of ChatterBoxService. Each goes to the available
+    backend with the fewest outstanding requests, counting backends that
+    already hold the custom voice as less busy. A request that finds its
+    backend unreachable, timed out or failing with a 5xx before any audio
+    arrived is tried on the next one.
+    """
+
+    def __init__(self, backends: list[ChatterBoxBackend], client: httpx.AsyncClient) -> None:
+        self.backends = backends
+        self.client = client
+
+    @property
+    def base_url(self) -> str:
+        return ", ".join(backend.url for backend in self.backends)
+
+    def service(self, backend: ChatterBoxBackend) -> ChatterBoxService:
+        return ChatterBoxService(
+            backend.url, client=self.client, reference_voices=backend.reference_voices
+        )
+
+    def select(
+        self, voice_name: Optional[str] = None, exclude: Iterable[str] = ()
+    ) -> Optional[ChatterBoxBackend]:
+        """Least busy available backend, or None if all are excluded or open."""
+        candidates = [
+            (i, backend)
+            for i, backend in enumerate(self.backends)
+            if backend.url not in exclude and backend.breaker.available
+        ]
+        if not candidates:
+            return None
+
+        def load(candidate: tuple[int, ChatterBoxBackend]) -> tuple[int, bool, int]:
+            i, backend = candidate
+            holds_voice = voice_name in backend.reference_voices
+            bonus = VOICE_AFFINITY_BONUS if holds_voice else 0
+            return backend.outstanding - bonus, not holds_voice, i
+
+        return min(candidates, key=load)[1]
+
+    async def generate_tts(
+        self,
+        text: str,
+        voice: str = "Emily.wav",
+        output_path: Optional[Path] = None,
+        speed: float = 1.0,
+        custom_voice_path: Optional[str] = None,
+        temperature: Optional[float] = None,
+        exaggeration: Optional[float] = None,
+        cfg_weight: Optional[float] = None,
+    ) -> Path:
+        """Generate TTS audio on the least busy server; see ChatterBoxService.generate_tts."""
+        voice_name = await reference_voice_name(custom_voice_path) if custom_voice_path else None
+        tried: set[str] = set()
+        while True:
+            backend = self._dispatch(voice_name, tried)
+            try:
+                with backend.track():
+                    return await self.service(backend).generate_tts(
+                        text,
+                        voice=voice,
+                        output_path=output_path,
+                        speed=speed,
+                        custom_voice_path=custom_voice_path,
+                        temperature=temperature,
+                        exaggeration=exaggeration,
+                        cfg_weight=cfg_weight,
+                    )
+            except ExternalAPIError as e:
+                if not self._should_fail_over(e, voice_name, tried):
+                    raise
+                logger.warning(f"ChatterBox at {backend.url} failed; trying another server: {e}")
+
+    async def stream_tts(
+        self,
+        text: str,
+        voice: str = "Emily.wav",
+        speed: float = 1.0,
+        custom_voice_path: Optional[str] = None,
+        temperature: Optional[float] = None,
+        exaggeration: Optional[float] = None,
+        cfg_weight: Optional[float] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream TTS audio from the least busy server; see ChatterBoxService.stream_tts.
+
+        Fails over only until the first chunk, as the audio cannot be resumed.
+        """
+        voice_name = await reference_voice_name(custom_voice_path) if custom_voice_path else None
+        tried: set[str] = set()
+        while True:
+            backend = self._dispatch(voice_name, tried)
+            streaming = False
+            try:
+                with backend.track():
+                    audio = self.service(backend).stream_tts(
+                        text,
+                        voice=voice,
+                        speed=speed,
+                        custom_voice_path=custom_voice_path,
+                        temperature=temperature,
+                        exaggeration=exaggeration,
+                        cfg_weight=cfg_weight,
+                    )
+                    async with aclosing(audio):
+                        async for chunk in audio:
+                            streaming = True
+                            yield chunk
+                return
+            except ExternalAPIError as e:
+                if streaming or not self._should_fail_over(e, voice_name, tried):
+                    raise
+                logger.warning(f"ChatterBox at {backend.url} failed; trying another server: {e}")
+
+    async def check_health(self) -> bool:
+        """Whether any server is healthy; all are probed at once."""
+        results = await asyncio.gather(
+            *(self.service(backend).check_health() for backend in self.backends)
+        )
+        return any(results)
+
+    def _dispatch(self, voice_name: Optional[str], tried: set[str]) -> ChatterBoxBackend:
+        backend = self.select(voice_name, exclude=tried)
+        if backend is None:
+            raise ExternalAPIError(f"No ChatterBox server available at {self.base_url}")
+        tried.add(backend.url)
+        return backend
+
+    def _should_fail_over(
+        self, error: ExternalAPIError, voice_name: Optional[str], tried: set[str]
+    ) -> bool:
+        return is_backend_failure(error) and self.select(voice_name, exclude=tried) is not None
+
+
+def is_backend_failure(error: ExternalAPIError) -> bool:
+    """Whether ChatterBox itself failed (unreachable, timed out, 5xx), not the request."""
+    cause = error.__cause__
+    if isinstance(cause, httpx.HTTPStatusError):
+        return cause.response.status_code >= 500
+    return isinstance(cause, httpx.RequestError)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
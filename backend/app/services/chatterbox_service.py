@@ -1,27 +1,83 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-import uuid
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import Optional
 
 import aiofiles
 import httpx
 
+from app.config import Settings
+from app.utils.atomic_write import write_stream_atomic
+from app.utils.disk_cache import file_digest
 from app.utils.exceptions import ExternalAPIError, ProcessingError
 
 logger = logging.getLogger(__name__)
 
+# Health checks should fail fast, whatever the TTS timeout is
+HEALTH_CHECK_TIMEOUT = 3.0
+
+
+def create_chatterbox_client(settings: Settings) -> httpx.AsyncClient:
+    """Create the pooled HTTP client shared by all ChatterBox requests.
+
+    The caller owns the client and must close it (see ``main.lifespan``).
+    """
+    http2 = settings.chatterbox_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("CHATTERBOX_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        # A server that is down should not cost the full synthesis timeout
+        timeout=httpx.Timeout(
+            settings.chatterbox_timeout, connect=settings.chatterbox_connect_timeout
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.chatterbox_max_connections,
+            max_keepalive_connections=settings.chatterbox_max_keepalive_connections,
+            keepalive_expiry=settings.chatterbox_keepalive_expiry,
+        ),
+        http2=http2,
+    )
+
+
+async def reference_voice_name(custom_voice_path: str) -> str:
+    """Name of a custom voice file on ChatterBox servers, derived from its content."""
+    try:
+        digest = await asyncio.to_thread(file_digest, custom_voice_path)
+    except OSError as e:
+        raise ProcessingError(f"Audio file not found: {custom_voice_path}") from e
+    return f"bobbervox_custom_{digest[:32]}.wav"
+
 
 class ChatterBoxService:
-    """Service for ChatterBox TTS API interactions."""
+    """Service for ChatterBox TTS API interactions.
+
+    Requests go through ``client``, normally the application-wide pooled
+    client, so connections are kept alive across requests. Without one, the
+    service creates a private client that ``close`` releases.
+
+    Custom voices are uploaded under a name derived from their content.
+    ``reference_voices`` holds the names known to be on the server, so
+    those are not uploaded again.
+    """
 
     def __init__(
         self,
         base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        reference_voices: Optional[set[str]] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client = client
+        self._owns_client = client is None
+        self.reference_voices = reference_voices if reference_voices is not None else set()
 
     @property
     def client(self) -> httpx.AsyncClient:
@@ -30,8 +86,8 @@ class ChatterBoxService:
         return self._client
 
     async def close(self) -> None:
-        """Close the HTTP client."""
-        if self._client:
+        """Close the HTTP client if this service created it."""
+        if self._client and self._owns_client:
             await self._client.aclose()
             self._client = None
 
@@ -81,8 +137,7 @@ class ChatterBoxService:
         except httpx.RequestError as e:
             logger.error(f"ChatterBox connection error during upload: {e}")
             raise ExternalAPIError(
-                f"Failed to connect to ChatterBox server at {self.base_url}. "
-                "Is the server running?"
+                f"Failed to connect to ChatterBox server at {self.base_url}. Is the server running?"
             ) from e
 
     async def generate_tts(
@@ -114,25 +169,58 @@ class ChatterBoxService:
         Returns:
             Path to the generated audio file
         """
-        if not text.strip():
-            raise ProcessingError("Text cannot be empty")
-
         if output_path is None:
             raise ProcessingError("Output path must be specified")
 
+        # ChatterBox returns WAV; an MP3 path (OpenAI naming) is saved as WAV
+        # with the same name
+        if output_path.suffix.lower() == ".mp3":
+            output_path = output_path.with_suffix(".wav")
+
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Streamed to disk so memory use does not grow with the audio length
+        audio = self.stream_tts(
+            text,
+            voice=voice,
+            speed=speed,
+            custom_voice_path=custom_voice_path,
+            temperature=temperature,
+            exaggeration=exaggeration,
+            cfg_weight=cfg_weight,
+        )
+        await write_stream_atomic(output_path, audio)
+        return output_path
+
+    async def stream_tts(
+        self,
+        text: str,
+        voice: str = "Emily.wav",
+        speed: float = 1.0,
+        custom_voice_path: Optional[str] = None,
+        temperature: Optional[float] = None,
+        exaggeration: Optional[float] = None,
+        cfg_weight: Optional[float] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream WAV audio from ChatterBox as the server sends it.
+
+        Takes the same arguments as ``generate_tts``, without ``output_path``.
+
+        Yields:
+            Chunks of the WAV file, as they arrive
+        """
+        if not text.strip():
+            raise ProcessingError("Text cannot be empty")
 
         # Handle custom voice by uploading to ChatterBox via API
         voice_to_use = voice
         use_clone_mode = False
 
         if custom_voice_path:
-            # Create unique filename to avoid conflicts
-            unique_name = f"bobbervox_custom_{uuid.uuid4().hex}.wav"
-
-            # Upload the custom voice via ChatterBox API
-            await self.upload_reference_audio(custom_voice_path, unique_name)
-            voice_to_use = unique_name
+            voice_to_use = await reference_voice_name(custom_voice_path)
+            if voice_to_use not in self.reference_voices:
+                # Upload the custom voice via ChatterBox API
+                await self.upload_reference_audio(custom_voice_path, voice_to_use)
+                self.reference_voices.add(voice_to_use)
             use_clone_mode = True
         else:
             # ChatterBox expects voice as filename (with or without extension)
@@ -143,75 +231,66 @@ class ChatterBoxService:
         # Use custom /tts endpoint if ChatterBox params are provided
         use_custom_endpoint = any(p is not None for p in [temperature, exaggeration, cfg_weight])
 
-        try:
-            if use_custom_endpoint:
-                # Use the full-featured /tts endpoint
-                request_data = {
-                    "text": text,
-                    "voice_mode": "clone" if use_clone_mode else "predefined",
-                    "output_format": "wav",
-                    "speed_factor": speed,
-                }
-
-                if use_clone_mode:
-                    request_data["reference_audio_filename"] = voice_to_use
-                else:
-                    request_data["predefined_voice_id"] = voice_to_use
-
-                # Add ChatterBox-specific parameters
-                if temperature is not None:
-                    request_data["temperature"] = temperature
-                if exaggeration is not None:
-                    request_data["exaggeration"] = exaggeration
-                if cfg_weight is not None:
-                    request_data["cfg_weight"] = cfg_weight
-
-                logger.info(f"ChatterBox /tts request: {request_data}")
-                response = await self.client.post(
-                    f"{self.base_url}/tts",
-                    json=request_data,
-                )
+        if use_custom_endpoint:
+            # Use the full-featured /tts endpoint
+            request_data = {
+                "text": text,
+                "voice_mode": "clone" if use_clone_mode else "predefined",
+                "output_format": "wav",
+                "speed_factor": speed,
+            }
+
+            if use_clone_mode:
+                request_data["reference_audio_filename"] = voice_to_use
             else:
-                # Use OpenAI-compatible endpoint for simple requests
-                response = await self.client.post(
-                    f"{self.base_url}/v1/audio/speech",
-                    json={
-                        "model": "chatterbox",
-                        "input": text,
-                        "voice": voice_to_use,
-                        "response_format": "wav",
-                        "speed": speed,
-                    },
-                )
-            response.raise_for_status()
+                request_data["predefined_voice_id"] = voice_to_use
+
+            # Add ChatterBox-specific parameters
+            if temperature is not None:
+                request_data["temperature"] = temperature
+            if exaggeration is not None:
+                request_data["exaggeration"] = exaggeration
+            if cfg_weight is not None:
+                request_data["cfg_weight"] = cfg_weight
+
+            logger.info(f"ChatterBox /tts request: {request_data}")
+            url = f"{self.base_url}/tts"
+        else:
+            # Use OpenAI-compatible endpoint for simple requests
+            request_data = {
+                "model": "chatterbox",
+                "input": text,
+                "voice": voice_to_use,
+                "response_format": "wav",
+                "speed": speed,
+            }
+            url = f"{self.base_url}/v1/audio/speech"
+
+        try:
+            async with self.client.stream("POST", url, json=request_data) as response:
+                if response.is_error:
+                    # Error bodies are small; read them for the message
+                    await response.aread()
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    yield chunk
         except httpx.HTTPStatusError as e:
             logger.error(f"ChatterBox API error: {e.response.status_code} - {e.response.text}")
+            if use_clone_mode:
+                # The server may have lost the file, e.g. on a restart; upload it next time
+                self.reference_voices.discard(voice_to_use)
             raise ExternalAPIError(f"ChatterBox TTS failed: {e.response.text}") from e
         except httpx.RequestError as e:
             logger.error(f"ChatterBox connection error: {e}")
             raise ExternalAPIError(
-                f"Failed to connect to ChatterBox server at {self.base_url}. "
-                "Is the server running?"
+                f"Failed to connect to ChatterBox server at {self.base_url}. Is the server running?"
             ) from e
 
-        # Write the audio to file (ChatterBox returns WAV)
-        # Convert to MP3 path if needed for consistency with OpenAI output
-        if output_path.suffix.lower() == ".mp3":
-            # Save as WAV with same name
-            wav_path = output_path.with_suffix(".wav")
-            wav_path.write_bytes(response.content)
-            return wav_path
-        else:
-            output_path.write_bytes(response.content)
-            return output_path
-
     async def check_health(self) -> bool:
         """Check if ChatterBox server is healthy."""
         try:
-            # Use short timeout for health checks
-            async with httpx.AsyncClient(timeout=3.0) as client:
-                response = await client.get(f"{self.base_url}/docs")
-                return response.status_code == 200
+            response = await self.client.get(f"{self.base_url}/docs", timeout=HEALTH_CHECK_TIMEOUT)
+            return response.status_code == 200
         except Exception:
             return False
 
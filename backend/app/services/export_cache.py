@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+
+from app.config import Settings
+from app.utils.disk_cache import evict_lru, touch_cached
+from app.utils.zip_stream import ZipStream
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCache:
+    """Content-addressed, size-bounded cache of ZIP exports.
+
+    Archives are named by a hash of their entries' names, sizes and
+    modification times, so an archive is rebuilt only when an output file
+    changed. The hash doubles as the archive's ETag. When the cache outgrows
+    ``export_cache_max_mb``, the least recently served archives are removed,
+    regardless of project.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.cache_dir = settings.cache_dir / "exports"
+
+    @staticmethod
+    def key_for(archive: ZipStream) -> str:
+        digest = hashlib.sha256()
+        for entry in archive.entries:
+            digest.update(f"{entry.name}\0{entry.size}\0{entry.mtime!r}\n".encode())
+        return digest.hexdigest()[:32]
+
+    def get_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.zip"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the cached archive for ``key`` and mark it as recently used."""
+        path = self.get_path(key)
+        return path if touch_cached(path) else None
+
+    async def stream_and_store(self, archive: ZipStream) -> AsyncIterator[bytes]:
+        """Stream ``archive`` while writing it to the cache.
+
+        The archive is only added to the cache once it was streamed completely;
+        an aborted download leaves nothing behind. Concurrent misses for the
+        same archive each write a private temporary file.
+        """
+        path = self.get_path(self.key_for(archive))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for data in archive:
+                    await f.write(data)
+                    yield data
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        logger.info(f"Cached export archive {path.name} ({len(archive.entries)} files)")
+        max_bytes = self.settings.export_cache_max_mb * 1024 * 1024
+        await asyncio.to_thread(evict_lru, self.cache_dir, "*.zip", max_bytes, path)
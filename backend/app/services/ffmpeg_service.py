@@ -1,35 +1,164 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
+from collections.abc import AsyncIterator
 from pathlib import Path
+from typing import Optional
 
 from app.config import Settings
+from app.services.process_scheduler import (
+    JobPriority,
+    ProcessScheduler,
+    get_process_scheduler,
+    get_stream_scheduler,
+)
 from app.utils.exceptions import ProcessingError
 
 logger = logging.getLogger(__name__)
 
 
+# Encoder options of the compressed formats audio can be delivered in. The
+# muxer is explicit because outputs are written under temporary names.
+TRANSCODE_FORMATS = {
+    "opus": ["-c:a", "libopus", "-b:a", "96k", "-f", "ogg"],
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "4", "-f", "mp3"],
+}
+
+
+class AudioStreamWriter:
+    """Feeds source video bytes to an FFmpeg process reading from stdin.
+
+    If FFmpeg stops reading early (e.g. an MP4 whose index is at the end of
+    the file cannot be demuxed from a pipe), further writes are dropped and
+    ``failed`` is set; the caller can then extract from the saved file.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        self.process = process
+        self.failed = False
+
+    async def write(self, chunk: bytes) -> None:
+        stdin = self.process.stdin
+        if self.failed or stdin is None:
+            return
+        try:
+            stdin.write(chunk)
+            await stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            self.failed = True
+
+    async def close(self) -> None:
+        stdin = self.process.stdin
+        if stdin is None or stdin.is_closing():
+            return
+        with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+            stdin.close()
+            await stdin.wait_closed()
+
+
 class FFmpegService:
     """Service for FFmpeg audio operations using async subprocess."""
 
-    def __init__(self, settings: Settings) -> None:
+    # Each output keeps a file descriptor open inside ffmpeg, so very large
+    # batches are split into several passes to stay well below fd limits.
+    max_outputs_per_pass = 256
+
+    def __init__(
+        self,
+        settings: Settings,
+        scheduler: Optional[ProcessScheduler] = None,
+        stream_scheduler: Optional[ProcessScheduler] = None,
+    ) -> None:
         self.settings = settings
+        self.scheduler = scheduler or get_process_scheduler()
+        self.stream_scheduler = stream_scheduler or get_stream_scheduler()
+
+    async def _run_process(
+        self,
+        cmd: list[str],
+        priority: JobPriority,
+        timeout: float,
+    ) -> tuple[int, bytes, bytes]:
+        """Run a command once the scheduler admits it, killing it after timeout seconds.
 
-    async def _run_ffmpeg(self, args: list[str]) -> None:
-        """Run FFmpeg command asynchronously."""
+        Returns:
+            Return code, stdout and stderr of the process
+        """
+        async with self.scheduler.slot(priority):
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                await self._stop_process(process)
+                self.scheduler.record_timeout()
+                logger.error(f"{cmd[0]} timed out after {timeout}s")
+                raise ProcessingError(f"{cmd[0]} timed out after {timeout:g} seconds") from None
+            except asyncio.CancelledError:
+                # Client went away: stop the child instead of letting it run to completion.
+                # Shielded so a second cancellation cannot leave an unreaped process behind.
+                logger.info(f"Cancelled, stopping {cmd[0]} (pid {process.pid})")
+                await asyncio.shield(self._stop_process(process))
+                raise
+
+        assert process.returncode is not None
+        return process.returncode, stdout, stderr
+
+    async def _stop_process(self, process: asyncio.subprocess.Process) -> None:
+        """Terminate a process, kill it if it outlives the grace period, then reap it."""
+        if process.returncode is not None:
+            return
+        with contextlib.suppress(ProcessLookupError):
+            process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), self.settings.ffmpeg_kill_grace_period)
+        except asyncio.TimeoutError:
+            logger.warning(f"Process {process.pid} ignored SIGTERM, killing it")
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+            await process.wait()
+
+    @staticmethod
+    def _remove_outputs(outputs: list[Path]) -> None:
+        """Delete partially written output files."""
+        for output_path in outputs:
+            try:
+                output_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove partial output {output_path}: {e}")
+
+    async def _run_ffmpeg(
+        self,
+        args: list[str],
+        priority: JobPriority = JobPriority.EXTRACTION,
+        timeout: Optional[float] = None,
+        outputs: Optional[list[Path]] = None,
+    ) -> None:
+        """Run FFmpeg command asynchronously.
+
+        Files listed in ``outputs`` are removed if FFmpeg fails, times out or
+        is cancelled, so no truncated audio is left behind.
+        """
         cmd = ["ffmpeg", "-y", *args]
         logger.debug(f"Running FFmpeg: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        stdout, stderr = await process.communicate()
+        try:
+            returncode, _, stderr = await self._run_process(
+                cmd,
+                priority,
+                timeout if timeout is not None else self.settings.ffmpeg_extract_timeout,
+            )
+        except BaseException:
+            self._remove_outputs(outputs or [])
+            raise
 
-        if process.returncode != 0:
+        if returncode != 0:
+            self._remove_outputs(outputs or [])
             error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
             logger.error(f"FFmpeg failed: {error_msg}")
             raise ProcessingError(f"FFmpeg processing failed: {error_msg[:500]}")
@@ -49,9 +178,77 @@ class FFmpegService:
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        args = [
+        args = ["-i", str(video_path), *self._audio_output_args(output_path)]
+
+        await self._run_ffmpeg(args, outputs=[output_path])
+        return output_path
+
+    @contextlib.asynccontextmanager
+    async def extract_audio_from_stream(
+        self, output_path: Path
+    ) -> AsyncIterator[AudioStreamWriter]:
+        """Extract audio as WAV while the source video is still arriving.
+
+        FFmpeg reads the video from stdin; bytes written to the yielded writer
+        are piped to it. When the block exits, stdin is closed and FFmpeg is
+        awaited, so the WAV is complete once the upload is.
+
+        The process runs for as long as the upload takes, so it is admitted by
+        ``stream_scheduler`` rather than the shared scheduler, whose slots are
+        meant for CPU-bound work such as segment cuts.
+
+        Args:
+            output_path: Path where WAV file will be written
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-nostats",
+            "-loglevel",
+            "error",
             "-i",
-            str(video_path),
+            "pipe:0",
+            *self._audio_output_args(output_path),
+        ]
+        logger.debug(f"Running FFmpeg: {' '.join(cmd)}")
+        timeout = self.settings.ffmpeg_extract_timeout
+
+        async with self.stream_scheduler.slot(JobPriority.EXTRACTION):
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            assert process.stderr is not None
+            # Drain stderr concurrently so FFmpeg never blocks on a full pipe
+            stderr_task = asyncio.ensure_future(process.stderr.read())
+            writer = AudioStreamWriter(process)
+            try:
+                yield writer
+                await writer.close()
+                await asyncio.wait_for(process.wait(), timeout)
+            except BaseException as e:
+                await asyncio.shield(self._stop_process(process))
+                stderr_task.cancel()
+                self._remove_outputs([output_path])
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stream_scheduler.record_timeout()
+                    raise ProcessingError(f"ffmpeg timed out after {timeout:g} seconds") from None
+                raise
+            stderr = await stderr_task
+
+        if process.returncode != 0 or writer.failed:
+            self._remove_outputs([output_path])
+            error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
+            logger.error(f"FFmpeg failed: {error_msg}")
+            raise ProcessingError(f"FFmpeg processing failed: {error_msg[:500]}")
+
+    @staticmethod
+    def _audio_output_args(output_path: Path) -> list[str]:
+        """Build output-side FFmpeg options for the full project audio."""
+        return [
             "-vn",  # No video
             "-acodec",
             "pcm_s16le",  # 16-bit PCM
@@ -59,12 +256,11 @@ class FFmpegService:
             "44100",  # 44.1kHz sample rate
             "-ac",
             "2",  # Stereo
+            "-f",
+            "wav",  # Not inferred from the name, which may be temporary
             str(output_path),
         ]
 
-        await self._run_ffmpeg(args)
-        return output_path
-
     async def extract_segment(
         self,
         audio_path: Path,
@@ -86,21 +282,110 @@ class FFmpegService:
         if not audio_path.exists():
             raise ProcessingError(f"Audio file not found: {audio_path}")
 
-        if start_time < 0:
-            raise ProcessingError("Start time cannot be negative")
-        if end_time <= start_time:
-            raise ProcessingError("End time must be greater than start time")
-
+        self._validate_segment_times(start_time, end_time)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        duration = end_time - start_time
 
         args = [
             "-i",
             str(audio_path),
+            *self._segment_output_args(output_path, start_time, end_time),
+        ]
+
+        await self._run_ffmpeg(
+            args,
+            priority=JobPriority.SEGMENT,
+            timeout=self.settings.ffmpeg_segment_timeout,
+            outputs=[output_path],
+        )
+        return output_path
+
+    async def extract_segments(
+        self,
+        audio_path: Path,
+        segments: list[tuple[Path, float, float]],
+    ) -> list[Path]:
+        """Extract many segments from an audio file in a single decode pass.
+
+        The source is opened and decoded once; every segment is written as a
+        separate output of the same FFmpeg invocation.
+
+        Args:
+            audio_path: Path to source audio file
+            segments: (output_path, start_time, end_time) for each segment
+
+        Returns:
+            Paths to extracted segment files, in the order given
+        """
+        if not audio_path.exists():
+            raise ProcessingError(f"Audio file not found: {audio_path}")
+
+        for output_path, start_time, end_time in segments:
+            self._validate_segment_times(start_time, end_time)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        step = self.max_outputs_per_pass
+        for offset in range(0, len(segments), step):
+            batch = segments[offset : offset + step]
+            args = ["-i", str(audio_path)]
+            for output_path, start_time, end_time in batch:
+                args += [
+                    "-map",
+                    "0:a",
+                    *self._segment_output_args(output_path, start_time, end_time),
+                ]
+            await self._run_ffmpeg(
+                args,
+                priority=JobPriority.SEGMENT,
+                timeout=self.settings.ffmpeg_segment_timeout,
+                outputs=[output_path for output_path, _, _ in batch],
+            )
+
+        return [output_path for output_path, _, _ in segments]
+
+    async def transcode_audio(self, input_path: Path, output_path: Path, audio_format: str) -> Path:
+        """Encode audio into a compressed delivery format.
+
+        Args:
+            input_path: Path to source audio file
+            output_path: Path where the encoded file will be written
+            audio_format: Key of TRANSCODE_FORMATS
+
+        Returns:
+            Path to encoded file
+        """
+        if audio_format not in TRANSCODE_FORMATS:
+            raise ProcessingError(f"Unsupported audio format: {audio_format}")
+        if not input_path.exists():
+            raise ProcessingError(f"Audio file not found: {input_path}")
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        args = [
+            "-i",
+            str(input_path),
+            "-vn",
+            *TRANSCODE_FORMATS[audio_format],
+            str(output_path),
+        ]
+
+        # Someone is waiting to play this, so it runs ahead of full extractions
+        await self._run_ffmpeg(args, priority=JobPriority.SEGMENT, outputs=[output_path])
+        return output_path
+
+    @staticmethod
+    def _validate_segment_times(start_time: float, end_time: float) -> None:
+        if start_time < 0:
+            raise ProcessingError("Start time cannot be negative")
+        if end_time <= start_time:
+            raise ProcessingError("End time must be greater than start time")
+
+    @staticmethod
+    def _segment_output_args(output_path: Path, start_time: float, end_time: float) -> list[str]:
+        """Build output-side FFmpeg options for one segment."""
+        return [
             "-ss",
             str(start_time),
             "-t",
-            str(duration),
+            str(end_time - start_time),
             "-acodec",
             "pcm_s16le",
             "-ar",
@@ -110,9 +395,6 @@ class FFmpegService:
             str(output_path),
         ]
 
-        await self._run_ffmpeg(args)
-        return output_path
-
     @staticmethod
     def format_segment_filename(start_time: float) -> str:
         """Format segment filename from timestamp.
@@ -142,15 +424,11 @@ class FFmpegService:
             str(audio_path),
         ]
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run_process(
+            cmd, JobPriority.PROBE, self.settings.ffprobe_timeout
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown ffprobe error"
             raise ProcessingError(f"Could not get audio duration: {error_msg}")
 
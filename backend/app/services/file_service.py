@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import shutil
+from collections.abc import AsyncIterator, Awaitable, Callable
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Optional
 
 import aiofiles
 
@@ -49,26 +50,96 @@ class FileService:
         dest_filename = f"video{ext}"
         dest_path = source_dir / dest_filename
 
-        async with aiofiles.open(dest_path, "wb") as out_file:
-            while chunk := file.read(8192):
-                await out_file.write(chunk)
+        max_size = self.settings.max_upload_size_bytes
+        size = 0
+
+        try:
+            async with aiofiles.open(dest_path, "wb") as out_file:
+                while chunk := file.read(8192):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise self._size_error()
+                    await out_file.write(chunk)
+        except BaseException:
+            dest_path.unlink(missing_ok=True)
+            raise
 
         return str(dest_path.relative_to(self.settings.projects_dir))
 
+    async def save_stream(
+        self,
+        project_id: str,
+        stream: AsyncIterator[bytes],
+        filename: str,
+        on_chunk: Optional[Callable[[bytes], Awaitable[None]]] = None,
+    ) -> str:
+        """Save an upload as it arrives, without spooling it first.
+
+        Args:
+            project_id: Project the video belongs to
+            stream: Raw body chunks
+            filename: Client filename, used only for its extension
+            on_chunk: Called with every chunk after it is written to disk
+
+        Returns:
+            Path of the saved video relative to the projects directory
+        """
+        ext = self.validate_video_extension(filename)
+        source_dir = self.get_source_path(project_id)
+        source_dir.mkdir(parents=True, exist_ok=True)
+
+        dest_path = source_dir / f"video{ext}"
+        # Written under a temporary name so a failed upload keeps the previous video
+        partial_path = dest_path.with_name(f"{dest_path.name}.part")
+        max_size = self.settings.max_upload_size_bytes
+        size = 0
+
+        try:
+            async with aiofiles.open(partial_path, "wb") as out_file:
+                async for chunk in stream:
+                    size += len(chunk)
+                    if size > max_size:
+                        raise self._size_error()
+                    await out_file.write(chunk)
+                    if on_chunk is not None:
+                        await on_chunk(chunk)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        partial_path.replace(dest_path)
+
+        return str(dest_path.relative_to(self.settings.projects_dir))
+
+    def _size_error(self) -> FileValidationError:
+        return FileValidationError(
+            f"File exceeds maximum upload size of {self.settings.max_upload_size_mb} MB"
+        )
+
     def delete_project_files(self, project_id: str) -> None:
         project_path = self.get_project_path(project_id)
         if project_path.exists():
             shutil.rmtree(project_path)
 
+    def resolve_file_path(
+        self,
+        project_id: str,
+        subdir: str,
+        filename: str,
+    ) -> Path:
+        """Path of a project file, rejecting names that escape the subdirectory."""
+        base_dir = (self.get_project_path(project_id) / subdir).resolve()
+        file_path = (base_dir / filename).resolve()
+        if not file_path.is_relative_to(base_dir):
+            raise FileValidationError("Invalid file path")
+        return file_path
+
     def get_file_path(
         self,
         project_id: str,
         subdir: str,
         filename: str,
     ) -> Path:
-        base_path = self.get_project_path(project_id) / subdir / filename
-        if not base_path.exists():
+        file_path = self.resolve_file_path(project_id, subdir, filename)
+        if not file_path.exists():
             raise FileValidationError(f"File not found: {filename}")
-        if not base_path.is_relative_to(self.get_project_path(project_id)):
-            raise FileValidationError("Invalid file path")
-        return base_path
+        return file_path
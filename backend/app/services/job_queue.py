@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.models import Job, JobKind, JobStatus, Segment, SegmentStatus
+from app.models.job import JOB_SEGMENT_STATUS
+from app.repositories.job_repo import JobRepository
+from app.repositories.segment_repo import SegmentRepository
+from app.utils.exceptions import (
+    BobberVoxException,
+    ConflictError,
+    ExternalAPIError,
+    ProcessingError,
+)
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, Job], Awaitable[None]]
+SessionFactory = Callable[[], contextlib.AbstractAsyncContextManager[AsyncSession]]
+
+
+def utcnow() -> datetime:
+    """Current UTC time, naive like the values of DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Provider errors and unexpected ones may pass; our own validation errors will not."""
+    return isinstance(error, ExternalAPIError) or not isinstance(error, BobberVoxException)
+
+
+def create_job_queue(
+    session_factory: SessionFactory, handlers: Mapping[JobKind, JobHandler], settings: Settings
+) -> JobQueue:
+    """Create the application-wide job queue; ``main.lifespan`` starts and stops it."""
+    return JobQueue(
+        session_factory,
+        handlers,
+        workers=settings.job_workers,
+        max_attempts=settings.job_max_attempts,
+        lease=settings.job_lease_seconds,
+        retry_base_delay=settings.job_retry_base_delay,
+        retry_max_delay=settings.job_retry_max_delay,
+        poll_interval=settings.job_poll_interval,
+    )
+
+
+class JobQueue:
+    """Durable queue of segment jobs, stored in the ``jobs`` table.
+
+    Jobs run at least once: a worker claims a job with a lease, renewed
+    while the job runs, and a job whose worker died mid-run is picked up
+    again when the lease expires, so handlers must be safe to repeat. A
+    segment has at most one queued or running job of each kind. Failed attempts are retried with
+    exponential backoff, except for errors a retry cannot fix (missing
+    audio, invalid input).
+
+    While a job is queued, running or waiting for a retry, its segment has
+    the matching in-progress status (``JOB_SEGMENT_STATUS``). It ends as the
+    handler leaves it, or as ``error`` once the job has failed for good.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        handlers: Mapping[JobKind, JobHandler],
+        workers: int = 2,
+        max_attempts: int = 3,
+        lease: float = 900.0,
+        retry_base_delay: float = 5.0,
+        retry_max_delay: float = 300.0,
+        poll_interval: float = 1.0,
+        clock: Callable[[], datetime] = utcnow,
+    ) -> None:
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running go back to the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers instead of letting them wait for the next poll."""
+        self._wakeup.set()
+
+    async def enqueue(
+        self,
+        session: AsyncSession,
+        kind: JobKind,
+        segment: Segment,
+        user_id: str,
+        payload: Optional[dict[str, Any]] = None,
+        **segment_values: Any,
+    ) -> Job:
+        """Queue a job for ``segment`` and commit it together with the segment's new status.
+
+        Args:
+            session: Session to create the job in; it is committed
+            kind: What to do with the segment
+            segment: The segment to work on
+            user_id: Owner of the segment, whose settings the job uses
+            payload: Request options for the handler
+            **segment_values: Other segment fields to set right away (e.g. tts_voice)
+
+        Raises:
+            ConflictError: If the segment already has a queued or running job of ``kind``
+        """
+        jobs = JobRepository(session)
+        active = await jobs.get_active(segment.id, kind)
+        if active is not None:
+            raise self._conflict(segment, kind, active.id)
+        try:
+            job = await jobs.create(
+                kind,
+                user_id,
+                segment.id,
+                max_attempts=self.max_attempts,
+                run_after=self.clock(),
+                payload=payload,
+            )
+        except IntegrityError:
+            # Queued by a concurrent request since the check above
+            raise self._conflict(segment, kind) from None
+        await SegmentRepository(session).update(
+            segment, status=JOB_SEGMENT_STATUS[kind], error_message=None, **segment_values
+        )
+        await session.commit()
+        self.notify()
+        return job
+
+    @staticmethod
+    def _conflict(segment: Segment, kind: JobKind, job_id: Optional[str] = None) -> ConflictError:
+        job = f"job {job_id}" if job_id else "a job"
+        return ConflictError(f"Segment {segment.id} already has {job} for {kind.value} in progress")
+
+    async def run_once(self) -> bool:
+        """Claim and run the next due job; False if none is due."""
+        async with self.session_factory() as session:
+            jobs = JobRepository(session)
+            job = await jobs.claim_next(self.clock(), timedelta(seconds=self.lease))
+            if job is None:
+                await session.rollback()
+                return False
+            await jobs.commit()
+            await self._execute(session, job)
+        return True
+
+    async def _execute(self, session: AsyncSession, job: Job) -> None:
+        job_id = job.id
+        logger.info(
+            f"Running {job.kind.value} job {job_id} for segment {job.segment_id} "
+            f"(attempt {job.attempts}/{job.max_attempts})"
+        )
+        try:
+            if job.attempts > job.max_attempts:
+                raise ProcessingError("Job was interrupted during its last attempt")
+            async with self._renewing_lease(job_id):
+                await self.handlers[job.kind](session, job)
+        except Exception as e:
+            await session.rollback()
+            await self._record_failure(session, job_id, e)
+            return
+        except BaseException:
+            # Stopped: hand the job back now instead of when its lease expires.
+            # Shielded so a repeated cancellation cannot leave it running.
+            await asyncio.shield(self._release(session, job_id))
+            raise
+
+        jobs = JobRepository(session)
+        await jobs.update(job, status=JobStatus.SUCCEEDED, locked_until=None, error_message=None)
+        await jobs.commit()
+
+    @contextlib.asynccontextmanager
+    async def _renewing_lease(self, job_id: str) -> AsyncIterator[None]:
+        """Keep extending the job's lease while the block runs.
+
+        Without it, a job running longer than the lease would be claimed and
+        run a second time by another worker.
+        """
+        renewal = asyncio.create_task(self._renew_lease(job_id))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+
+    async def _renew_lease(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                # Own session: the handler's may be in use at any point
+                async with self.session_factory() as session:
+                    jobs = JobRepository(session)
+                    await jobs.renew(job_id, self.clock() + timedelta(seconds=self.lease))
+                    await jobs.commit()
+            except Exception:
+                logger.exception(f"Could not renew the lease of job {job_id}")
+
+    async def _record_failure(self, session: AsyncSession, job_id: str, error: Exception) -> None:
+        jobs = JobRepository(session)
+        job = await jobs.get_by_id(job_id)
+        if job is None:
+            # Deleted with its segment
+            return
+
+        message = str(error)
+        if job.attempts < job.max_attempts and is_retryable(error):
+            delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (job.attempts - 1))
+            logger.warning(f"Job {job_id} failed, retrying in {delay:.0f}s: {message}")
+            job = await jobs.update(
+                job,
+                status=JobStatus.QUEUED,
+                run_after=self.clock() + timedelta(seconds=delay),
+                locked_until=None,
+                error_message=message,
+            )
+            segment_status = JOB_SEGMENT_STATUS[job.kind]
+        else:
+            logger.error(f"Job {job_id} failed after {job.attempts} attempts: {message}")
+            job = await jobs.update(
+                job, status=JobStatus.FAILED, locked_until=None, error_message=message
+            )
+            segment_status = SegmentStatus.ERROR
+
+        segments = SegmentRepository(session)
+        segment = await segments.get_by_id(job.segment_id)
+        if segment is not None:
+            await segments.update(segment, status=segment_status, error_message=message)
+        await jobs.commit()
+
+    async def _release(self, session: AsyncSession, job_id: str) -> None:
+        await session.rollback()
+        jobs = JobRepository(session)
+        job = await jobs.get_by_id(job_id)
+        if job is not None and job.status == JobStatus.RUNNING:
+            await jobs.update(
+                job,
+                status=JobStatus.QUEUED,
+                attempts=job.attempts - 1,
+                run_after=self.clock(),
+                locked_until=None,
+            )
+            await jobs.commit()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                ran = await self.run_once()
+            except Exception:
+                logger.exception("Job worker failed")
+                ran = False
+            if not ran:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
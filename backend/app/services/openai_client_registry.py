@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.services.openai_rate_limiter import (
+    OpenAIRateLimiter,
+    RateLimitedTransport,
+    RateLimitPolicy,
+)
+
+# What the OpenAI client uses by default
+OPENAI_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+OPENAI_CONNECTION_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+
+
+@dataclass
+class _Entry:
+    client: AsyncOpenAI
+    last_used: float
+    leases: int = 0
+    evicted: bool = False
+
+
+class OpenAIClientRegistry:
+    """Long-lived AsyncOpenAI clients, one per API key.
+
+    Reusing a client keeps its connection pool and TLS sessions warm across
+    requests. Clients are handed out as leases; at most ``max_clients`` are
+    kept (least recently used go first) and clients idle for longer than
+    ``idle_timeout`` seconds are dropped on the next access. A dropped client
+    is closed once its last lease ends, so in-flight requests are unaffected.
+
+    With ``rate_limits``, each key's requests are paced and retried by its
+    own OpenAIRateLimiter. ``transport`` replaces the network, e.g. in tests.
+    """
+
+    def __init__(
+        self,
+        max_clients: int,
+        idle_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+        rate_limits: Optional[RateLimitPolicy] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.rate_limits = rate_limits
+        self.transport = transport
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(api_key: str) -> str:
+        # Keys are held by digest so they never show up in the registry itself
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    @asynccontextmanager
+    async def lease(self, api_key: str) -> AsyncIterator[AsyncOpenAI]:
+        """Borrow the client for ``api_key``, creating it if needed."""
+        now = self._clock()
+        await self._evict_idle(now)
+
+        key = self._key(api_key)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(client=self._create_client(api_key), last_used=now)
+            self._entries[key] = entry
+            await self._evict_overflow()
+        else:
+            self._entries.move_to_end(key)
+        entry.last_used = now
+        entry.leases += 1
+
+        try:
+            yield entry.client
+        finally:
+            entry.leases -= 1
+            entry.last_used = self._clock()
+            if entry.evicted and entry.leases == 0:
+                await entry.client.close()
+
+    def _create_client(self, api_key: str) -> AsyncOpenAI:
+        if self.rate_limits is None and self.transport is None:
+            return AsyncOpenAI(api_key=api_key)
+        transport = self.transport or httpx.AsyncHTTPTransport(limits=OPENAI_CONNECTION_LIMITS)
+        if self.rate_limits is None:
+            return AsyncOpenAI(api_key=api_key, http_client=_http_client(transport))
+        limited = RateLimitedTransport(OpenAIRateLimiter(self.rate_limits), transport)
+        # Retries are up to the transport, which knows the key's budget
+        return AsyncOpenAI(api_key=api_key, http_client=_http_client(limited), max_retries=0)
+
+    async def invalidate(self, api_key: str) -> None:
+        """Drop the client for a key that was changed or revoked."""
+        entry = self._entries.pop(self._key(api_key), None)
+        if entry is not None:
+            await self._retire(entry)
+
+    async def close(self) -> None:
+        """Close every client; used on application shutdown."""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        await asyncio.gather(*(entry.client.close() for entry in entries))
+
+    async def _evict_idle(self, now: float) -> None:
+        idle = [
+            key
+            for key, entry in self._entries.items()
+            if entry.leases == 0 and now - entry.last_used > self.idle_timeout
+        ]
+        for key in idle:
+            await self._retire(self._entries.pop(key))
+
+    async def _evict_overflow(self) -> None:
+        while len(self._entries) > self.max_clients:
+            _, entry = self._entries.popitem(last=False)
+            await self._retire(entry)
+
+    async def _retire(self, entry: _Entry) -> None:
+        entry.evicted = True
+        if entry.leases == 0:
+            await entry.client.close()
+
+
+def _http_client(transport: httpx.AsyncBaseTransport) -> Any:
+    # Some openai releases type http_client as their own vendored httpx client
+    # class; a plain httpx client is accepted at runtime by all of them
+    return httpx.AsyncClient(transport=transport, timeout=OPENAI_TIMEOUT, follow_redirects=True)
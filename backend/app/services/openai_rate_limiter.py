@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+
+from app.services.wav_service import (
+    SEGMENT_BITS_PER_SAMPLE,
+    SEGMENT_CHANNELS,
+    SEGMENT_SAMPLE_RATE,
+)
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Throttled or conflicting (as retried by the OpenAI client), or 5xx
+RETRYABLE_STATUS = {408, 409, 429}
+# Signs that the server is overloaded, so fewer requests should run at once
+OVERLOAD_STATUS = {429, 503}
+
+# Rough cost of a request before the server reports its budget: text is about
+# four characters per token, input audio about ten tokens per second
+CHARS_PER_TOKEN = 4
+AUDIO_TOKENS_PER_SECOND = 10
+AUDIO_BYTES_PER_SECOND = SEGMENT_SAMPLE_RATE * SEGMENT_CHANNELS * SEGMENT_BITS_PER_SAMPLE // 8
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Retry and concurrency settings of an OpenAIRateLimiter."""
+
+    max_retries: int = 4
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 30.0
+    max_concurrency: int = 16
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> RateLimitPolicy:
+        return cls(
+            max_retries=settings.openai_max_retries,
+            retry_base_delay=settings.openai_retry_base_delay,
+            retry_max_delay=settings.openai_retry_max_delay,
+            max_concurrency=settings.openai_max_concurrency,
+        )
+
+
+class TokenBucket:
+    """A budget that refills continuously, synced from rate-limit headers.
+
+    Unlimited until the server first reports the budget.
+    """
+
+    def __init__(self, clock: Callable[[], float]) -> None:
+        self._clock = clock
+        self.capacity: Optional[float] = None
+        self.tokens = 0.0
+        self.rate = 0.0  # Refill per second
+        self._updated = clock()
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken."""
+        if self.capacity is None:
+            return 0.0
+        self._refill()
+        # More than the whole budget waits for a full bucket, not forever
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else 1.0
+
+    def take(self, amount: float) -> None:
+        if self.capacity is not None:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+
+    def sync(self, limit: float, remaining: float, reset: float) -> None:
+        """Adopt the server's view: ``remaining`` of ``limit``, full again in ``reset`` seconds."""
+        self.capacity = limit
+        self.tokens = remaining
+        # Limits are per minute; refill at least at that average pace
+        self.rate = max((limit - remaining) / reset if reset > 0 else 0.0, limit / 60)
+        self._updated = self._clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AIMDController:
+    """Concurrency limit with additive increase and multiplicative decrease.
+
+    Each success raises the limit by ``1 / limit``, so by about one per round
+    of requests; throttling halves it. Requests beyond the limit wait.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1) -> None:
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < math.floor(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_overload(self) -> None:
+        previous = self.limit
+        self.limit = max(self.min_limit, self.limit / 2)
+        if math.floor(self.limit) < math.floor(previous):
+            logger.info(f"OpenAI concurrency reduced to {math.floor(self.limit)}")
+
+
+class OpenAIRateLimiter:
+    """Client-side pacing of the requests made with one API key.
+
+    Request and token budgets are token buckets synced from the
+    ``x-ratelimit-*`` headers of every response, so requests wait for budget
+    instead of being rejected. Concurrency is adapted with an AIMD controller.
+    """
+
+    def __init__(
+        self,
+        policy: RateLimitPolicy,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        self.policy = policy
+        self.sleep = sleep
+        self._jitter = jitter
+        self.requests = TokenBucket(clock)
+        self.tokens = TokenBucket(clock)
+        self.concurrency = AIMDController(policy.max_concurrency)
+
+    async def wait_for_budget(self, tokens: int) -> None:
+        """Wait until one request of ``tokens`` estimated tokens fits both budgets."""
+        while True:
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait <= 0:
+                self.requests.take(1)
+                self.tokens.take(tokens)
+                return
+            await self.sleep(wait)
+
+    def observe(self, headers: httpx.Headers) -> None:
+        """Sync the budgets from a response's rate-limit headers."""
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            try:
+                limit = float(headers[f"x-ratelimit-limit-{kind}"])
+                remaining = float(headers[f"x-ratelimit-remaining-{kind}"])
+            except (KeyError, ValueError):
+                continue
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+            bucket.sync(limit, remaining, reset or 0.0)
+
+    def retry_delay(self, attempt: int, headers: Optional[httpx.Headers] = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (from 1).
+
+        Uses the server's hint when there is one, otherwise exponential
+        backoff with full jitter so clients throttled together spread out.
+        """
+        hint = _retry_after(headers) if headers is not None else None
+        if hint is not None:
+            delay = hint + self._jitter() * self.policy.retry_base_delay
+        else:
+            backoff = self.policy.retry_base_delay * 2 ** (attempt - 1)
+            delay = self._jitter() * min(backoff, self.policy.retry_max_delay)
+        return min(delay, self.policy.retry_max_delay)
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Transport of the OpenAI client of one API key, paced by an OpenAIRateLimiter.
+
+    Throttled (429), failed (5xx) and unreachable requests are retried up to
+    ``policy.max_retries`` times; the client's own retries should be off.
+    A response holds its concurrency slot until its body is closed, so
+    streamed audio counts as in flight while it is being read.
+    """
+
+    def __init__(
+        self, limiter: OpenAIRateLimiter, transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        self.limiter = limiter
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = self.limiter
+        tokens = estimate_tokens(request)
+        attempt = 0
+        while True:
+            await limiter.wait_for_budget(tokens)
+            await limiter.concurrency.acquire()
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                await limiter.concurrency.release()
+                if attempt >= limiter.policy.max_retries:
+                    raise
+                attempt += 1
+                delay = limiter.retry_delay(attempt)
+                logger.warning(f"OpenAI request failed ({e!r}); retry {attempt} in {delay:.1f}s")
+                await limiter.sleep(delay)
+                continue
+            except BaseException:
+                await limiter.concurrency.release()
+                raise
+
+            limiter.observe(response.headers)
+            if response.status_code not in RETRYABLE_STATUS and response.status_code < 500:
+                limiter.concurrency.on_success()
+                if response.is_closed:
+                    # Body already read, so nothing is left in flight
+                    await limiter.concurrency.release()
+                    return response
+                return _release_on_close(response, limiter.concurrency)
+
+            if response.status_code in OVERLOAD_STATUS:
+                limiter.concurrency.on_overload()
+            try:
+                body = b"".join([chunk async for chunk in response.stream])  # type: ignore[union-attr]
+            finally:
+                await response.aclose()
+                await limiter.concurrency.release()
+            # An exhausted quota does not come back by waiting
+            if attempt >= limiter.policy.max_retries or b"insufficient_quota" in body:
+                return httpx.Response(
+                    response.status_code,
+                    headers=response.headers,
+                    content=body,
+                    request=request,
+                    extensions=response.extensions,
+                )
+            attempt += 1
+            delay = limiter.retry_delay(attempt, response.headers)
+            logger.warning(
+                f"OpenAI returned {response.status_code}; retry {attempt} in {delay:.1f}s"
+            )
+            await limiter.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, concurrency: AIMDController) -> None:
+        self._stream = stream
+        self._concurrency = concurrency
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                await self._concurrency.release()
+
+
+def _release_on_close(response: httpx.Response, concurrency: AIMDController) -> httpx.Response:
+    response.stream = _ReleasingStream(response.stream, concurrency)  # type: ignore[arg-type]
+    return response
+
+
+def estimate_tokens(request: httpx.Request) -> int:
+    """Rough token cost of an OpenAI request, from its JSON body."""
+    try:
+        body = json.loads(request.content)
+    except (ValueError, httpx.RequestNotRead):
+        return 1
+    chars = 0
+    audio_bytes = 0
+    pending: list[Any] = [body]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, str):
+            chars += len(value)
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, dict):
+            audio = value.get("input_audio")
+            if isinstance(audio, dict) and isinstance(audio.get("data"), str):
+                audio_bytes += len(audio["data"]) * 3 // 4
+                value = {k: v for k, v in value.items() if k != "input_audio"}
+            pending.extend(value.values())
+    audio_tokens = audio_bytes / AUDIO_BYTES_PER_SECOND * AUDIO_TOKENS_PER_SECOND
+    return max(1, math.ceil(chars / CHARS_PER_TOKEN + audio_tokens))
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Seconds in a rate-limit reset header such as "1s", "6m0s" or "20ms"."""
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _retry_after(headers: httpx.Headers) -> Optional[float]:
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, ValueError):
+            continue
+    # Throttled without a hint: wait for the exhausted budget to reset
+    resets: list[float] = []
+    for kind in ("requests", "tokens"):
+        if headers.get(f"x-ratelimit-remaining-{kind}") != "0":
+            continue
+        reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+        if reset is not None:
+            resets.append(reset)
+    return max(resets) if resets else None
@@ -3,11 +3,13 @@ from __future__ import annotations
 import base64
 import json
 import logging
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import Any, Optional
 
 from openai import AsyncOpenAI
 
+from app.utils.atomic_write import write_stream_atomic
 from app.utils.exceptions import ExternalAPIError, ProcessingError
 
 logger = logging.getLogger(__name__)
@@ -29,6 +31,10 @@ TTS_VOICES = [
     "verse",
 ]
 
+# Models used for audio analysis and speech synthesis
+AUDIO_ANALYSIS_MODEL = "gpt-4o-audio-preview"
+TTS_MODEL = "gpt-4o-mini-tts"
+
 # Default prompts (used when initializing settings for the first time)
 AUDIO_ANALYSIS_SYSTEM_PROMPT = """You are an audio analysis assistant specialized in outdoor/rural environments.
 The audio is from a fishing video. Your task is to:
@@ -81,13 +87,16 @@ class OpenAIService:
         api_key: str,
         system_prompt: str = AUDIO_ANALYSIS_SYSTEM_PROMPT,
         user_prompt: str = AUDIO_ANALYSIS_USER_PROMPT,
+        client: Optional[AsyncOpenAI] = None,
     ) -> None:
         self.api_key = api_key
         self.system_prompt = system_prompt
         self.user_prompt = user_prompt
         if not api_key:
             logger.warning("OpenAI API key not configured")
-        self._client: Optional[AsyncOpenAI] = None
+        # A shared client (see OpenAIClientRegistry) is used as is, otherwise
+        # one is created on first use
+        self._client: Optional[AsyncOpenAI] = client
 
     @property
     def client(self) -> AsyncOpenAI:
@@ -97,6 +106,12 @@ class OpenAIService:
             self._client = AsyncOpenAI(api_key=self.api_key)
         return self._client
 
+    def analysis_prompts(self, for_chatterbox: bool = False) -> tuple[str, str]:
+        """System and user prompt sent along with the audio to analyze."""
+        if for_chatterbox:
+            return CHATTERBOX_ANALYSIS_SYSTEM_PROMPT, CHATTERBOX_ANALYSIS_USER_PROMPT
+        return self.system_prompt, self.user_prompt
+
     async def analyze_audio(self, audio_path: Path) -> dict[str, Any]:
         """Analyze audio using gpt-4o-audio-preview.
 
@@ -120,7 +135,7 @@ class OpenAIService:
 
         try:
             response = await self.client.chat.completions.create(
-                model="gpt-4o-audio-preview",
+                model=AUDIO_ANALYSIS_MODEL,
                 modalities=["text"],
                 messages=[
                     {"role": "system", "content": self.system_prompt},
@@ -195,7 +210,7 @@ class OpenAIService:
 
         try:
             response = await self.client.chat.completions.create(
-                model="gpt-4o-audio-preview",
+                model=AUDIO_ANALYSIS_MODEL,
                 modalities=["text"],
                 messages=[
                     {"role": "system", "content": CHATTERBOX_ANALYSIS_SYSTEM_PROMPT},
@@ -267,21 +282,41 @@ class OpenAIService:
         Returns:
             Path to the generated MP3 file
         """
+        if output_path is None:
+            raise ProcessingError("Output path must be specified")
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Streamed to disk so memory use does not grow with the audio length
+        await write_stream_atomic(output_path, self.stream_tts(text, voice, instructions))
+
+        return output_path
+
+    async def stream_tts(
+        self,
+        text: str,
+        voice: str = "alloy",
+        instructions: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream MP3 audio from gpt-4o-mini-tts as it is generated.
+
+        Args:
+            text: The text to convert to speech
+            voice: Voice to use (alloy, ash, ballad, coral, echo, fable, etc.)
+            instructions: Optional instructions for tone, style, emotion, etc.
+
+        Yields:
+            Chunks of the MP3 file, as they arrive
+        """
         if not text.strip():
             raise ProcessingError("Text cannot be empty")
 
         if voice not in TTS_VOICES:
             raise ProcessingError(f"Invalid voice '{voice}'. Valid options: {TTS_VOICES}")
 
-        if output_path is None:
-            raise ProcessingError("Output path must be specified")
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
         try:
             # Build request params
             params: dict[str, Any] = {
-                "model": "gpt-4o-mini-tts",
+                "model": TTS_MODEL,
                 "voice": voice,
                 "input": text,
                 "response_format": "mp3",
@@ -292,16 +327,15 @@ class OpenAIService:
                 params["instructions"] = instructions
                 logger.info(f"TTS instructions: {instructions}")
 
-            response = await self.client.audio.speech.create(**params)
+            async with self.client.audio.speech.with_streaming_response.create(
+                **params
+            ) as response:
+                async for chunk in response.iter_bytes():
+                    yield chunk
         except Exception as e:
             logger.error(f"OpenAI API error during TTS generation: {e}")
             raise ExternalAPIError(f"Failed to generate TTS: {str(e)}") from e
 
-        # Write the audio to file
-        output_path.write_bytes(response.content)
-
-        return output_path
-
     @staticmethod
     def format_tts_filename(start_time: float) -> str:
         """Format TTS output filename from timestamp.
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import lru_cache
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobPriority(IntEnum):
+    """Scheduling priority of an external process; lower runs first."""
+
+    PROBE = 0
+    SEGMENT = 1
+    EXTRACTION = 2
+
+
+@dataclass
+class SchedulerStats:
+    """Point-in-time gauges and counters of a ProcessScheduler."""
+
+    max_concurrency: int
+    running: int
+    queue_depth: int
+    jobs_started: int
+    jobs_timed_out: int
+    last_wait_seconds: float
+    max_wait_seconds: float
+    avg_wait_seconds: float
+
+
+class ProcessScheduler:
+    """Admission control for external processes (FFmpeg, ffprobe).
+
+    At most ``max_concurrency`` jobs hold a slot at once. Waiting jobs are
+    admitted by priority, then in arrival order, so short segment cuts are not
+    stuck behind full-video extractions.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._running = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+
+        self.jobs_started = 0
+        self.jobs_timed_out = 0
+        self._last_wait = 0.0
+        self._max_wait = 0.0
+        self._total_wait = 0.0
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, priority: JobPriority = JobPriority.EXTRACTION) -> None:
+        """Wait for a free slot."""
+        started = time.monotonic()
+        if self._running < self.max_concurrency and self.queue_depth == 0:
+            self._running += 1
+        else:
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (int(priority), next(self._sequence), waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just before cancellation; pass it on
+                    self.release()
+                raise
+        self._record_wait(time.monotonic() - started)
+
+    def release(self) -> None:
+        """Free a slot, handing it to the highest-priority waiter if any."""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # The slot moves to the waiter; the running count is unchanged
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: JobPriority = JobPriority.EXTRACTION) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_timeout(self) -> None:
+        self.jobs_timed_out += 1
+
+    def _record_wait(self, waited: float) -> None:
+        self.jobs_started += 1
+        self._last_wait = waited
+        self._max_wait = max(self._max_wait, waited)
+        self._total_wait += waited
+
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(
+            max_concurrency=self.max_concurrency,
+            running=self._running,
+            queue_depth=self.queue_depth,
+            jobs_started=self.jobs_started,
+            jobs_timed_out=self.jobs_timed_out,
+            last_wait_seconds=self._last_wait,
+            max_wait_seconds=self._max_wait,
+            avg_wait_seconds=self._total_wait / self.jobs_started if self.jobs_started else 0.0,
+        )
+
+
+@lru_cache
+def get_process_scheduler() -> ProcessScheduler:
+    """Process-wide scheduler shared by all FFmpegService instances."""
+    return ProcessScheduler(get_settings().ffmpeg_max_concurrency)
+
+
+@lru_cache
+def get_stream_scheduler() -> ProcessScheduler:
+    """Separate budget for FFmpeg processes fed by a client upload.
+
+    Those are paced by the network, not the CPU, so they must not hold slots
+    of the shared scheduler while waiting for bytes.
+    """
+    return ProcessScheduler(get_settings().ffmpeg_stream_max_concurrency)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Tells EventSource how long to wait before reconnecting, in milliseconds
+SSE_RETRY_MS = 3000
+
+
+@dataclass(frozen=True)
+class SegmentEvent:
+    """A committed change to a segment, as pushed to project subscribers.
+
+    ``type`` is "created", "updated" or "deleted". ``changes`` holds only the
+    fields that changed (all initial fields for "created"). ``id`` is assigned
+    by the hub that delivers the event.
+    """
+
+    type: str
+    project_id: str
+    segment_id: str
+    changes: dict[str, Any] = field(default_factory=dict)
+    id: str = ""
+
+    def to_sse(self) -> str:
+        data = json.dumps(
+            {"segment_id": self.segment_id, **jsonable_encoder(self.changes)},
+            separators=(",", ":"),
+        )
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n"
+
+
+class SegmentEventHub:
+    """In-process pub/sub of segment changes, by project.
+
+    Every subscriber gets a bounded queue. One that falls behind has its queue
+    replaced by a single ``None`` marker, telling it to reload instead of
+    slowing down publishers. The last ``history`` events of the most recently
+    active ``max_projects`` projects are kept so a reconnecting client can
+    resume from its Last-Event-ID.
+
+    ``forward``, when set, receives every event published in this process so
+    it can be relayed to other worker processes (e.g. over Redis pub/sub);
+    events relayed from elsewhere are handed to ``deliver``.
+    """
+
+    def __init__(
+        self,
+        history: int = 256,
+        max_projects: int = 256,
+        queue_size: int = 1024,
+        forward: Optional[Callable[[SegmentEvent], None]] = None,
+    ) -> None:
+        self.history = history
+        self.max_projects = max_projects
+        self.queue_size = queue_size
+        self.forward = forward
+        # Event ids are only meaningful to the hub that assigned them
+        self.instance = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+        self._subscribers: dict[str, set[asyncio.Queue[Optional[SegmentEvent]]]] = {}
+        self._recent: OrderedDict[str, deque[tuple[int, SegmentEvent]]] = OrderedDict()
+        # Highest id among the histories dropped to stay within max_projects
+        self._evicted_through = 0
+
+    def publish(self, event: SegmentEvent) -> None:
+        """Deliver a change made in this process, and forward it to other processes."""
+        self.deliver(event)
+        if self.forward is not None:
+            try:
+                self.forward(event)
+            except Exception as e:
+                logger.warning(f"Failed to forward segment event: {e}")
+
+    def deliver(self, event: SegmentEvent) -> None:
+        """Deliver an event to this process's subscribers only."""
+        seq = next(self._sequence)
+        event = replace(event, id=f"{self.instance}-{seq}")
+
+        recent = self._recent.get(event.project_id)
+        if recent is None:
+            recent = self._recent[event.project_id] = deque(maxlen=self.history)
+            while len(self._recent) > self.max_projects:
+                _, evicted = self._recent.popitem(last=False)
+                if evicted:
+                    self._evicted_through = max(self._evicted_through, evicted[-1][0])
+        else:
+            self._recent.move_to_end(event.project_id)
+        recent.append((seq, event))
+
+        for queue in self._subscribers.get(event.project_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def since(self, project_id: str, last_event_id: str) -> Optional[list[SegmentEvent]]:
+        """Events of a project after ``last_event_id``.
+
+        Returns None when they cannot all be replayed: the id is from another
+        hub (a restart or another worker process) or older than the history.
+        """
+        instance, _, seq = last_event_id.partition("-")
+        if instance != self.instance or not seq.isdigit():
+            return None
+        last_seq = int(seq)
+        recent = self._recent.get(project_id, ())
+        first_kept = recent[0][0] if recent else last_seq + 1
+        if first_kept > last_seq + 1:
+            # Events between the two may have been trimmed from the history
+            truncated = len(recent) == self.history or last_seq < self._evicted_through
+            if truncated:
+                return None
+        elif not recent and last_seq < self._evicted_through:
+            return None
+        return [event for event_seq, event in recent if event_seq > last_seq]
+
+    @asynccontextmanager
+    async def subscribe(
+        self, project_id: str
+    ) -> AsyncIterator[asyncio.Queue[Optional[SegmentEvent]]]:
+        """Receive the events of a project while the context is open."""
+        queue: asyncio.Queue[Optional[SegmentEvent]] = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(project_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers[project_id]
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[project_id]
+
+    def subscriber_count(self, project_id: str) -> int:
+        return len(self._subscribers.get(project_id, ()))
+
+
+async def stream_project_events(
+    hub: SegmentEventHub,
+    project_id: str,
+    last_event_id: Optional[str] = None,
+    heartbeat: float = 15.0,
+) -> AsyncIterator[str]:
+    """Server-sent events for a project, until the client disconnects.
+
+    Sends a "resync" event whenever the client may have missed changes (it
+    could not be caught up from Last-Event-ID, or it fell behind), after
+    which it should reload the project. Comments are sent every
+    ``heartbeat`` seconds so proxies keep the connection open.
+    """
+    async with hub.subscribe(project_id) as queue:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        sent = ""
+        if last_event_id:
+            missed = hub.since(project_id, last_event_id)
+            if missed is None:
+                yield "event: resync\ndata: {}\n\n"
+            for replayed in missed or ():
+                yield replayed.to_sse()
+            if missed:
+                sent = missed[-1].id
+        while True:
+            try:
+                event: Optional[SegmentEvent] = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event is None:
+                yield "event: resync\ndata: {}\n\n"
+                continue
+            # Already replayed from history when published while subscribing
+            if sent and _seq(event.id) <= _seq(sent):
+                continue
+            yield event.to_sse()
+
+
+def _seq(event_id: str) -> int:
+    return int(event_id.rpartition("-")[2])
+
+
+@lru_cache
+def get_segment_events() -> SegmentEventHub:
+    """Process-wide hub fed by SegmentRepository on every commit."""
+    settings = get_settings()
+    return SegmentEventHub(history=settings.segment_event_history)
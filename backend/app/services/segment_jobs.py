@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from openai import AsyncOpenAI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.models import Job, JobKind, Project, Segment
+from app.models.app_settings import UserSettings
+from app.prompts import build_system_prompt, get_user_prompt
+from app.repositories.custom_voice_repo import CustomVoiceRepository
+from app.repositories.project_repo import ProjectRepository
+from app.repositories.segment_repo import SegmentRepository
+from app.schemas.segment import TTSRequest
+from app.services.chatterbox_health import ChatterBoxHealthMonitor
+from app.services.chatterbox_pool import ChatterBoxBackends
+from app.services.ffmpeg_service import FFmpegService
+from app.services.job_queue import JobHandler
+from app.services.openai_client_registry import OpenAIClientRegistry
+from app.services.openai_service import OpenAIService
+from app.services.project_service import ProjectService
+from app.services.segment_service import SegmentService
+from app.services.settings_service import SettingsService
+from app.utils.exceptions import ExternalAPIError, NotFoundError, ProcessingError
+
+
+def build_analysis_service(
+    user_settings: UserSettings, project: Project, client: AsyncOpenAI
+) -> OpenAIService:
+    """Create an OpenAI service with project-specific analysis prompts."""
+    # Prompts are only used for standard OpenAI analysis
+    system_prompt = build_system_prompt(
+        context=user_settings.context_description,
+        source_language=project.source_language,
+        target_language=project.target_language,
+    )
+    return OpenAIService(
+        api_key=user_settings.openai_api_key,
+        system_prompt=system_prompt,
+        user_prompt=get_user_prompt(),
+        client=client,
+    )
+
+
+async def resolve_custom_voice_path(
+    voice: str,
+    custom_voice_repo: CustomVoiceRepository,
+    settings: Settings,
+    user_id: str,
+) -> Optional[str]:
+    """Resolve a custom voice (format: custom:voice_id:voice_name) to its file path."""
+    if not voice.startswith("custom:"):
+        return None
+    parts = voice.split(":", 2)
+    if len(parts) < 2:
+        return None
+    voice_id = parts[1]
+    custom_voice = await custom_voice_repo.get_by_id(voice_id, user_id)
+    if not custom_voice:
+        raise NotFoundError(f"Custom voice not found: {voice_id}")
+    # Get absolute path to the custom voice file
+    return str(settings.voices_dir / custom_voice.file_path)
+
+
+def require_chatterbox(chatterbox_health: ChatterBoxHealthMonitor) -> None:
+    """Fail fast while ChatterBox is known to be down."""
+    if chatterbox_health.health.checked_at and not chatterbox_health.health.available:
+        chatterbox_health.request_probe()
+        raise ExternalAPIError(f"ChatterBox server at {chatterbox_health.base_url} is unavailable")
+
+
+async def analyze_segment_for_user(
+    segment: Segment,
+    project: Project,
+    user_settings: UserSettings,
+    segment_service: SegmentService,
+    openai_clients: OpenAIClientRegistry,
+    force: bool = False,
+) -> Segment:
+    """Analyze a segment with the user's API key and the project's languages.
+
+    Uses ChatterBox-specific analysis when the user's TTS provider is ChatterBox.
+    """
+    if not user_settings.openai_api_key:
+        raise ProcessingError("OpenAI API key not configured in settings")
+
+    async with openai_clients.lease(user_settings.openai_api_key) as client:
+        return await segment_service.analyze_segment(
+            segment,
+            openai=build_analysis_service(user_settings, project, client),
+            use_chatterbox_analysis=user_settings.tts_provider == "chatterbox",
+            force=force,
+        )
+
+
+async def generate_segment_tts(
+    segment: Segment,
+    project: Project,
+    user_settings: UserSettings,
+    data: TTSRequest,
+    segment_service: SegmentService,
+    custom_voice_repo: CustomVoiceRepository,
+    settings: Settings,
+    openai_clients: OpenAIClientRegistry,
+    chatterbox_health: ChatterBoxHealthMonitor,
+) -> Segment:
+    """Generate TTS audio for a segment with the user's TTS provider."""
+    voice = data.voice
+    custom_voice_path = await resolve_custom_voice_path(
+        voice, custom_voice_repo, settings, user_settings.user_id
+    )
+
+    if user_settings.tts_provider == "chatterbox":
+        # Use ChatterBox TTS (local)
+        require_chatterbox(chatterbox_health)
+        try:
+            return await segment_service.generate_tts_chatterbox(
+                segment,
+                voice=voice,
+                custom_voice_path=custom_voice_path,
+                temperature=data.temperature,
+                exaggeration=data.exaggeration,
+                cfg_weight=data.cfg_weight,
+                speed=data.speed_factor,
+                force=data.force,
+            )
+        except ExternalAPIError:
+            # The server may have gone down; refresh the cached state now
+            chatterbox_health.request_probe()
+            raise
+
+    # Use OpenAI TTS (default)
+    if not user_settings.openai_api_key:
+        raise ProcessingError("OpenAI API key not configured in settings")
+
+    # Set target language from project if not provided in request
+    if not data.target_language:
+        data.target_language = project.target_language
+
+    # Build TTS instructions from analysis fields
+    instructions = data.build_instructions()
+
+    async with openai_clients.lease(user_settings.openai_api_key) as client:
+        openai_service = OpenAIService(api_key=user_settings.openai_api_key, client=client)
+        return await segment_service.generate_tts(
+            segment,
+            voice=voice,
+            instructions=instructions if instructions else None,
+            openai=openai_service,
+            force=data.force,
+        )
+
+
+class SegmentJobHandlers:
+    """Run queued segment jobs the way the synchronous endpoints do.
+
+    Uses the application-wide clients created in ``main.lifespan``; each
+    handler gets the worker's session and leaves committing to the queue.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        chatterbox_backends: ChatterBoxBackends,
+        openai_clients: OpenAIClientRegistry,
+        chatterbox_health: ChatterBoxHealthMonitor,
+    ) -> None:
+        self.settings = settings
+        self.chatterbox_backends = chatterbox_backends
+        self.openai_clients = openai_clients
+        self.chatterbox_health = chatterbox_health
+
+    def as_dict(self) -> dict[JobKind, JobHandler]:
+        return {
+            JobKind.EXTRACT: self.extract,
+            JobKind.ANALYZE: self.analyze,
+            JobKind.GENERATE_TTS: self.generate_tts,
+        }
+
+    async def extract(self, session: AsyncSession, job: Job) -> None:
+        segment_service, segment, project = await self._load(session, job)
+        await segment_service.extract_audio(segment, project)
+
+    async def analyze(self, session: AsyncSession, job: Job) -> None:
+        segment_service, segment, project = await self._load(session, job)
+        user_settings = await SettingsService(session).get_settings(job.user_id)
+        await analyze_segment_for_user(
+            segment,
+            project,
+            user_settings,
+            segment_service,
+            self.openai_clients,
+            force=(job.payload or {}).get("force", False),
+        )
+
+    async def generate_tts(self, session: AsyncSession, job: Job) -> None:
+        segment_service, segment, project = await self._load(session, job)
+        user_settings = await SettingsService(session).get_settings(job.user_id)
+        await generate_segment_tts(
+            segment,
+            project,
+            user_settings,
+            TTSRequest.model_validate(job.payload or {}),
+            segment_service,
+            CustomVoiceRepository(session),
+            self.settings,
+            self.openai_clients,
+            self.chatterbox_health,
+        )
+
+    async def _load(
+        self, session: AsyncSession, job: Job
+    ) -> tuple[SegmentService, Segment, Project]:
+        chatterbox = self.chatterbox_backends.pool(self.settings.chatterbox_backend_urls)
+        segment_service = SegmentService(
+            SegmentRepository(session),
+            FFmpegService(self.settings),
+            self.settings,
+            chatterbox=chatterbox,
+        )
+        segment = await segment_service.get_by_id(job.segment_id)
+        # Also checks that the job's user still owns the project
+        project = await ProjectService(ProjectRepository(session)).get_by_id(
+            segment.project_id, job.user_id
+        )
+        return segment_service, segment, project
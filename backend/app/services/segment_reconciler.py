@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config import Settings
+from app.models import JobKind, Segment, SegmentStatus
+from app.repositories.segment_repo import SegmentRepository
+from app.services.chatterbox_service import ChatterBoxService
+from app.services.ffmpeg_service import FFmpegService
+from app.services.job_queue import JobQueue, SessionFactory, utcnow
+from app.services.openai_service import OpenAIService
+from app.services.wav_service import SEGMENT_SAMPLE_RATE, WavService
+from app.utils.exceptions import ConflictError
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_STATUSES = [
+    SegmentStatus.EXTRACTING,
+    SegmentStatus.ANALYZING,
+    SegmentStatus.GENERATING_TTS,
+]
+
+# Extracted segments may be this much shorter than requested (FFmpeg seeks to packets)
+EXTRACT_TOLERANCE_FRAMES = SEGMENT_SAMPLE_RATE // 20
+
+
+@dataclass
+class ReconcileResult:
+    completed: int = 0
+    requeued: int = 0
+    failed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.completed + self.requeued + self.failed
+
+
+class SegmentReconciler:
+    """Resolves segments left in a transient status by an interrupted request.
+
+    A request that dies with the process (restart, crash) leaves its
+    segment extracting, analyzing or generating forever. For each such
+    segment, the transition is completed if its output is on disk, the work
+    is queued again if it can be repeated as is, and otherwise the segment
+    is marked as errored so the user knows to retry.
+
+    ``reconcile()`` runs at startup and then every ``interval`` seconds. It
+    only touches segments unchanged for ``stale_after`` seconds, which must
+    exceed the longest request (whole-project batches included), so segments
+    still being worked on by another process are left alone.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        job_queue: JobQueue,
+        settings: Settings,
+        stale_after: float = 3600.0,
+        interval: float = 300.0,
+        clock: Callable[[], datetime] = utcnow,
+    ) -> None:
+        self.session_factory = session_factory
+        self.job_queue = job_queue
+        self.settings = settings
+        self.stale_after = stale_after
+        self.interval = interval
+        self.clock = clock
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def reconcile(self, updated_before: Optional[datetime] = None) -> ReconcileResult:
+        """Resolve transient segments last updated before ``updated_before``.
+
+        Defaults to ``stale_after`` seconds ago.
+        """
+        if updated_before is None:
+            updated_before = self.clock() - timedelta(seconds=self.stale_after)
+
+        result = ReconcileResult()
+        async with self.session_factory() as session:
+            repo = SegmentRepository(session)
+            for segment, user_id in await repo.list_stale(TRANSIENT_STATUSES, updated_before):
+                status = segment.status
+                values = self._resolve(segment)
+                if values is not None:
+                    await repo.update(segment, **values)
+                    if values["status"] == SegmentStatus.ERROR:
+                        result.failed += 1
+                    else:
+                        result.completed += 1
+                else:
+                    kind = (
+                        JobKind.EXTRACT if status == SegmentStatus.EXTRACTING else JobKind.ANALYZE
+                    )
+                    try:
+                        await self.job_queue.enqueue(session, kind, segment, user_id)
+                    except ConflictError:
+                        # Queued by a request since the segment was listed
+                        continue
+                    result.requeued += 1
+                logger.info(
+                    f"Segment {segment.id} was stuck {status.value}: now {segment.status.value}"
+                )
+            await repo.commit()
+
+        if result.total:
+            logger.warning(
+                f"Reconciled {result.total} stuck segments: {result.completed} completed, "
+                f"{result.requeued} queued again, {result.failed} marked as errored"
+            )
+        return result
+
+    def _resolve(self, segment: Segment) -> Optional[dict[str, Any]]:
+        """New values for a stuck segment, or None to queue its work again."""
+        if segment.status == SegmentStatus.EXTRACTING:
+            path = self._segments_dir(segment) / FFmpegService.format_segment_filename(
+                segment.start_time
+            )
+            if self._is_complete_extract(path, segment.end_time - segment.start_time):
+                return {
+                    "status": SegmentStatus.EXTRACTED,
+                    "audio_file": str(path.relative_to(self.settings.projects_dir)),
+                    "error_message": None,
+                }
+            return None
+
+        if segment.status == SegmentStatus.ANALYZING:
+            # The analysis only lives in the database, so there is nothing to pick up
+            if segment.audio_file and (self.settings.projects_dir / segment.audio_file).exists():
+                return None
+            return self._error("Analysis was interrupted and the segment has no audio file")
+
+        # TTS options are not stored, so the generation cannot be repeated as requested;
+        # the audio files are written atomically, so a new one is complete
+        output_dir = self.settings.projects_dir / segment.project_id / "output"
+        for filename in (
+            OpenAIService.format_tts_filename(segment.start_time),
+            ChatterBoxService.format_tts_filename(segment.start_time),
+        ):
+            path = output_dir / filename
+            if self._written_since(path, segment.updated_at):
+                return {
+                    "status": SegmentStatus.COMPLETED,
+                    "tts_result_file": str(path.relative_to(self.settings.projects_dir)),
+                    # The inputs it was made from are unknown
+                    "tts_input_hash": None,
+                    "error_message": None,
+                }
+        return self._error("TTS generation was interrupted; generate it again")
+
+    def _segments_dir(self, segment: Segment) -> Path:
+        return self.settings.projects_dir / segment.project_id / "segments"
+
+    @staticmethod
+    def _is_complete_extract(path: Path, duration: float) -> bool:
+        # Extraction writes in place, so a file can be cut short
+        wav_format = WavService.read_format(path)
+        expected = round(duration * SEGMENT_SAMPLE_RATE)
+        return (
+            wav_format is not None and wav_format.frame_count >= expected - EXTRACT_TOLERANCE_FRAMES
+        )
+
+    @staticmethod
+    def _written_since(path: Path, updated_at: Optional[datetime]) -> bool:
+        # Audio restored from the TTS cache gets a new mtime too (see TTSCache)
+        try:
+            mtime = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+        except FileNotFoundError:
+            return False
+        return updated_at is not None and mtime.replace(tzinfo=None) >= updated_at
+
+    @staticmethod
+    def _error(message: str) -> dict[str, Any]:
+        return {"status": SegmentStatus.ERROR, "error_message": message}
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile()
+            except Exception:
+                logger.exception("Segment reconciliation failed")
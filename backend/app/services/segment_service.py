@@ -1,20 +1,83 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from app.config import Settings
 from app.models import Segment
 from app.models.segment import SegmentStatus
+from app.repositories.analysis_cache_repo import AnalysisCacheRepository
 from app.repositories.segment_repo import SegmentRepository
+from app.services.chatterbox_pool import ChatterBoxPool
 from app.services.chatterbox_service import ChatterBoxService
 from app.services.ffmpeg_service import FFmpegService
-from app.services.openai_service import OpenAIService
+from app.services.openai_service import AUDIO_ANALYSIS_MODEL, OpenAIService
+from app.services.tts_cache import TTSCache
+from app.services.wav_service import WavService
+from app.utils.atomic_write import tee_stream_atomic
+from app.utils.disk_cache import cache_key, file_digest
 from app.utils.exceptions import ProcessingError, SegmentNotFoundError
+from app.utils.streams import aclosing
 
 if TYPE_CHECKING:
     from app.models import Project
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchAnalysis:
+    """Outcome of analyzing a whole project."""
+
+    total: int
+    skipped: int
+    analyzed: list[Segment] = field(default_factory=list)
+    failed: list[Segment] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class TTSInputs:
+    """Provider, voice and parameters a segment's TTS audio is synthesized with."""
+
+    provider: str  # "openai" or "chatterbox"
+    voice: str
+    instructions: Optional[str] = None
+    # Derived from the voice, so not part of the fingerprint
+    custom_voice_path: Optional[str] = None
+    temperature: Optional[float] = None
+    exaggeration: Optional[float] = None
+    cfg_weight: Optional[float] = None
+    speed: Optional[float] = None
+
+    def fingerprint(self, text: str) -> str:
+        """Identify the audio these inputs produce for ``text``."""
+        speed = self.speed if self.speed is not None or self.provider != "chatterbox" else 1.0
+        return cache_key(
+            self.provider,
+            text,
+            self.voice,
+            self.instructions,
+            self.temperature,
+            self.exaggeration,
+            self.cfg_weight,
+            speed,
+        )
+
+
+@dataclass
+class BatchTTS:
+    """Outcome of generating TTS for a whole project."""
+
+    total: int
+    skipped: int = 0  # No translated text, or generation in progress
+    unchanged: int = 0  # Result is up to date with the segment's inputs
+    generated: list[Segment] = field(default_factory=list)
+    failed: list[Segment] = field(default_factory=list)
+
 
 class SegmentService:
     def __init__(
@@ -23,13 +86,19 @@ class SegmentService:
         ffmpeg: FFmpegService,
         settings: Settings,
         openai: Optional[OpenAIService] = None,
-        chatterbox: Optional[ChatterBoxService] = None,
+        chatterbox: Optional[ChatterBoxPool] = None,
+        wav: Optional[WavService] = None,
+        analysis_cache: Optional[AnalysisCacheRepository] = None,
+        tts_cache: Optional[TTSCache] = None,
     ) -> None:
         self.repo = repo
+        self.analysis_cache = analysis_cache or AnalysisCacheRepository(repo.session)
+        self.tts_cache = tts_cache or TTSCache(settings)
         self.ffmpeg = ffmpeg
         self.settings = settings
         self.openai = openai
         self.chatterbox = chatterbox
+        self.wav = wav or WavService()
 
     def _get_project_audio_path(self, project: Project) -> Path:
         """Get full audio path from project."""
@@ -92,12 +161,21 @@ class SegmentService:
         segment = await self.repo.update(segment, status=SegmentStatus.EXTRACTING)
 
         try:
-            await self.ffmpeg.extract_segment(
-                audio_path=audio_path,
-                output_path=output_path,
-                start_time=segment.start_time,
-                end_time=segment.end_time,
-            )
+            # Plain PCM project audio is sliced in-process, anything else goes through FFmpeg
+            if self.wav.can_slice(audio_path):
+                await self.wav.extract_segment(
+                    audio_path=audio_path,
+                    output_path=output_path,
+                    start_time=segment.start_time,
+                    end_time=segment.end_time,
+                )
+            else:
+                await self.ffmpeg.extract_segment(
+                    audio_path=audio_path,
+                    output_path=output_path,
+                    start_time=segment.start_time,
+                    end_time=segment.end_time,
+                )
 
             relative_path = str(output_path.relative_to(self.settings.projects_dir))
             segment = await self.repo.update(
@@ -115,6 +193,55 @@ class SegmentService:
 
         return segment
 
+    async def extract_all(self, project: Project) -> list[Segment]:
+        """Extract audio for every segment of a project in one pass.
+
+        All affected rows are updated together, so the batch either lands as
+        a whole or every segment is marked as errored.
+        """
+        audio_path = self._get_project_audio_path(project)
+        segments_dir = self._get_segments_dir(project.id)
+
+        segments = await self.repo.list_by_project(project.id)
+        if not segments:
+            return []
+
+        output_paths = [
+            segments_dir / self.ffmpeg.format_segment_filename(s.start_time) for s in segments
+        ]
+        segments = await self.repo.update_many(
+            [(s, {"status": SegmentStatus.EXTRACTING}) for s in segments]
+        )
+
+        cuts = [(path, s.start_time, s.end_time) for s, path in zip(segments, output_paths)]
+        try:
+            # Plain PCM project audio is sliced in-process, anything else goes through FFmpeg
+            if self.wav.can_slice(audio_path):
+                await self.wav.extract_segments(audio_path, cuts)
+            else:
+                await self.ffmpeg.extract_segments(audio_path, cuts)
+        except Exception as e:
+            await self.repo.update_many(
+                [(s, {"status": SegmentStatus.ERROR, "error_message": str(e)}) for s in segments]
+            )
+            # Commit error status before raising so it persists
+            await self.repo.commit()
+            raise
+
+        return await self.repo.update_many(
+            [
+                (
+                    s,
+                    {
+                        "audio_file": str(path.relative_to(self.settings.projects_dir)),
+                        "status": SegmentStatus.EXTRACTED,
+                        "error_message": None,
+                    },
+                )
+                for s, path in zip(segments, output_paths)
+            ]
+        )
+
     async def update_translation(self, segment_id: str, translated_text: str) -> Segment:
         segment = await self.get_by_id(segment_id)
         return await self.repo.update(segment, translated_text=translated_text)
@@ -138,14 +265,19 @@ class SegmentService:
         segment: Segment,
         openai: Optional[OpenAIService] = None,
         use_chatterbox_analysis: bool = False,
+        force: bool = False,
     ) -> Segment:
         """Analyze segment audio using OpenAI.
 
+        A previous analysis of the same audio with the same prompts is reused
+        instead of paying for another request.
+
         Args:
             segment: The segment to analyze
             openai: Optional OpenAI service instance
             use_chatterbox_analysis: If True, use ChatterBox-specific analysis
                 that returns temperature, exaggeration, cfg_weight params
+            force: If True, always request a new analysis
         """
         openai_service = openai or self.openai
         if openai_service is None:
@@ -160,18 +292,10 @@ class SegmentService:
         segment = await self.repo.update(segment, status=SegmentStatus.ANALYZING)
 
         try:
-            if use_chatterbox_analysis:
-                analysis = await openai_service.analyze_audio_for_chatterbox(audio_path)
-            else:
-                analysis = await openai_service.analyze_audio(audio_path)
-
-            segment = await self.repo.update(
-                segment,
-                status=SegmentStatus.ANALYZED,
-                analysis_json=analysis,
-                original_transcription=analysis.get("transcription"),
-                translated_text=analysis.get("translated_text"),
+            analysis = await self._analyze_audio(
+                openai_service, audio_path, use_chatterbox_analysis, force=force
             )
+            segment = await self.repo.update(segment, **self._analysis_values(analysis))
         except Exception as e:
             segment = await self.repo.update(
                 segment,
@@ -184,14 +308,163 @@ class SegmentService:
 
         return segment
 
+    async def analyze_all(
+        self,
+        project: Project,
+        openai: Optional[OpenAIService] = None,
+        use_chatterbox_analysis: bool = False,
+        concurrency: int = 8,
+    ) -> BatchAnalysis:
+        """Analyze every segment of a project that has no analysis yet.
+
+        Up to ``concurrency`` OpenAI requests run at once. Each result is
+        committed as soon as it arrives, and a failed segment is marked as
+        errored without stopping the others.
+
+        Args:
+            project: The project whose segments to analyze
+            openai: Optional OpenAI service instance, shared by all requests
+            use_chatterbox_analysis: If True, use ChatterBox-specific analysis
+            concurrency: Maximum number of concurrent analysis requests
+        """
+        openai_service = openai or self.openai
+        if openai_service is None:
+            raise ProcessingError("OpenAI service not configured")
+
+        segments = await self.repo.list_by_project(project.id)
+        # Analyzed segments (including ones with TTS) and ones in flight are left alone
+        pending = [
+            s for s in segments if s.analysis_json is None and s.status != SegmentStatus.ANALYZING
+        ]
+        result = BatchAnalysis(total=len(segments), skipped=len(segments) - len(pending))
+        if not pending:
+            return result
+
+        previous = {s.id: {"status": s.status} for s in pending}
+        pending = await self.repo.update_many(
+            [(s, {"status": SegmentStatus.ANALYZING}) for s in pending]
+        )
+        await self.repo.commit()
+        logger.info(f"Analyzing {len(pending)} segments of project {project.id}")
+
+        semaphore = asyncio.Semaphore(concurrency)
+        # The session is shared, so database access is serialized
+        db_lock = asyncio.Lock()
+        unfinished = {s.id: s for s in pending}
+
+        async def analyze(segment: Segment) -> None:
+            try:
+                if not segment.audio_file:
+                    raise ProcessingError("Segment has no audio file. Extract audio first.")
+                async with semaphore:
+                    analysis = await self._analyze_audio(
+                        openai_service,
+                        self.settings.projects_dir / segment.audio_file,
+                        use_chatterbox_analysis,
+                        db_lock=db_lock,
+                    )
+                values = self._analysis_values(analysis)
+            except Exception as e:
+                values = {"status": SegmentStatus.ERROR, "error_message": str(e)}
+
+            async with db_lock:
+                segment = await self.repo.update(segment, **values)
+                await self.repo.commit()
+                del unfinished[segment.id]
+
+            if segment.status == SegmentStatus.ERROR:
+                result.failed.append(segment)
+            else:
+                result.analyzed.append(segment)
+            done = len(result.analyzed) + len(result.failed)
+            if done % 10 == 0 or done == len(pending):
+                logger.info(
+                    f"Project {project.id}: {done}/{len(pending)} segments analyzed "
+                    f"({len(result.failed)} failed)"
+                )
+
+        try:
+            await asyncio.gather(*(analyze(s) for s in pending))
+        except BaseException:
+            # Interrupted: segments still waiting for OpenAI go back to their old status.
+            # Shielded so a repeated cancellation cannot leave them analyzing.
+            await asyncio.shield(self._restore_many(list(unfinished.values()), previous))
+            raise
+
+        return result
+
+    async def _analyze_audio(
+        self,
+        openai_service: OpenAIService,
+        audio_path: Path,
+        use_chatterbox_analysis: bool,
+        force: bool = False,
+        db_lock: Optional[asyncio.Lock] = None,
+    ) -> dict[str, Any]:
+        """Analysis of ``audio_path``, from the analysis cache unless ``force``.
+
+        ``db_lock`` serializes cache access when the session is shared.
+        """
+        db_lock = db_lock or asyncio.Lock()
+        mode = "chatterbox" if use_chatterbox_analysis else "standard"
+        key = await self._analysis_key(openai_service, audio_path, mode)
+        if key is not None and not force:
+            async with db_lock:
+                cached = await self.analysis_cache.get(key)
+            if cached is not None:
+                logger.info(f"Using cached {mode} analysis of {audio_path.name}")
+                return cached
+
+        analysis = await self._request_analysis(openai_service, audio_path, use_chatterbox_analysis)
+        if key is not None:
+            async with db_lock:
+                await self.analysis_cache.put(key, AUDIO_ANALYSIS_MODEL, mode, analysis)
+                await self.analysis_cache.evict(self.settings.analysis_cache_max_mb * 1024 * 1024)
+        return analysis
+
+    @staticmethod
+    async def _analysis_key(
+        openai_service: OpenAIService, audio_path: Path, mode: str
+    ) -> Optional[str]:
+        """Identify an analysis by the audio content, prompts, model and mode."""
+        try:
+            # Off the event loop: project batches hash many segments at once
+            audio_hash = await asyncio.to_thread(file_digest, str(audio_path))
+        except OSError:
+            # Not cached; the analysis request reports the missing file
+            return None
+        system_prompt, user_prompt = openai_service.analysis_prompts(mode == "chatterbox")
+        return cache_key(audio_hash, system_prompt, user_prompt, AUDIO_ANALYSIS_MODEL, mode)
+
+    @staticmethod
+    async def _request_analysis(
+        openai_service: OpenAIService, audio_path: Path, use_chatterbox_analysis: bool
+    ) -> dict[str, Any]:
+        if use_chatterbox_analysis:
+            return await openai_service.analyze_audio_for_chatterbox(audio_path)
+        return await openai_service.analyze_audio(audio_path)
+
+    @staticmethod
+    def _analysis_values(analysis: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "status": SegmentStatus.ANALYZED,
+            "analysis_json": analysis,
+            "original_transcription": analysis.get("transcription"),
+            "translated_text": analysis.get("translated_text"),
+        }
+
     async def generate_tts(
         self,
         segment: Segment,
         voice: str = "alloy",
         instructions: Optional[str] = None,
         openai: Optional[OpenAIService] = None,
+        force: bool = False,
     ) -> Segment:
-        """Generate TTS audio for segment using OpenAI."""
+        """Generate TTS audio for segment using OpenAI.
+
+        Audio synthesized before from the same inputs is reused unless ``force``.
+        """
         openai_service = openai or self.openai
         if openai_service is None:
             raise ProcessingError("OpenAI service not configured")
@@ -200,6 +473,7 @@ class SegmentService:
             raise ProcessingError(
                 "Segment has no translated text. Analyze or add translation first."
             )
+        text: str = segment.translated_text
 
         output_dir = self._get_output_dir(segment.project_id)
         filename = OpenAIService.format_tts_filename(segment.start_time)
@@ -213,11 +487,18 @@ class SegmentService:
         )
 
         try:
-            await openai_service.generate_tts(
-                text=segment.translated_text,
-                voice=voice,
-                output_path=output_path,
-                instructions=instructions,
+            inputs = TTSInputs("openai", voice, instructions=instructions)
+            await self._render_tts(
+                segment,
+                inputs,
+                output_path,
+                lambda: openai_service.generate_tts(
+                    text=text,
+                    voice=voice,
+                    output_path=output_path,
+                    instructions=instructions,
+                ),
+                force=force,
             )
 
             relative_path = str(output_path.relative_to(self.settings.projects_dir))
@@ -225,6 +506,7 @@ class SegmentService:
                 segment,
                 status=SegmentStatus.COMPLETED,
                 tts_result_file=relative_path,
+                tts_input_hash=inputs.fingerprint(text),
             )
         except Exception as e:
             segment = await self.repo.update(
@@ -236,19 +518,47 @@ class SegmentService:
 
         return segment
 
+    def stream_tts(
+        self,
+        segment: Segment,
+        voice: str = "alloy",
+        instructions: Optional[str] = None,
+        openai: Optional[OpenAIService] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream OpenAI TTS audio for segment while saving it as the result.
+
+        Once fully consumed, the segment ends up as after ``generate_tts``.
+        """
+        openai_service = openai or self.openai
+        if openai_service is None:
+            raise ProcessingError("OpenAI service not configured")
+
+        if not segment.translated_text:
+            raise ProcessingError(
+                "Segment has no translated text. Analyze or add translation first."
+            )
+
+        audio = openai_service.stream_tts(segment.translated_text, voice, instructions)
+        filename = OpenAIService.format_tts_filename(segment.start_time)
+        inputs = TTSInputs("openai", voice, instructions=instructions)
+        return self._stream_tts_result(segment, inputs, filename, audio)
+
     async def generate_tts_chatterbox(
         self,
         segment: Segment,
         voice: str = "Emily.wav",
         custom_voice_path: Optional[str] = None,
-        chatterbox: Optional[ChatterBoxService] = None,
+        chatterbox: Optional[ChatterBoxPool] = None,
         temperature: Optional[float] = None,
         exaggeration: Optional[float] = None,
         cfg_weight: Optional[float] = None,
         speed: Optional[float] = None,
+        force: bool = False,
     ) -> Segment:
         """Generate TTS audio for segment using ChatterBox.
 
+        Audio synthesized before from the same inputs is reused unless ``force``.
+
         Args:
             segment: The segment to generate TTS for
             voice: Voice name (predefined or custom format)
@@ -258,15 +568,17 @@ class SegmentService:
             exaggeration: ChatterBox exaggeration (0.0-1.0)
             cfg_weight: ChatterBox cfg_weight (0.0-1.0)
             speed: Speed factor (0.5-2.0, default 1.0)
+            force: If True, always call ChatterBox
         """
         chatterbox_service = chatterbox or self.chatterbox
         if chatterbox_service is None:
-            chatterbox_service = ChatterBoxService(base_url=self.settings.chatterbox_base_url)
+            raise ProcessingError("ChatterBox service not configured")
 
         if not segment.translated_text:
             raise ProcessingError(
                 "Segment has no translated text. Analyze or add translation first."
             )
+        text: str = segment.translated_text
 
         output_dir = self._get_output_dir(segment.project_id)
         filename = ChatterBoxService.format_tts_filename(segment.start_time)
@@ -280,15 +592,30 @@ class SegmentService:
         )
 
         try:
-            await chatterbox_service.generate_tts(
-                text=segment.translated_text,
-                voice=voice,
-                output_path=output_path,
-                speed=speed if speed is not None else 1.0,
+            inputs = TTSInputs(
+                "chatterbox",
+                voice,
                 custom_voice_path=custom_voice_path,
                 temperature=temperature,
                 exaggeration=exaggeration,
                 cfg_weight=cfg_weight,
+                speed=speed,
+            )
+            await self._render_tts(
+                segment,
+                inputs,
+                output_path,
+                lambda: chatterbox_service.generate_tts(
+                    text=text,
+                    voice=voice,
+                    output_path=output_path,
+                    speed=speed if speed is not None else 1.0,
+                    custom_voice_path=custom_voice_path,
+                    temperature=temperature,
+                    exaggeration=exaggeration,
+                    cfg_weight=cfg_weight,
+                ),
+                force=force,
             )
 
             relative_path = str(output_path.relative_to(self.settings.projects_dir))
@@ -296,6 +623,7 @@ class SegmentService:
                 segment,
                 status=SegmentStatus.COMPLETED,
                 tts_result_file=relative_path,
+                tts_input_hash=inputs.fingerprint(text),
             )
         except Exception as e:
             segment = await self.repo.update(
@@ -306,3 +634,296 @@ class SegmentService:
             raise
 
         return segment
+
+    def stream_tts_chatterbox(
+        self,
+        segment: Segment,
+        voice: str = "Emily.wav",
+        custom_voice_path: Optional[str] = None,
+        chatterbox: Optional[ChatterBoxPool] = None,
+        temperature: Optional[float] = None,
+        exaggeration: Optional[float] = None,
+        cfg_weight: Optional[float] = None,
+        speed: Optional[float] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream ChatterBox TTS audio for segment while saving it as the result.
+
+        Once fully consumed, the segment ends up as after ``generate_tts_chatterbox``.
+        """
+        chatterbox_service = chatterbox or self.chatterbox
+        if chatterbox_service is None:
+            raise ProcessingError("ChatterBox service not configured")
+
+        if not segment.translated_text:
+            raise ProcessingError(
+                "Segment has no translated text. Analyze or add translation first."
+            )
+
+        audio = chatterbox_service.stream_tts(
+            segment.translated_text,
+            voice=voice,
+            speed=speed if speed is not None else 1.0,
+            custom_voice_path=custom_voice_path,
+            temperature=temperature,
+            exaggeration=exaggeration,
+            cfg_weight=cfg_weight,
+        )
+        filename = ChatterBoxService.format_tts_filename(segment.start_time)
+        inputs = TTSInputs(
+            "chatterbox",
+            voice,
+            custom_voice_path=custom_voice_path,
+            temperature=temperature,
+            exaggeration=exaggeration,
+            cfg_weight=cfg_weight,
+            speed=speed,
+        )
+        return self._stream_tts_result(segment, inputs, filename, audio)
+
+    async def _stream_tts_result(
+        self,
+        segment: Segment,
+        inputs: TTSInputs,
+        filename: str,
+        audio: AsyncIterator[bytes],
+    ) -> AsyncGenerator[bytes, None]:
+        """Pass TTS audio through while saving it, with the status changes of generate_tts.
+
+        Status changes are committed right away because the stream outlives
+        the request handler. The request's session stays open until the
+        response has been sent (FastAPI 0.118 and later, as required). If the
+        consumer stops early (the client went away), the previous status and
+        result file are kept.
+        """
+        output_dir = self._get_output_dir(segment.project_id)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = output_dir / filename
+        previous = {"status": segment.status, "tts_voice": segment.tts_voice}
+        fingerprint = inputs.fingerprint(segment.translated_text or "")
+
+        segment = await self.repo.update(
+            segment,
+            status=SegmentStatus.GENERATING_TTS,
+            tts_voice=inputs.voice,
+        )
+        await self.repo.commit()
+
+        try:
+            async with aclosing(tee_stream_atomic(output_path, audio)) as stream:
+                async for chunk in stream:
+                    yield chunk
+        except Exception as e:
+            await self.repo.update(
+                segment,
+                status=SegmentStatus.ERROR,
+                error_message=str(e),
+            )
+            await self.repo.commit()
+            raise
+        except BaseException:
+            # Shielded so a repeated cancellation cannot leave it generating
+            await asyncio.shield(self._restore(segment, previous))
+            raise
+
+        key = self.tts_cache.key_for(inputs, segment.translated_text or "")
+        if key is not None:
+            self.tts_cache.store(key, output_path)
+
+        relative_path = str(output_path.relative_to(self.settings.projects_dir))
+        await self.repo.update(
+            segment,
+            status=SegmentStatus.COMPLETED,
+            tts_result_file=relative_path,
+            tts_input_hash=fingerprint,
+        )
+        await self.repo.commit()
+
+    async def generate_all_tts(
+        self,
+        project: Project,
+        inputs_for: Callable[[Segment], Awaitable[TTSInputs]],
+        openai: Optional[OpenAIService] = None,
+        chatterbox: Optional[ChatterBoxPool] = None,
+        concurrency: int = 1,
+        force: bool = False,
+    ) -> BatchTTS:
+        """Generate TTS audio for every segment of a project that has translated text.
+
+        A segment whose completed result was synthesized from its current
+        text with the same inputs is left alone unless ``force`` is set. Up
+        to ``concurrency`` TTS requests run at once; each result is committed
+        as soon as it is saved, and a failed segment is marked as errored
+        without stopping the others.
+
+        Args:
+            project: The project whose segments to synthesize
+            inputs_for: Provider, voice and parameters to use for a segment
+            openai: OpenAI service instance, for OpenAI inputs
+            chatterbox: Optional ChatterBox service instance, for ChatterBox inputs
+            concurrency: Maximum number of concurrent TTS requests
+            force: Regenerate segments whose result is up to date, bypassing the TTS cache
+        """
+        openai_service = openai or self.openai
+        chatterbox_service = chatterbox or self.chatterbox
+
+        segments = await self.repo.list_by_project(project.id)
+        result = BatchTTS(total=len(segments))
+        planned: list[tuple[Segment, TTSInputs, str]] = []
+        for segment in segments:
+            if not segment.translated_text or segment.status == SegmentStatus.GENERATING_TTS:
+                result.skipped += 1
+                continue
+            inputs = await inputs_for(segment)
+            fingerprint = inputs.fingerprint(segment.translated_text)
+            if not force and self._tts_is_current(segment, fingerprint):
+                result.unchanged += 1
+                continue
+            planned.append((segment, inputs, fingerprint))
+        if not planned:
+            return result
+
+        providers = {inputs.provider for _, inputs, _ in planned}
+        if "openai" in providers and openai_service is None:
+            raise ProcessingError("OpenAI service not configured")
+        if "chatterbox" in providers and chatterbox_service is None:
+            raise ProcessingError("ChatterBox service not configured")
+
+        previous = {s.id: {"status": s.status, "tts_voice": s.tts_voice} for s, _, _ in planned}
+        updated = await self.repo.update_many(
+            [
+                (s, {"status": SegmentStatus.GENERATING_TTS, "tts_voice": inputs.voice})
+                for s, inputs, _ in planned
+            ]
+        )
+        planned = [(s, inputs, fp) for s, (_, inputs, fp) in zip(updated, planned)]
+        await self.repo.commit()
+        logger.info(f"Generating TTS for {len(planned)} segments of project {project.id}")
+
+        semaphore = asyncio.Semaphore(concurrency)
+        # The session is shared, so database access is serialized
+        db_lock = asyncio.Lock()
+        unfinished = {s.id: s for s, _, _ in planned}
+
+        async def synthesize(segment: Segment, inputs: TTSInputs, fingerprint: str) -> None:
+            try:
+                async with semaphore:
+                    output_path = await self._synthesize(
+                        segment, inputs, openai_service, chatterbox_service, force=force
+                    )
+                values = {
+                    "status": SegmentStatus.COMPLETED,
+                    "tts_result_file": str(output_path.relative_to(self.settings.projects_dir)),
+                    "tts_input_hash": fingerprint,
+                }
+            except Exception as e:
+                values = {"status": SegmentStatus.ERROR, "error_message": str(e)}
+
+            async with db_lock:
+                segment = await self.repo.update(segment, **values)
+                await self.repo.commit()
+                del unfinished[segment.id]
+
+            if segment.status == SegmentStatus.ERROR:
+                result.failed.append(segment)
+            else:
+                result.generated.append(segment)
+            done = len(result.generated) + len(result.failed)
+            if done % 10 == 0 or done == len(planned):
+                logger.info(
+                    f"Project {project.id}: TTS for {done}/{len(planned)} segments "
+                    f"({len(result.failed)} failed)"
+                )
+
+        try:
+            await asyncio.gather(*(synthesize(*job) for job in planned))
+        except BaseException:
+            # Interrupted: segments still waiting for audio go back to how they were.
+            # Shielded so a repeated cancellation cannot leave them generating.
+            await asyncio.shield(self._restore_many(list(unfinished.values()), previous))
+            raise
+
+        return result
+
+    def _tts_is_current(self, segment: Segment, fingerprint: str) -> bool:
+        return (
+            segment.status == SegmentStatus.COMPLETED
+            and segment.tts_input_hash == fingerprint
+            and segment.tts_result_file is not None
+            and (self.settings.projects_dir / segment.tts_result_file).exists()
+        )
+
+    async def _synthesize(
+        self,
+        segment: Segment,
+        inputs: TTSInputs,
+        openai_service: Optional[OpenAIService],
+        chatterbox_service: Optional[ChatterBoxPool],
+        force: bool = False,
+    ) -> Path:
+        output_dir = self._get_output_dir(segment.project_id)
+        text = segment.translated_text or ""
+        if inputs.provider == "chatterbox" and chatterbox_service is not None:
+            output_path = output_dir / ChatterBoxService.format_tts_filename(segment.start_time)
+            await self._render_tts(
+                segment,
+                inputs,
+                output_path,
+                lambda: chatterbox_service.generate_tts(
+                    text=text,
+                    voice=inputs.voice,
+                    output_path=output_path,
+                    speed=inputs.speed if inputs.speed is not None else 1.0,
+                    custom_voice_path=inputs.custom_voice_path,
+                    temperature=inputs.temperature,
+                    exaggeration=inputs.exaggeration,
+                    cfg_weight=inputs.cfg_weight,
+                ),
+                force=force,
+            )
+            return output_path
+        if openai_service is None:
+            raise ProcessingError("OpenAI service not configured")
+        output_path = output_dir / OpenAIService.format_tts_filename(segment.start_time)
+        await self._render_tts(
+            segment,
+            inputs,
+            output_path,
+            lambda: openai_service.generate_tts(
+                text=text,
+                voice=inputs.voice,
+                output_path=output_path,
+                instructions=inputs.instructions,
+            ),
+            force=force,
+        )
+        return output_path
+
+    async def _render_tts(
+        self,
+        segment: Segment,
+        inputs: TTSInputs,
+        output_path: Path,
+        synthesize: Callable[[], Awaitable[Any]],
+        force: bool = False,
+    ) -> None:
+        """Write a segment's TTS audio to ``output_path``, from the TTS cache if possible.
+
+        ``synthesize`` calls the provider on a miss, or always with ``force``;
+        its result is then cached.
+        """
+        key = self.tts_cache.key_for(inputs, segment.translated_text or "")
+        if key is not None and not force and self.tts_cache.restore(key, output_path):
+            return
+        await synthesize()
+        if key is not None:
+            self.tts_cache.store(key, output_path)
+
+    async def _restore_many(
+        self, segments: list[Segment], values: dict[str, dict[str, Any]]
+    ) -> None:
+        await self.repo.update_many([(s, values[s.id]) for s in segments])
+        await self.repo.commit()
+
+    async def _restore(self, segment: Segment, values: dict[str, Any]) -> None:
+        await self.repo.update(segment, **values)
+        await self.repo.commit()
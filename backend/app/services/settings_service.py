@@ -6,13 +6,19 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.app_settings import DEFAULT_CONTEXT, TTSProvider, UserSettings
+from app.services.openai_client_registry import OpenAIClientRegistry
 
 
 class SettingsService:
     """Service for managing per-user settings."""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        openai_clients: Optional[OpenAIClientRegistry] = None,
+    ):
         self.session = session
+        self.openai_clients = openai_clients
 
     async def get_settings(self, user_id: str) -> UserSettings:
         """Get or create user settings."""
@@ -45,7 +51,10 @@ class SettingsService:
         """Update user settings."""
         settings = await self.get_settings(user_id)
 
-        if openai_api_key is not None:
+        if openai_api_key is not None and openai_api_key != settings.openai_api_key:
+            if self.openai_clients is not None and settings.openai_api_key:
+                # Close the client for the replaced key
+                await self.openai_clients.invalidate(settings.openai_api_key)
             settings.openai_api_key = openai_api_key
         if context_description is not None:
             settings.context_description = context_description
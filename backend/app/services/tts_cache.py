@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from app.config import Settings
+from app.services.openai_service import TTS_MODEL
+from app.utils.disk_cache import cache_key, evict_lru, file_digest, touch_cached
+
+if TYPE_CHECKING:
+    from app.services.segment_service import TTSInputs
+
+logger = logging.getLogger(__name__)
+
+# Model part of the key; ChatterBox serves a single model
+TTS_MODELS = {"openai": TTS_MODEL, "chatterbox": "chatterbox"}
+
+
+class TTSCache:
+    """Content-addressed, size-bounded cache of synthesized segment audio.
+
+    Entries are named by a hash of everything the audio depends on: provider,
+    model, voice (the file content for custom voices), text, instructions and
+    ChatterBox parameters. A hit is hardlinked to the segment's output path,
+    or copied where the cache lives on another file system. Results are
+    always replaced by rename, never rewritten in place, so a file shared by
+    a link cannot change under the other name. When the cache outgrows
+    ``tts_cache_max_mb``, the least recently used entries are removed.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.cache_dir = settings.cache_dir / "tts"
+
+    def key_for(self, inputs: TTSInputs, text: str) -> Optional[str]:
+        """Key of the audio ``inputs`` produce for ``text``; None if it cannot be cached."""
+        voice_hash = None
+        if inputs.custom_voice_path:
+            try:
+                voice_hash = file_digest(inputs.custom_voice_path)
+            except OSError:
+                # The provider reports the missing voice file
+                return None
+        return cache_key(
+            inputs.fingerprint(text), TTS_MODELS.get(inputs.provider, inputs.provider), voice_hash
+        )
+
+    def get_path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / f"{key}{suffix}"
+
+    def restore(self, key: str, output_path: Path) -> bool:
+        """Put the cached audio for ``key`` at ``output_path``; False on a miss."""
+        path = self.get_path(key, output_path.suffix)
+        if not touch_cached(path):
+            return False
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            _link_or_copy(path, output_path)
+        except FileNotFoundError:
+            # Evicted in the meantime
+            return False
+        logger.info(f"Reused cached TTS audio {path.name} for {output_path}")
+        return True
+
+    def store(self, key: str, output_path: Path) -> None:
+        """Add freshly synthesized audio at ``output_path`` to the cache."""
+        path = self.get_path(key, output_path.suffix)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            _link_or_copy(output_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to cache TTS audio {output_path}: {e}")
+            return
+        max_bytes = self.settings.tts_cache_max_mb * 1024 * 1024
+        evict_lru(self.cache_dir, "*", max_bytes, keep=path)
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Atomically replace ``target`` with a hardlink to ``source``, or a copy of it."""
+    tmp_path = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        try:
+            os.link(source, tmp_path)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # Different file system, or links not supported
+            shutil.copyfile(source, tmp_path)
+        # A link keeps the source's mtime; the target must read as just written,
+        # which SegmentReconciler relies on to recognize finished TTS
+        os.utime(tmp_path)
+        tmp_path.replace(target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+
+from app.config import Settings
+from app.services.file_service import FileService
+from app.utils.exceptions import ConflictError, FileValidationError, NotFoundError
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Per-session commit locks, shared by all requests in the process
+_commit_locks: dict[str, asyncio.Lock] = {}
+
+
+@dataclass
+class UploadSession:
+    """State of a resumable upload, stored as ``session.json``."""
+
+    id: str
+    project_id: str
+    filename: str
+    size: int
+    chunk_size: int
+    received_chunks: list[int] = field(default_factory=list)
+
+    @property
+    def chunk_count(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    def chunk_length(self, index: int) -> int:
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+
+class UploadService:
+    """Resumable chunked video uploads.
+
+    Each session lives in ``{project}/uploads/{upload_id}/`` with three files:
+    ``session.json`` (metadata), ``data`` (the video, a sparse file of its full
+    size whose space is allocated chunk by chunk) and ``chunks`` (one byte per
+    chunk, set once the chunk is stored). Chunks are written at their offset
+    into ``data``, so they can arrive in any order and in parallel, and the
+    session survives server restarts.
+
+    A project keeps at most ``upload_max_sessions_per_project`` sessions; a
+    new one replaces the least recently active. Sessions without a chunk for
+    ``upload_session_ttl_hours`` are removed by ``sweep_stale``.
+    """
+
+    def __init__(self, settings: Settings, file_service: FileService) -> None:
+        self.settings = settings
+        self.file_service = file_service
+
+    def get_uploads_path(self, project_id: str) -> Path:
+        return self.file_service.get_project_path(project_id) / "uploads"
+
+    def _session_path(self, project_id: str, upload_id: str) -> Path:
+        try:
+            # Rejects anything that could escape the uploads directory
+            upload_id = uuid.UUID(upload_id).hex
+        except ValueError:
+            raise NotFoundError(f"Upload with ID {upload_id} not found") from None
+        return self.get_uploads_path(project_id) / upload_id
+
+    async def create(self, project_id: str, filename: str, size: int) -> UploadSession:
+        """Start an upload, replacing the project's oldest one beyond the limit.
+
+        Args:
+            project_id: Project the video belongs to
+            filename: Client filename, used only for its extension
+            size: Total file size in bytes
+
+        Returns:
+            The new session with no chunks received
+        """
+        self.file_service.validate_video_extension(filename)
+        if size > self.settings.max_upload_size_bytes:
+            raise FileValidationError(
+                f"File exceeds maximum upload size of {self.settings.max_upload_size_mb} MB"
+            )
+
+        await asyncio.to_thread(
+            self._prune,
+            self.get_uploads_path(project_id),
+            max(0, self.settings.upload_max_sessions_per_project - 1),
+        )
+        free = shutil.disk_usage(self.settings.projects_dir).free
+        if size > free:
+            raise FileValidationError(f"Not enough disk space for upload: {free} bytes free")
+
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            project_id=project_id,
+            filename=filename,
+            size=size,
+            chunk_size=self.settings.upload_chunk_size_bytes,
+        )
+        session_path = self._session_path(project_id, session.id)
+        try:
+            await asyncio.to_thread(self._allocate, session_path, session)
+        except OSError as e:
+            shutil.rmtree(session_path, ignore_errors=True)
+            raise FileValidationError(f"Cannot create upload: {e}") from e
+
+        logger.info(f"Started upload {session.id} for project {project_id} ({size} bytes)")
+        return session
+
+    @staticmethod
+    def _allocate(session_path: Path, session: UploadSession) -> None:
+        session_path.mkdir(parents=True)
+        with (session_path / "data").open("wb") as f:
+            # Sparse: takes no space until chunks arrive
+            f.truncate(session.size)
+        (session_path / "chunks").write_bytes(bytes(session.chunk_count))
+        metadata = asdict(session)
+        del metadata["received_chunks"]
+        (session_path / "session.json").write_text(json.dumps(metadata))
+
+    async def get(self, project_id: str, upload_id: str) -> UploadSession:
+        session_path = self._session_path(project_id, upload_id)
+        try:
+            async with aiofiles.open(session_path / "session.json") as f:
+                metadata = json.loads(await f.read())
+            async with aiofiles.open(session_path / "chunks", "rb") as f:
+                bitmap = await f.read()
+        except FileNotFoundError:
+            raise NotFoundError(f"Upload with ID {upload_id} not found") from None
+
+        return UploadSession(
+            **metadata,
+            received_chunks=[index for index, flag in enumerate(bitmap) if flag],
+        )
+
+    async def write_chunk(
+        self,
+        project_id: str,
+        upload_id: str,
+        index: int,
+        stream: AsyncIterator[bytes],
+    ) -> None:
+        """Store one chunk at its offset in the upload file.
+
+        The chunk is only marked as received once all of its bytes are written,
+        so an interrupted transfer leaves it missing and the client resends it.
+
+        Args:
+            project_id: Project the upload belongs to
+            upload_id: Upload session ID
+            index: Zero-based chunk index
+            stream: Raw chunk bytes
+        """
+        session = await self.get(project_id, upload_id)
+        if not 0 <= index < session.chunk_count:
+            raise FileValidationError(
+                f"Chunk index {index} out of range (0-{session.chunk_count - 1})"
+            )
+
+        session_path = self._session_path(project_id, upload_id)
+        if index in session.received_chunks:
+            # A resent chunk is missing again until it has been fully rewritten
+            await self._set_received(session_path, index, False)
+
+        expected = session.chunk_length(index)
+        offset = index * session.chunk_size
+        try:
+            await asyncio.to_thread(self._reserve, session_path / "data", offset, expected)
+        except OSError as e:
+            raise FileValidationError(f"Cannot reserve space for chunk {index}: {e}") from e
+        written = 0
+        async with aiofiles.open(session_path / "data", "r+b") as f:
+            await f.seek(offset)
+            async for data in stream:
+                written += len(data)
+                if written > expected:
+                    raise FileValidationError(f"Chunk {index} exceeds {expected} bytes")
+                await f.write(data)
+        if written != expected:
+            raise FileValidationError(f"Chunk {index} is incomplete: {written} of {expected} bytes")
+
+        await self._set_received(session_path, index, True)
+
+    @staticmethod
+    def _reserve(path: Path, offset: int, length: int) -> None:
+        """Allocate a chunk's range up front, so a full disk fails before any bytes are read."""
+        if hasattr(os, "posix_fallocate"):
+            with path.open("r+b") as f:
+                os.posix_fallocate(f.fileno(), offset, length)
+
+    @staticmethod
+    async def _set_received(session_path: Path, index: int, received: bool) -> None:
+        async with aiofiles.open(session_path / "chunks", "r+b") as f:
+            await f.seek(index)
+            await f.write(b"\x01" if received else b"\x00")
+
+    async def commit(self, project_id: str, upload_id: str, sha256: str) -> str:
+        """Verify a complete upload and move it into place as the project video.
+
+        Concurrent commits of the same session run one after the other, so
+        the later one finds the session gone.
+
+        Args:
+            project_id: Project the upload belongs to
+            upload_id: Upload session ID
+            sha256: Hex SHA-256 of the whole file, as computed by the client
+
+        Returns:
+            Path of the saved video relative to the projects directory
+        """
+        key = str(self._session_path(project_id, upload_id))
+        lock = _commit_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                return await self._commit(project_id, upload_id, sha256)
+        finally:
+            if not lock.locked():
+                _commit_locks.pop(key, None)
+
+    async def _commit(self, project_id: str, upload_id: str, sha256: str) -> str:
+        session = await self.get(project_id, upload_id)
+        missing = session.chunk_count - len(session.received_chunks)
+        if missing:
+            raise FileValidationError(f"Upload is incomplete: {missing} chunks missing")
+        ext = self.file_service.validate_video_extension(session.filename)
+
+        session_path = self._session_path(project_id, upload_id)
+        digest = await asyncio.to_thread(self._hash_file, session_path / "data")
+        if digest != sha256.lower():
+            raise FileValidationError("Upload checksum mismatch")
+
+        source_dir = self.file_service.get_source_path(project_id)
+        source_dir.mkdir(parents=True, exist_ok=True)
+        dest_path = source_dir / f"video{ext}"
+        try:
+            (session_path / "data").replace(dest_path)
+        except FileNotFoundError:
+            # Committed or aborted by another worker process meanwhile
+            raise ConflictError(f"Upload {upload_id} was already committed or aborted") from None
+        shutil.rmtree(session_path, ignore_errors=True)
+
+        logger.info(f"Completed upload {upload_id} for project {project_id}")
+        return str(dest_path.relative_to(self.settings.projects_dir))
+
+    async def abort(self, project_id: str, upload_id: str) -> None:
+        session_path = self._session_path(project_id, upload_id)
+        if not session_path.exists():
+            raise NotFoundError(f"Upload with ID {upload_id} not found")
+        await asyncio.to_thread(shutil.rmtree, session_path, True)
+
+    def sweep_stale(self) -> int:
+        """Remove sessions of all projects that have been inactive for too long.
+
+        Returns:
+            Number of sessions removed
+        """
+        removed = 0
+        for uploads_path in self.settings.projects_dir.glob("*/uploads"):
+            removed += self._prune(uploads_path)
+        return removed
+
+    def _prune(self, uploads_path: Path, keep: Optional[int] = None) -> int:
+        """Remove expired sessions, then all but the ``keep`` most recently active."""
+        sessions = []
+        for session_path in uploads_path.glob("*"):
+            try:
+                sessions.append((self._last_active(session_path), session_path))
+            except FileNotFoundError:
+                continue
+        sessions.sort(reverse=True)
+
+        expires_before = time.time() - self.settings.upload_session_ttl_hours * 3600
+        removed = 0
+        for position, (last_active, session_path) in enumerate(sessions):
+            if last_active >= expires_before and (keep is None or position < keep):
+                continue
+            shutil.rmtree(session_path, ignore_errors=True)
+            logger.info(
+                f"Removed inactive upload {session_path.name} of {uploads_path.parent.name}"
+            )
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _last_active(session_path: Path) -> float:
+        # The chunk bitmap is rewritten whenever a chunk starts or completes
+        chunks_path = session_path / "chunks"
+        path = chunks_path if chunks_path.exists() else session_path
+        return path.stat().st_mtime
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with path.open("rb") as f:
+            while block := f.read(HASH_BLOCK_SIZE):
+                digest.update(block)
+        return digest.hexdigest()
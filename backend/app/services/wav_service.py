@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.utils.exceptions import ProcessingError
+
+logger = logging.getLogger(__name__)
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Format written by FFmpegService.extract_audio / extract_segment
+SEGMENT_SAMPLE_RATE = 44100
+SEGMENT_CHANNELS = 2
+SEGMENT_BITS_PER_SAMPLE = 16
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class WavFormat:
+    """Layout of a PCM WAV file."""
+
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    block_align: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frame_count(self) -> int:
+        return self.data_size // self.block_align
+
+
+class WavService:
+    """In-process slicing of PCM WAV files.
+
+    Cutting a segment out of 16-bit PCM only needs a new header plus a
+    byte-range copy, which is done in the kernel with ``copy_file_range`` or
+    ``sendfile`` instead of spawning FFmpeg.
+    """
+
+    @staticmethod
+    def read_format(audio_path: Path) -> Optional[WavFormat]:
+        """Parse the RIFF header of a WAV file.
+
+        Returns:
+            The file layout, or None if the file is not uncompressed PCM WAV
+        """
+        try:
+            with audio_path.open("rb") as f:
+                riff = f.read(12)
+                if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+                    return None
+
+                fmt: Optional[tuple[int, int, int, int, int]] = None
+                file_size = audio_path.stat().st_size
+                while True:
+                    chunk_header = f.read(8)
+                    if len(chunk_header) < 8:
+                        return None
+                    chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+
+                    if chunk_id == b"fmt ":
+                        body = f.read(chunk_size)
+                        if len(body) < 16:
+                            return None
+                        audio_format, channels, sample_rate, _, block_align, bits = struct.unpack(
+                            "<HHIIHH", body[:16]
+                        )
+                        if audio_format == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                            audio_format = struct.unpack("<H", body[24:26])[0]
+                        fmt = (audio_format, channels, sample_rate, block_align, bits)
+                    elif chunk_id == b"data":
+                        if fmt is None or fmt[0] != WAVE_FORMAT_PCM or fmt[3] == 0:
+                            return None
+                        data_offset = f.tell()
+                        # Streams written to pipes leave the size unset; trust the file size
+                        data_size = min(chunk_size, file_size - data_offset)
+                        return WavFormat(
+                            channels=fmt[1],
+                            sample_rate=fmt[2],
+                            bits_per_sample=fmt[4],
+                            block_align=fmt[3],
+                            data_offset=data_offset,
+                            data_size=data_size,
+                        )
+                    else:
+                        f.seek(chunk_size, os.SEEK_CUR)
+
+                    # Chunks are word aligned
+                    if chunk_size % 2:
+                        f.seek(1, os.SEEK_CUR)
+        except OSError:
+            return None
+
+    def can_slice(self, audio_path: Path) -> bool:
+        """Check whether segments can be cut without re-encoding."""
+        wav_format = self.read_format(audio_path)
+        return (
+            wav_format is not None
+            and wav_format.sample_rate == SEGMENT_SAMPLE_RATE
+            and wav_format.channels == SEGMENT_CHANNELS
+            and wav_format.bits_per_sample == SEGMENT_BITS_PER_SAMPLE
+        )
+
+    async def extract_segment(
+        self,
+        audio_path: Path,
+        output_path: Path,
+        start_time: float,
+        end_time: float,
+    ) -> Path:
+        """Extract a segment from a PCM WAV file by copying its byte range.
+
+        Args:
+            audio_path: Path to source audio file
+            output_path: Path where segment will be written
+            start_time: Start time in seconds
+            end_time: End time in seconds
+
+        Returns:
+            Path to extracted segment file
+        """
+        await self.extract_segments(audio_path, [(output_path, start_time, end_time)])
+        return output_path
+
+    async def extract_segments(
+        self,
+        audio_path: Path,
+        segments: list[tuple[Path, float, float]],
+    ) -> list[Path]:
+        """Extract many segments from a PCM WAV file.
+
+        Args:
+            audio_path: Path to source audio file
+            segments: (output_path, start_time, end_time) for each segment
+
+        Returns:
+            Paths to extracted segment files, in the order given
+        """
+        if not audio_path.exists():
+            raise ProcessingError(f"Audio file not found: {audio_path}")
+
+        wav_format = self.read_format(audio_path)
+        if wav_format is None:
+            raise ProcessingError(f"Not a PCM WAV file: {audio_path}")
+
+        for output_path, start_time, end_time in segments:
+            if start_time < 0:
+                raise ProcessingError("Start time cannot be negative")
+            if end_time <= start_time:
+                raise ProcessingError("End time must be greater than start time")
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        await asyncio.to_thread(self._write_segments, audio_path, wav_format, segments)
+        return [output_path for output_path, _, _ in segments]
+
+    def _write_segments(
+        self,
+        audio_path: Path,
+        wav_format: WavFormat,
+        segments: list[tuple[Path, float, float]],
+    ) -> None:
+        with audio_path.open("rb") as src:
+            for output_path, start_time, end_time in segments:
+                start_frame = min(
+                    round(start_time * wav_format.sample_rate), wav_format.frame_count
+                )
+                end_frame = min(round(end_time * wav_format.sample_rate), wav_format.frame_count)
+                offset = wav_format.data_offset + start_frame * wav_format.block_align
+                length = (end_frame - start_frame) * wav_format.block_align
+
+                with output_path.open("wb") as dst:
+                    dst.write(self.build_header(wav_format, length))
+                    dst.flush()
+                    self._copy_range(src.fileno(), dst.fileno(), offset, length)
+
+    @staticmethod
+    def build_header(wav_format: WavFormat, data_size: int) -> bytes:
+        """Build a canonical 44-byte PCM WAV header."""
+        byte_rate = wav_format.sample_rate * wav_format.block_align
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            36 + data_size,
+            b"WAVE",
+            b"fmt ",
+            16,
+            WAVE_FORMAT_PCM,
+            wav_format.channels,
+            wav_format.sample_rate,
+            byte_rate,
+            wav_format.block_align,
+            wav_format.bits_per_sample,
+            b"data",
+            data_size,
+        )
+
+    @staticmethod
+    def _copy_range(src_fd: int, dst_fd: int, offset: int, length: int) -> None:
+        """Copy a byte range between files, preferring in-kernel copies.
+
+        The destination is written at its current position.
+        """
+        end = offset + length
+        copy_file_range = getattr(os, "copy_file_range", None)
+        sendfile = getattr(os, "sendfile", None)
+
+        while offset < end:
+            count = min(end - offset, COPY_CHUNK_SIZE * 64)
+            try:
+                if copy_file_range is not None:
+                    copied = copy_file_range(src_fd, dst_fd, count, offset)
+                elif sendfile is not None:
+                    copied = sendfile(dst_fd, src_fd, offset, count)
+                else:
+                    copied = os.write(dst_fd, os.pread(src_fd, min(count, COPY_CHUNK_SIZE), offset))
+            except OSError as e:
+                if copy_file_range is None and sendfile is None:
+                    raise
+                # Not supported for this filesystem pair; retry with a plainer method
+                logger.debug(f"In-kernel copy unavailable ({e}), falling back")
+                if copy_file_range is not None:
+                    copy_file_range = None
+                else:
+                    sendfile = None
+                continue
+            if copied == 0:
+                break
+            offset += copied
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+from app.schemas.waveform import WaveformPeaks
+from app.services.wav_service import WavFormat, WavService
+from app.utils.exceptions import ProcessingError
+
+logger = logging.getLogger(__name__)
+
+# Zoom levels of the peaks pyramid, in source samples per peak. Each level is
+# derived from the previous one, so every value must divide the next.
+PEAK_LEVELS = (256, 1024, 4096, 16384)
+
+# Upper bound on peaks returned by a single request; finer levels are skipped
+# when the requested window would exceed it.
+MAX_PEAKS_PER_REQUEST = 65536
+
+# Peaks computed per chunk while scanning the memory-mapped audio
+PEAKS_PER_CHUNK = 8192
+
+
+class WaveformService:
+    """Precomputed min/max waveform peaks for project audio.
+
+    Peaks are stored next to the audio file as one ``.npy`` array per zoom
+    level (shape ``(n, 2)``, int16 min/max across channels), so windows can be
+    served from a memory map without touching the audio itself. A
+    ``source.json`` written after the levels records which audio they were
+    built from, so they are rebuilt once the audio is replaced.
+    """
+
+    def __init__(self, wav: Optional[WavService] = None) -> None:
+        self.wav = wav or WavService()
+
+    @staticmethod
+    def get_peaks_dir(audio_path: Path) -> Path:
+        return audio_path.parent / f"{audio_path.stem}_peaks"
+
+    @staticmethod
+    def _level_path(peaks_dir: Path, samples_per_peak: int) -> Path:
+        return peaks_dir / f"{samples_per_peak}.npy"
+
+    @staticmethod
+    def _source_path(peaks_dir: Path) -> Path:
+        return peaks_dir / "source.json"
+
+    @staticmethod
+    def _source_stamp(audio_path: Path) -> dict[str, int]:
+        stat = audio_path.stat()
+        return {"inode": stat.st_ino, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _is_current(self, audio_path: Path, peaks_dir: Path) -> bool:
+        """Whether all levels exist and were built from the audio as it is now."""
+        if not all(self._level_path(peaks_dir, spp).exists() for spp in PEAK_LEVELS):
+            return False
+        try:
+            stamp = json.loads(self._source_path(peaks_dir).read_text())
+            return bool(stamp == self._source_stamp(audio_path))
+        except (OSError, ValueError):
+            return False
+
+    async def generate_peaks(self, audio_path: Path) -> Path:
+        """Build the peaks pyramid for a 16-bit PCM WAV file.
+
+        Args:
+            audio_path: Path to the WAV file
+
+        Returns:
+            Directory containing one peaks file per zoom level
+        """
+        if not audio_path.exists():
+            raise ProcessingError(f"Audio file not found: {audio_path}")
+
+        wav_format = self.wav.read_format(audio_path)
+        if wav_format is None or wav_format.bits_per_sample != 16:
+            raise ProcessingError(f"Waveform peaks require 16-bit PCM WAV: {audio_path}")
+
+        peaks_dir = self.get_peaks_dir(audio_path)
+        await asyncio.to_thread(self._build_peaks, audio_path, wav_format, peaks_dir)
+        return peaks_dir
+
+    def _build_peaks(self, audio_path: Path, wav_format: WavFormat, peaks_dir: Path) -> None:
+        peaks_dir.mkdir(parents=True, exist_ok=True)
+        # Taken before reading, so audio replaced meanwhile is not recorded as the source
+        stamp = self._source_stamp(audio_path)
+
+        # Finest level straight from the samples, chunk by chunk to bound memory
+        block = PEAK_LEVELS[0]
+        level = np.zeros((0, 2), dtype=np.int16)
+        if wav_format.frame_count:
+            samples = np.memmap(
+                audio_path,
+                dtype="<i2",
+                mode="r",
+                offset=wav_format.data_offset,
+                shape=(wav_format.frame_count, wav_format.channels),
+            )
+            chunk_frames = block * PEAKS_PER_CHUNK
+            level = np.concatenate(
+                [
+                    self._reduce_samples(samples[start : start + chunk_frames], block)
+                    for start in range(0, len(samples), chunk_frames)
+                ]
+            )
+            del samples
+        self._save_level(peaks_dir, block, level)
+
+        # Coarser levels from the previous level
+        for finer, coarser in zip(PEAK_LEVELS, PEAK_LEVELS[1:]):
+            level = self._reduce_peaks(level, coarser // finer)
+            self._save_level(peaks_dir, coarser, level)
+
+        with _replacing(self._source_path(peaks_dir)) as f:
+            f.write(json.dumps(stamp).encode())
+
+    @staticmethod
+    def _reduce_samples(samples: np.ndarray, block: int) -> np.ndarray:
+        """Reduce (frames, channels) samples to (n, 2) min/max peaks."""
+        count = -(-len(samples) // block)
+        padded = np.empty((count * block, samples.shape[1]), dtype=np.int16)
+        padded[: len(samples)] = samples
+        # Repeating the last frame keeps min/max of the trailing partial block intact
+        padded[len(samples) :] = samples[-1]
+        blocks = padded.reshape(count, -1)
+        return np.stack([blocks.min(axis=1), blocks.max(axis=1)], axis=1)
+
+    @staticmethod
+    def _reduce_peaks(peaks: np.ndarray, factor: int) -> np.ndarray:
+        if len(peaks) == 0:
+            return peaks
+        count = -(-len(peaks) // factor)
+        padded = np.concatenate([peaks, np.repeat(peaks[-1:], count * factor - len(peaks), axis=0)])
+        groups = padded.reshape(count, factor, 2)
+        return np.stack([groups[:, :, 0].min(axis=1), groups[:, :, 1].max(axis=1)], axis=1)
+
+    def _save_level(self, peaks_dir: Path, samples_per_peak: int, level: np.ndarray) -> None:
+        with _replacing(self._level_path(peaks_dir, samples_per_peak)) as f:
+            np.save(f, level.astype(np.int16, copy=False))
+
+    async def get_peaks(
+        self,
+        audio_path: Path,
+        start_time: float = 0.0,
+        end_time: Optional[float] = None,
+        samples_per_peak: int = PEAK_LEVELS[1],
+    ) -> WaveformPeaks:
+        """Read a window of peaks at the closest available resolution.
+
+        Peaks are built on first use for audio extracted before they existed,
+        and rebuilt when the audio changed since they were built.
+
+        Args:
+            audio_path: Path to the WAV file
+            start_time: Window start in seconds
+            end_time: Window end in seconds (defaults to end of audio)
+            samples_per_peak: Requested resolution; the finest stored level
+                not finer than this is used
+
+        Returns:
+            Interleaved min/max peaks for the window
+        """
+        if start_time < 0:
+            raise ProcessingError("Start time cannot be negative")
+        if end_time is not None and end_time <= start_time:
+            raise ProcessingError("End time must be greater than start time")
+
+        wav_format = self.wav.read_format(audio_path)
+        if wav_format is None:
+            raise ProcessingError(f"Audio file not found or not PCM WAV: {audio_path}")
+
+        peaks_dir = self.get_peaks_dir(audio_path)
+        if not await asyncio.to_thread(self._is_current, audio_path, peaks_dir):
+            await self.generate_peaks(audio_path)
+
+        duration = wav_format.frame_count / wav_format.sample_rate
+        window_end = duration if end_time is None else min(end_time, duration)
+        window_frames = max(0.0, window_end - start_time) * wav_format.sample_rate
+
+        # Finest level not finer than requested, coarsened until the window fits
+        requested = max(
+            [spp for spp in PEAK_LEVELS if spp <= samples_per_peak], default=PEAK_LEVELS[0]
+        )
+        level_spp = next(
+            (
+                spp
+                for spp in PEAK_LEVELS
+                if spp >= requested and window_frames / spp <= MAX_PEAKS_PER_REQUEST
+            ),
+            PEAK_LEVELS[-1],
+        )
+
+        level = np.load(self._level_path(peaks_dir, level_spp), mmap_mode="r")
+        first = int(start_time * wav_format.sample_rate) // level_spp
+        last = -(-int(window_end * wav_format.sample_rate) // level_spp)
+        window = np.asarray(level[first:last])
+
+        return WaveformPeaks(
+            sample_rate=wav_format.sample_rate,
+            samples_per_peak=level_spp,
+            start_time=first * level_spp / wav_format.sample_rate,
+            duration=duration,
+            length=len(window),
+            data=window.reshape(-1).tolist(),
+        )
+
+
+@contextmanager
+def _replacing(path: Path) -> Iterator[BinaryIO]:
+    """Write a file next to ``path`` and rename it over ``path`` once complete.
+
+    The temporary name is unique per writer, as requests and extractions may
+    build the same peaks concurrently.
+    """
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            yield f
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
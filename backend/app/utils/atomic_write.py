@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import aiofiles
+
+from app.utils.streams import aclosing
+
+
+async def tee_stream_atomic(path: Path, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Pass chunks through while writing them to a temporary file next to ``path``.
+
+    The file is renamed into place once the stream ends, so readers never see
+    a partial file: ``path`` keeps its previous content until then, and a
+    failed or abandoned stream leaves nothing behind.
+    """
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        async with aclosing(stream), aiofiles.open(tmp_path, "wb") as f:
+            async for chunk in stream:
+                await f.write(chunk)
+                yield chunk
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+async def write_stream_atomic(path: Path, stream: AsyncIterator[bytes]) -> int:
+    """Write chunks to ``path`` atomically (see ``tee_stream_atomic``).
+
+    Memory use does not depend on the body size.
+
+    Returns:
+        Number of bytes written
+    """
+    size = 0
+    async for chunk in tee_stream_atomic(path, stream):
+        size += len(chunk)
+    return size
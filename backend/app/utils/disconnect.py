@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from starlette.requests import Request
+
+from app.utils.exceptions import ClientDisconnectedError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def cancel_on_disconnect(
+    request: Request,
+    awaitable: Awaitable[T],
+    poll_interval: float = 1.0,
+) -> T:
+    """Await long-running work, cancelling it if the client goes away.
+
+    Starlette keeps running a handler after the client disconnects, so the
+    request is polled while the work runs and the work is cancelled (which in
+    turn stops any FFmpeg child it started) once the client is gone.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info(f"Client disconnected from {request.url.path}, cancelling work")
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+                raise ClientDisconnectedError()
+    except asyncio.CancelledError:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        raise
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(*parts: object) -> str:
+    """Stable hex key identifying a cache entry by the given values."""
+    digest = hashlib.sha256("\0".join(str(part) for part in parts).encode())
+    return digest.hexdigest()[:32]
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content, reused while its size and mtime are unchanged.
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=256)
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def touch_cached(path: Path) -> bool:
+    """Mark a cache entry as recently used; False if it does not exist.
+
+    Only atime is bumped, so mtime (and with it Last-Modified) stays stable.
+    """
+    try:
+        os.utime(path, (time.time(), path.stat().st_mtime))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def evict_lru(cache_dir: Path, pattern: str, max_bytes: int, keep: Optional[Path] = None) -> None:
+    """Remove least recently used files matching ``pattern`` until they fit ``max_bytes``.
+
+    Args:
+        cache_dir: Directory holding the cache entries
+        pattern: Glob selecting the entries; ``*.tmp`` files are never removed
+        max_bytes: Size budget for all matching entries
+        keep: Entry that must survive, e.g. the one just written
+    """
+    entries = []
+    for path in cache_dir.glob(pattern):
+        if path.suffix == ".tmp":
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_atime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        logger.info(f"Evicted cache entry {path}")
@@ -16,11 +16,21 @@ class SegmentNotFoundError(BobberVoxException):
         super().__init__(status_code=404, detail=f"Segment with ID {segment_id} not found")
 
 
+class JobNotFoundError(BobberVoxException):
+    def __init__(self, job_id: str):
+        super().__init__(status_code=404, detail=f"Job with ID {job_id} not found")
+
+
 class NotFoundError(BobberVoxException):
     def __init__(self, detail: str):
         super().__init__(status_code=404, detail=detail)
 
 
+class ConflictError(BobberVoxException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=409, detail=detail)
+
+
 class FileValidationError(BobberVoxException):
     def __init__(self, detail: str):
         super().__init__(status_code=400, detail=detail)
@@ -34,3 +44,9 @@ class ProcessingError(BobberVoxException):
 class ExternalAPIError(BobberVoxException):
     def __init__(self, detail: str):
         super().__init__(status_code=502, detail=detail)
+
+
+class ClientDisconnectedError(BobberVoxException):
+    def __init__(self) -> None:
+        # 499: client closed request (nginx convention); never seen by the client
+        super().__init__(status_code=499, detail="Client closed request")
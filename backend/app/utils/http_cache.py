@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.utils.disk_cache import cache_key
+
+# Cache-Control per artifact type. Project audio, segments and TTS output keep
+# their file names when regenerated, so browsers must revalidate (cheap: a
+# matching ETag is answered with 304 before any database access). Custom voice
+# samples never change once uploaded.
+CACHE_REVALIDATE = "private, no-cache"
+CACHE_IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, allow_wildcard: bool = False) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison).
+
+    Args:
+        if_none_match: Raw header value, if the request sent one
+        etag: Quoted entity tag of the current representation
+        allow_wildcard: Whether ``*`` matches. It matches any existing file
+            without proving the client was ever served it, so only pass True
+            once the user's access has been checked.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return allow_wildcard
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def make_etag(*parts: object) -> str:
+    """Strong, quoted ETag from identifying values."""
+    return f'"{cache_key(*parts)}"'
+
+
+def file_etag(path: Path, scope: str) -> Optional[str]:
+    """Strong ETag from a file's identity, or None if it does not exist.
+
+    Inode, size and nanosecond mtime change whenever the file is rewritten or
+    replaced. ``scope`` (the requesting user) is mixed in so a tag is only
+    ever valid for the user it was issued to; that is what allows answering
+    a matching revalidation without re-checking ownership.
+    """
+    try:
+        stat = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return make_etag(scope, path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def not_modified(
+    request: Request, etag: Optional[str], cache_control: str, allow_wildcard: bool = False
+) -> Optional[Response]:
+    """A 304 response if the request's validator matches ``etag``, else None.
+
+    See ``etag_matches`` for ``allow_wildcard``.
+    """
+    if etag is None or not etag_matches(request.headers.get("if-none-match"), etag, allow_wildcard):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
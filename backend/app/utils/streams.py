@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+T = TypeVar("T", bound=AsyncIterator[bytes])
+
+
+@asynccontextmanager
+async def aclosing(stream: T) -> AsyncIterator[T]:
+    """Close an async generator on exit, like ``contextlib.aclosing`` (Python 3.10+).
+
+    A generator abandoned mid-iteration is otherwise only closed when it is
+    garbage collected, so its cleanup (temp files, pooled connections,
+    status updates) runs at some later point. Plain iterators pass through.
+    """
+    try:
+        yield stream
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def prime_stream(stream: AsyncGenerator[bytes, None]) -> AsyncGenerator[bytes, None]:
+    """Wait for the first chunk of ``stream`` before a response is started.
+
+    Errors raised before any data arrives (invalid input, provider down) then
+    reach the exception handlers as usual, instead of cutting off a response
+    that has already been sent as 200.
+    """
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    return _prepend(first, stream)
+
+
+async def _prepend(
+    first: bytes, stream: AsyncGenerator[bytes, None]
+) -> AsyncGenerator[bytes, None]:
+    async with aclosing(stream):
+        if first:
+            yield first
+        async for chunk in stream:
+            yield chunk
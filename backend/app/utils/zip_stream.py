@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiofiles
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Classic (non-ZIP64) format limits offsets and sizes to 32 bits
+ZIP_MAX_SIZE = 0xFFFFFFFF
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_OF_CENTRAL_DIR = struct.Struct("<IHHHHIIH")
+
+_LOCAL_HEADER_SIGNATURE = 0x04034B50
+_CENTRAL_HEADER_SIGNATURE = 0x02014B50
+_END_OF_CENTRAL_DIR_SIGNATURE = 0x06054B50
+_VERSION = 20
+# Bit 11: file names are UTF-8
+_FLAGS = 0x0800
+_STORED = 0
+
+
+@dataclass(frozen=True)
+class ZipEntry:
+    name: str
+    path: Path
+    size: int
+    mtime: float
+
+    @property
+    def encoded_name(self) -> bytes:
+        return self.name.encode("utf-8")
+
+
+class ZipStream:
+    """Store-only ZIP archive generated on the fly from files on disk.
+
+    Entries are not compressed (the audio inside already is), so the archive
+    size is known up front and bytes can be sent as soon as the response
+    starts. Each file is read twice: once for its CRC, which the local header
+    needs, then for its data, which normally comes from the page cache.
+    """
+
+    def __init__(self, files: list[tuple[str, Path]]) -> None:
+        """Snapshot the sizes of ``(archive name, path)`` pairs, in archive order."""
+        self.entries = []
+        for name, path in files:
+            stat = path.stat()
+            self.entries.append(ZipEntry(name, path, stat.st_size, stat.st_mtime))
+
+        if self.content_length > ZIP_MAX_SIZE or len(self.entries) > 0xFFFF:
+            raise ValueError("Archive too large for the ZIP format without ZIP64")
+
+    @property
+    def content_length(self) -> int:
+        """Exact size of the archive in bytes."""
+        local = sum(_LOCAL_HEADER.size + len(e.encoded_name) + e.size for e in self.entries)
+        central = sum(_CENTRAL_HEADER.size + len(e.encoded_name) for e in self.entries)
+        return local + central + _END_OF_CENTRAL_DIR.size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        central_directory = []
+        offset = 0
+
+        for entry in self.entries:
+            crc = await self._crc32(entry.path, entry.size)
+            dos_time, dos_date = self._dos_datetime(entry.mtime)
+            name = entry.encoded_name
+
+            yield (
+                _LOCAL_HEADER.pack(
+                    _LOCAL_HEADER_SIGNATURE,
+                    _VERSION,
+                    _FLAGS,
+                    _STORED,
+                    dos_time,
+                    dos_date,
+                    crc,
+                    entry.size,
+                    entry.size,
+                    len(name),
+                    0,
+                )
+                + name
+            )
+            async for data in self._read(entry.path, entry.size):
+                yield data
+
+            central_directory.append(
+                _CENTRAL_HEADER.pack(
+                    _CENTRAL_HEADER_SIGNATURE,
+                    _VERSION,
+                    _VERSION,
+                    _FLAGS,
+                    _STORED,
+                    dos_time,
+                    dos_date,
+                    crc,
+                    entry.size,
+                    entry.size,
+                    len(name),
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                    offset,
+                )
+                + name
+            )
+            offset += _LOCAL_HEADER.size + len(name) + entry.size
+
+        directory = b"".join(central_directory)
+        yield directory + _END_OF_CENTRAL_DIR.pack(
+            _END_OF_CENTRAL_DIR_SIGNATURE,
+            0,
+            0,
+            len(self.entries),
+            len(self.entries),
+            len(directory),
+            offset,
+            0,
+        )
+
+    @staticmethod
+    async def _read(path: Path, size: int) -> AsyncIterator[bytes]:
+        """Read exactly ``size`` bytes so headers stay valid if the file changes."""
+        remaining = size
+        async with aiofiles.open(path, "rb") as f:
+            while remaining:
+                data = await f.read(min(READ_CHUNK_SIZE, remaining))
+                if not data:
+                    raise OSError(f"File shrank while archiving: {path}")
+                remaining -= len(data)
+                yield data
+
+    async def _crc32(self, path: Path, size: int) -> int:
+        crc = 0
+        async for data in self._read(path, size):
+            crc = zlib.crc32(data, crc)
+        return crc
+
+    @staticmethod
+    def _dos_datetime(mtime: float) -> tuple[int, int]:
+        t = time.localtime(mtime)
+        # DOS dates start in 1980
+        year = max(t.tm_year, 1980)
+        dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+        dos_date = ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+        return dos_time, dos_date
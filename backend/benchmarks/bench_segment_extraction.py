@@ -0,0 +1,94 @@
+"""Benchmark per-segment vs single-pass segment extraction.
+
+Generates a synthetic project audio file, then cuts the same set of segments
+with one FFmpeg process per segment (``extract_segment``), with a single
+multi-output invocation (``extract_segments``) and with the in-process PCM
+slicer (``WavService.extract_segments``).
+
+Usage:
+    python benchmarks/bench_segment_extraction.py --duration 600 --segments 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import Settings
+from app.services.ffmpeg_service import FFmpegService
+from app.services.wav_service import WavService
+
+
+def generate_audio(path: Path, duration: float) -> None:
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:sample_rate=44100:duration={duration}",
+            "-ac",
+            "2",
+            "-acodec",
+            "pcm_s16le",
+            str(path),
+        ],
+        capture_output=True,
+        check=True,
+    )
+
+
+def plan_segments(out_dir: Path, duration: float, count: int) -> list[tuple[Path, float, float]]:
+    length = duration / count
+    return [
+        (out_dir / f"segment_{i:04d}.wav", i * length, (i + 1) * length - 0.01)
+        for i in range(count)
+    ]
+
+
+async def run(duration: float, count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        service = FFmpegService(Settings(projects_dir=tmp_path))
+        audio_path = tmp_path / "full_audio.wav"
+        generate_audio(audio_path, duration)
+
+        per_segment = plan_segments(tmp_path / "per_segment", duration, count)
+        started = time.perf_counter()
+        for output_path, start_time, end_time in per_segment:
+            await service.extract_segment(audio_path, output_path, start_time, end_time)
+        per_segment_elapsed = time.perf_counter() - started
+
+        batch = plan_segments(tmp_path / "batch", duration, count)
+        started = time.perf_counter()
+        await service.extract_segments(audio_path, batch)
+        batch_elapsed = time.perf_counter() - started
+
+        sliced = plan_segments(tmp_path / "sliced", duration, count)
+        started = time.perf_counter()
+        await WavService().extract_segments(audio_path, sliced)
+        sliced_elapsed = time.perf_counter() - started
+
+    print(f"audio: {duration:.0f}s, segments: {count}")
+    print(f"per-segment: {per_segment_elapsed:8.3f}s")
+    print(f"single-pass: {batch_elapsed:8.3f}s")
+    print(f"in-process:  {sliced_elapsed:8.3f}s")
+    print(f"speedup:     {per_segment_elapsed / batch_elapsed:8.2f}x single-pass, ", end="")
+    print(f"{per_segment_elapsed / sliced_elapsed:.2f}x in-process")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=600.0, help="audio length in seconds")
+    parser.add_argument("--segments", type=int, default=100, help="number of segments")
+    args = parser.parse_args()
+    asyncio.run(run(args.duration, args.segments))
+
+
+if __name__ == "__main__":
+    main()
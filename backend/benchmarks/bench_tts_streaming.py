@@ -0,0 +1,105 @@
+"""Benchmark peak memory of saving TTS responses to disk.
+
+Serves a large stub audio body through an in-process httpx transport and
+saves it with ``ChatterBoxService.generate_tts`` and
+``OpenAIService.generate_tts``, which stream the body to disk, and with the
+previous approach of buffering ``response.content`` and calling
+``write_bytes``. Peak Python allocations are measured with tracemalloc.
+
+Usage:
+    python benchmarks/bench_tts_streaming.py --size-mb 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Awaitable
+from pathlib import Path
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.services.chatterbox_service import ChatterBoxService
+from app.services.openai_service import OpenAIService
+
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+class StubAudioStream(httpx.AsyncByteStream):
+    """Response body of ``size`` bytes, generated chunk by chunk."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunk = b"\0" * BODY_CHUNK_SIZE
+        remaining = self.size
+        while remaining:
+            yield chunk[: min(remaining, BODY_CHUNK_SIZE)]
+            remaining -= min(remaining, BODY_CHUNK_SIZE)
+
+
+def stub_transport(size: int) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=StubAudioStream(size))
+
+    return httpx.MockTransport(handler)
+
+
+async def measure(label: str, operation: Awaitable[object], size: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    await operation
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} peak {peak / 1024 / 1024:8.2f} MB  ({peak / size:6.1%} of body)", end="")
+    print(f"  {elapsed:6.3f}s")
+
+
+async def buffered_save(client: httpx.AsyncClient, output_path: Path) -> None:
+    response = await client.post("http://stub/v1/audio/speech", json={})
+    output_path.write_bytes(response.content)
+
+
+async def run(size_mb: int) -> None:
+    size = size_mb * 1024 * 1024
+    print(f"response body: {size_mb} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        async with httpx.AsyncClient(transport=stub_transport(size)) as client:
+            await measure(
+                "buffered (before)", buffered_save(client, tmp_path / "buffered.wav"), size
+            )
+
+            chatterbox = ChatterBoxService("http://stub", client=client)
+            await measure(
+                "chatterbox streamed",
+                chatterbox.generate_tts("Hello", output_path=tmp_path / "chatterbox.wav"),
+                size,
+            )
+
+            openai = OpenAIService(
+                api_key="stub", client=AsyncOpenAI(api_key="stub", http_client=client)
+            )
+            await measure(
+                "openai streamed",
+                openai.generate_tts("Hello", output_path=tmp_path / "openai.mp3"),
+                size,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=50, help="stub response size in MB")
+    args = parser.parse_args()
+    asyncio.run(run(args.size_mb))
+
+
+if __name__ == "__main__":
+    main()
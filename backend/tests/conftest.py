@@ -1,4 +1,5 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import pytest
@@ -8,6 +9,12 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from app.config import Settings, get_settings
 from app.database import Base, get_async_session
 from app.main import app
+from app.services.chatterbox_health import ChatterBoxHealthMonitor
+from app.services.chatterbox_pool import ChatterBoxBackends
+from app.services.chatterbox_service import ChatterBoxService, create_chatterbox_client
+from app.services.job_queue import create_job_queue
+from app.services.openai_client_registry import OpenAIClientRegistry
+from app.services.segment_jobs import SegmentJobHandlers
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -41,7 +48,7 @@ async def async_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
 
 @pytest.fixture
 def test_settings(tmp_path: Path) -> Settings:
-    return Settings(projects_dir=tmp_path)
+    return Settings(projects_dir=tmp_path, cache_dir=tmp_path / "_cache")
 
 
 @pytest.fixture
@@ -57,6 +64,33 @@ async def async_client(
 
     app.dependency_overrides[get_async_session] = override_get_session
     app.dependency_overrides[get_settings] = override_get_settings
+    # Normally created by the lifespan, which ASGITransport does not run
+    app.state.chatterbox_client = create_chatterbox_client(test_settings)
+    app.state.chatterbox_backends = ChatterBoxBackends(app.state.chatterbox_client)
+    # Not started: tests see ChatterBox as never probed unless they probe it
+    app.state.chatterbox_health = ChatterBoxHealthMonitor(
+        ChatterBoxService(test_settings.chatterbox_base_url, client=app.state.chatterbox_client),
+        test_settings.chatterbox_health_interval,
+    )
+    app.state.openai_clients = OpenAIClientRegistry(
+        test_settings.openai_max_clients, test_settings.openai_client_idle_timeout
+    )
+
+    @asynccontextmanager
+    async def shared_session() -> AsyncIterator[AsyncSession]:
+        yield async_session
+
+    # Not started either: tests run queued jobs with run_once()
+    app.state.job_queue = create_job_queue(
+        shared_session,
+        SegmentJobHandlers(
+            test_settings,
+            app.state.chatterbox_backends,
+            app.state.openai_clients,
+            app.state.chatterbox_health,
+        ).as_dict(),
+        test_settings,
+    )
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -64,4 +98,6 @@ async def async_client(
     ) as client:
         yield client
 
+    await app.state.chatterbox_client.aclose()
+    await app.state.openai_clients.close()
     app.dependency_overrides.clear()
@@ -0,0 +1,173 @@
+import asyncio
+import shutil
+import wave
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import Settings
+from app.services.audio_delivery_service import AudioDeliveryService
+from app.services.ffmpeg_service import FFmpegService
+from app.utils.exceptions import FileValidationError
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg not installed")
+
+
+def write_silence(path: Path, seconds: float = 1.0) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        f.writeframes(b"\x00" * int(44100 * seconds) * 4)
+
+
+@pytest.fixture
+def fake_transcode():
+    """Replace FFmpeg encoding with a marker file; records every call."""
+    calls: list[tuple[Path, str]] = []
+
+    async def transcode(self, input_path: Path, output_path: Path, audio_format: str) -> Path:
+        calls.append((input_path, audio_format))
+        await asyncio.sleep(0.01)
+        output_path.write_bytes(f"{audio_format}:{input_path.name}".encode())
+        return output_path
+
+    with patch.object(FFmpegService, "transcode_audio", transcode):
+        yield calls
+
+
+@pytest.fixture
+def delivery(tmp_path: Path) -> AudioDeliveryService:
+    settings = Settings(projects_dir=tmp_path, cache_dir=tmp_path / "cache")
+    return AudioDeliveryService(settings, FFmpegService(settings))
+
+
+class TestNegotiate:
+    def test_query_parameter_wins(self):
+        assert AudioDeliveryService.negotiate("mp3", "audio/ogg") == "mp3"
+
+    def test_invalid_query_parameter(self):
+        with pytest.raises(FileValidationError):
+            AudioDeliveryService.negotiate("flac", None)
+
+    @pytest.mark.parametrize(
+        ("accept", "expected"),
+        [
+            (None, "wav"),
+            ("*/*", "wav"),
+            ("audio/*", "wav"),
+            ("audio/ogg", "opus"),
+            ("audio/mpeg, audio/ogg;q=0.9", "mp3"),
+            ("audio/mpeg;q=0.5, audio/ogg;codecs=opus;q=0.9, */*;q=0.1", "opus"),
+            ("audio/ogg;q=0", "wav"),
+            ("text/html, audio/x-wav", "wav"),
+        ],
+    )
+    def test_accept_header(self, accept, expected):
+        assert AudioDeliveryService.negotiate(None, accept) == expected
+
+
+class TestGetVariant:
+    @pytest.mark.asyncio
+    async def test_encodes_once(
+        self, delivery: AudioDeliveryService, fake_transcode: list, tmp_path: Path
+    ):
+        source = tmp_path / "seg.wav"
+        write_silence(source)
+
+        paths = await asyncio.gather(*(delivery.get_variant(source, "opus") for _ in range(3)))
+
+        assert len(set(paths)) == 1
+        assert paths[0].suffix == ".ogg"
+        assert paths[0].read_bytes() == b"opus:seg.wav"
+        assert len(fake_transcode) == 1
+        assert not list(delivery.cache_dir.glob("*.tmp"))
+
+    @pytest.mark.asyncio
+    async def test_new_variant_after_source_changes(
+        self, delivery: AudioDeliveryService, fake_transcode: list, tmp_path: Path
+    ):
+        source = tmp_path / "seg.wav"
+        write_silence(source)
+        first = await delivery.get_variant(source, "mp3")
+
+        write_silence(source, seconds=2.0)
+        second = await delivery.get_variant(source, "mp3")
+
+        assert first != second
+        assert len(fake_transcode) == 2
+
+    @requires_ffmpeg
+    @pytest.mark.asyncio
+    async def test_real_encodings(self, delivery: AudioDeliveryService, tmp_path: Path):
+        source = tmp_path / "seg.wav"
+        write_silence(source)
+
+        opus = await delivery.get_variant(source, "opus")
+        mp3 = await delivery.get_variant(source, "mp3")
+
+        assert opus.read_bytes()[:4] == b"OggS"
+        assert 0 < mp3.stat().st_size < source.stat().st_size
+
+
+@pytest.mark.asyncio
+async def test_segment_file_as_opus(
+    async_client: AsyncClient, test_settings: Settings, fake_transcode: list
+):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    write_silence(test_settings.projects_dir / project_id / "segments" / "seg.wav")
+    url = f"/api/files/{project_id}/segments/seg.wav"
+
+    original = await async_client.get(url)
+    compressed = await async_client.get(url, params={"format": "opus"})
+    negotiated = await async_client.get(url, headers={"Accept": "audio/ogg"})
+
+    assert original.headers["content-type"] == "audio/wav"
+    assert compressed.status_code == 200
+    assert compressed.headers["content-type"] == "audio/ogg"
+    assert "Accept" in compressed.headers["vary"]
+    assert compressed.content == b"opus:seg.wav"
+    assert "seg.ogg" in compressed.headers["content-disposition"]
+    assert compressed.headers["etag"] != original.headers["etag"]
+    assert negotiated.headers["etag"] == compressed.headers["etag"]
+    assert len(fake_transcode) == 1
+
+    revalidated = await async_client.get(
+        url, params={"format": "opus"}, headers={"If-None-Match": compressed.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_compressed_output_is_served_as_stored(
+    async_client: AsyncClient, test_settings: Settings, fake_transcode: list
+):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    output_dir = test_settings.projects_dir / project_id / "output"
+    output_dir.mkdir(parents=True)
+    (output_dir / "tts.mp3").write_bytes(b"ID3 mp3 data")
+
+    response = await async_client.get(
+        f"/api/files/{project_id}/output/tts.mp3", params={"format": "opus"}
+    )
+
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.content == b"ID3 mp3 data"
+    assert fake_transcode == []
+
+
+@pytest.mark.asyncio
+async def test_invalid_format(async_client: AsyncClient, test_settings: Settings):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    write_silence(test_settings.projects_dir / project_id / "audio" / "full_audio.wav")
+
+    response = await async_client.get(
+        f"/api/files/{project_id}/audio/full_audio.wav", params={"format": "flac"}
+    )
+    assert response.status_code == 400
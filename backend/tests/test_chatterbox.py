@@ -0,0 +1,470 @@
+import asyncio
+import re
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from unittest.mock import patch
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.main import app
+from app.models import Segment
+from app.services.chatterbox_health import ChatterBoxHealth, ChatterBoxHealthMonitor
+from app.services.chatterbox_pool import ChatterBoxBackends, CircuitState
+from app.services.chatterbox_service import (
+    ChatterBoxService,
+    create_chatterbox_client,
+    reference_voice_name,
+)
+from app.utils.exceptions import ExternalAPIError
+
+
+@dataclass
+class FakeChatterBox:
+    """Minimal keep-alive HTTP/1.1 server that counts TCP connections."""
+
+    url: str = ""
+    connections: int = 0
+    requests: list[str] = field(default_factory=list)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while head := await reader.readuntil(b"\r\n\r\n"):
+                lines = head.decode().split("\r\n")
+                self.requests.append(lines[0])
+                headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                body = b"RIFF fake wav"
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: audio/wav\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.fixture
+async def fake_chatterbox() -> AsyncIterator[FakeChatterBox]:
+    fake = FakeChatterBox()
+    server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    fake.url = f"http://{host}:{port}"
+    async with server:
+        yield fake
+
+
+@pytest.mark.asyncio
+async def test_shared_client_reuses_connections(fake_chatterbox: FakeChatterBox, tmp_path: Path):
+    client = create_chatterbox_client(Settings(projects_dir=tmp_path))
+    try:
+        # Separate service instances, as built per request, share the pool
+        for i in range(3):
+            service = ChatterBoxService(base_url=fake_chatterbox.url, client=client)
+            await service.generate_tts(f"Line {i}", output_path=tmp_path / f"tts_{i}.wav")
+            await service.close()
+        assert await ChatterBoxService(fake_chatterbox.url, client=client).check_health()
+    finally:
+        await client.aclose()
+
+    assert len(fake_chatterbox.requests) == 4
+    assert fake_chatterbox.connections == 1
+    assert (tmp_path / "tts_2.wav").read_bytes() == b"RIFF fake wav"
+
+
+class BrokenAudioStream(httpx.AsyncByteStream):
+    """Body that fails after the first chunk, like a dropped connection."""
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b"RIFF partial"
+        raise httpx.ReadError("connection lost")
+
+
+@pytest.mark.asyncio
+async def test_generate_tts_streams_to_disk_atomically(tmp_path: Path):
+    output_path = tmp_path / "tts.wav"
+    output_path.write_bytes(b"previous")
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=BrokenAudioStream()))
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        service = ChatterBoxService("http://chatterbox", client=client)
+        with pytest.raises(ExternalAPIError, match="Failed to connect"):
+            await service.generate_tts("Hello", output_path=output_path)
+
+    assert output_path.read_bytes() == b"previous"
+    assert list(tmp_path.iterdir()) == [output_path]
+
+
+@pytest.mark.asyncio
+async def test_generate_tts_reports_error_body(tmp_path: Path):
+    transport = httpx.MockTransport(lambda request: httpx.Response(500, text="model not loaded"))
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        service = ChatterBoxService("http://chatterbox", client=client)
+        with pytest.raises(ExternalAPIError, match="model not loaded"):
+            await service.generate_tts("Hello", output_path=tmp_path / "tts.wav")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_close_keeps_shared_client_open(tmp_path: Path):
+    client = create_chatterbox_client(Settings(projects_dir=tmp_path))
+    service = ChatterBoxService(base_url="http://chatterbox", client=client)
+
+    await service.close()
+
+    assert not client.is_closed
+    await client.aclose()
+
+
+@pytest.fixture
+def fake_monitor(
+    async_client: AsyncClient, fake_chatterbox: FakeChatterBox
+) -> ChatterBoxHealthMonitor:
+    """Point the app's health monitor at the fake server."""
+    monitor = ChatterBoxHealthMonitor(
+        ChatterBoxService(fake_chatterbox.url, client=app.state.chatterbox_client),
+        interval=60,
+    )
+    app.state.chatterbox_health = monitor
+    return monitor
+
+
+@pytest.mark.asyncio
+async def test_health_endpoint_uses_shared_client(
+    async_client: AsyncClient,
+    fake_chatterbox: FakeChatterBox,
+    fake_monitor: ChatterBoxHealthMonitor,
+):
+    for _ in range(2):
+        response = await async_client.get("/api/settings/chatterbox/health")
+        data = response.json()
+        assert data["available"] is True
+        assert data["url"] == fake_chatterbox.url
+        assert data["checked_at"] is not None
+
+    assert fake_chatterbox.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_settings_read_cached_health(
+    async_client: AsyncClient,
+    fake_chatterbox: FakeChatterBox,
+    fake_monitor: ChatterBoxHealthMonitor,
+):
+    response = await async_client.get("/api/settings")
+    assert response.json()["chatterbox_available"] is False
+    assert response.json()["chatterbox_checked_at"] is None
+
+    await fake_monitor.probe()
+    response = await async_client.get("/api/settings")
+
+    assert response.json()["chatterbox_available"] is True
+    assert response.json()["chatterbox_checked_at"] is not None
+    assert len(fake_chatterbox.requests) == 1
+
+
+class TestChatterBoxHealthMonitor:
+    @pytest.mark.asyncio
+    async def test_concurrent_probes_share_one_request(self, fake_chatterbox: FakeChatterBox):
+        async with create_chatterbox_client(Settings()) as client:
+            monitor = ChatterBoxHealthMonitor(
+                ChatterBoxService(fake_chatterbox.url, client=client), interval=60
+            )
+            results = await asyncio.gather(*(monitor.probe() for _ in range(3)))
+
+        assert all(health.available for health in results)
+        assert len(fake_chatterbox.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_request_probe_wakes_loop(self, fake_chatterbox: FakeChatterBox):
+        async with create_chatterbox_client(Settings()) as client:
+            monitor = ChatterBoxHealthMonitor(
+                ChatterBoxService(fake_chatterbox.url, client=client), interval=60
+            )
+            monitor.start()
+            try:
+                for _ in range(100):
+                    if monitor.health.checked_at:
+                        break
+                    await asyncio.sleep(0.01)
+                first_check = monitor.health.checked_at
+
+                monitor.request_probe()
+                for _ in range(100):
+                    if monitor.health.checked_at != first_check:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await monitor.stop()
+
+        assert first_check is not None
+        assert monitor.health.checked_at != first_check
+        assert len(fake_chatterbox.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_unreachable_server_is_unavailable(self):
+        async with create_chatterbox_client(Settings()) as client:
+            # Port 9 (discard) is closed on test machines
+            monitor = ChatterBoxHealthMonitor(
+                ChatterBoxService("http://127.0.0.1:9", client=client), interval=60
+            )
+            health = await monitor.probe()
+
+        assert health.available is False
+        assert health.checked_at is not None
+
+
+@pytest.mark.asyncio
+async def test_tts_fails_fast_while_chatterbox_down(
+    async_client: AsyncClient,
+    fake_chatterbox: FakeChatterBox,
+    fake_monitor: ChatterBoxHealthMonitor,
+):
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    segment_id = (
+        await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": 0.0, "end_time": 5.0},
+        )
+    ).json()["id"]
+    await async_client.put(
+        f"/api/segments/{segment_id}/translation", json={"translated_text": "Hello"}
+    )
+    await async_client.put("/api/settings", json={"tts_provider": "chatterbox"})
+    fake_monitor.health = ChatterBoxHealth(available=False, checked_at=datetime.now(timezone.utc))
+
+    response = await async_client.post(
+        f"/api/segments/{segment_id}/generate-tts", json={"voice": "Emily.wav"}
+    )
+
+    assert response.status_code == 502
+    assert fake_chatterbox.requests == []
+
+
+@pytest.mark.asyncio
+async def test_stream_tts_proxies_chatterbox_audio(
+    async_client: AsyncClient, test_settings: Settings, fake_chatterbox: FakeChatterBox
+):
+    test_settings.chatterbox_base_url = fake_chatterbox.url
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    segment_id = (
+        await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": 0.0, "end_time": 5.0},
+        )
+    ).json()["id"]
+    await async_client.put(
+        f"/api/segments/{segment_id}/translation", json={"translated_text": "Hello"}
+    )
+    await async_client.put("/api/settings", json={"tts_provider": "chatterbox"})
+
+    response = await async_client.post(
+        f"/api/segments/{segment_id}/tts/stream", json={"voice": "Emily.wav"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    assert response.content == b"RIFF fake wav"
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["status"] == "completed"
+    assert segment["tts_result_file"] == f"{project_id}/output/tts_00m00s000ms.wav"
+    assert (
+        test_settings.projects_dir / segment["tts_result_file"]
+    ).read_bytes() == b"RIFF fake wav"
+
+
+@pytest.mark.asyncio
+async def test_generate_project_tts_uses_analysis_params(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    test_settings.chatterbox_tts_concurrency = 1
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    for i in range(3):
+        segment_id = (
+            await async_client.post(
+                f"/api/projects/{project_id}/segments",
+                json={"start_time": float(i), "end_time": i + 0.5},
+            )
+        ).json()["id"]
+        await async_client.put(
+            f"/api/segments/{segment_id}/translation", json={"translated_text": f"Text {i}"}
+        )
+        if i == 1:
+            segment = await async_session.get(Segment, segment_id)
+            segment.analysis_json = {"temperature": 0.3, "exaggeration": 0.4}
+            await async_session.flush()
+    await async_client.put("/api/settings", json={"tts_provider": "chatterbox"})
+
+    requests: dict[str, tuple[str, float, Optional[float], Optional[float], Optional[float]]] = {}
+    active = 0
+    peak = 0
+
+    async def fake_generate_tts(
+        self: ChatterBoxService,
+        text: str,
+        voice: str,
+        output_path: Path,
+        speed: float,
+        custom_voice_path: Optional[str],
+        temperature: Optional[float],
+        exaggeration: Optional[float],
+        cfg_weight: Optional[float],
+    ) -> Path:
+        nonlocal active, peak
+        requests[text] = (voice, speed, temperature, exaggeration, cfg_weight)
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(b"RIFF")
+        return output_path
+
+    with patch.object(ChatterBoxService, "generate_tts", fake_generate_tts):
+        response = await async_client.post(
+            f"/api/projects/{project_id}/generate-tts", json={"voice": "Alice.wav"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["generated"] == 3
+    assert peak == 1
+    assert requests["Text 0"] == ("Alice.wav", 1.0, 0.8, 0.8, 0.5)
+    assert requests["Text 1"] == ("Alice.wav", 1.0, 0.3, 0.4, 0.5)
+    segments = (await async_client.get(f"/api/projects/{project_id}/segments")).json()
+    assert segments[0]["tts_result_file"] == f"{project_id}/output/tts_00m00s000ms.wav"
+    assert {s["tts_voice"] for s in segments} == {"Alice.wav"}
+
+
+class FakeChatterBoxBackends:
+    """ChatterBox servers behind a mock transport, each answering per ``modes``.
+
+    A mode is "ok", "down" (connection refused), "error" (500) or "reject" (422).
+    """
+
+    def __init__(self, **modes: str) -> None:
+        self.modes = modes
+        self.requests: list[tuple[str, str]] = []
+        self.transport = httpx.MockTransport(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests.append((host, request.url.path))
+        mode = self.modes[host]
+        if mode == "down":
+            raise httpx.ConnectError("Connection refused", request=request)
+        if mode == "error":
+            return httpx.Response(500, text="CUDA out of memory")
+        if mode == "reject":
+            return httpx.Response(422, text="text too long")
+        if request.url.path == "/upload_reference":
+            filename = re.search(rb'filename="([^"]+)"', request.read()).group(1).decode()
+            return httpx.Response(200, json={"uploaded_files": [filename]})
+        return httpx.Response(200, content=b"RIFF " + host.encode())
+
+
+@pytest.mark.asyncio
+async def test_pool_fails_over_and_skips_failing_backend(tmp_path: Path):
+    fake = FakeChatterBoxBackends(gpu1="down", gpu2="ok")
+    now = 0.0
+    async with httpx.AsyncClient(transport=fake.transport) as client:
+        backends = ChatterBoxBackends(client, failure_threshold=2, cooldown=30, clock=lambda: now)
+        pool = backends.pool(["http://gpu1", "http://gpu2/"])
+        output_path = tmp_path / "tts.wav"
+
+        for _ in range(3):
+            await pool.generate_tts("Hello", output_path=output_path)
+        assert output_path.read_bytes() == b"RIFF gpu2"
+        # Tried twice, then skipped while its breaker is open
+        assert [host for host, _ in fake.requests].count("gpu1") == 2
+        gpu1 = backends.get("http://gpu1")
+        assert gpu1.breaker.state is CircuitState.OPEN
+
+        # After the cooldown a single trial request closes it again
+        now = 30.0
+        fake.modes["gpu1"] = "ok"
+        assert gpu1.breaker.available
+        assert await collect(pool.stream_tts("Hello")) == b"RIFF gpu1"
+        assert gpu1.breaker.state is CircuitState.CLOSED
+
+        # Rejected requests are not retried elsewhere and do not count against the server
+        fake.modes["gpu1"] = "reject"
+        fake.requests.clear()
+        with pytest.raises(ExternalAPIError, match="text too long"):
+            await pool.generate_tts("Hello", output_path=output_path)
+        assert fake.requests == [("gpu1", "/v1/audio/speech")]
+        assert gpu1.breaker.failures == 0
+
+        fake.modes.update(gpu1="error", gpu2="error")
+        for _ in range(2):
+            with pytest.raises(ExternalAPIError, match="CUDA out of memory"):
+                await pool.generate_tts("Hello", output_path=output_path)
+        with pytest.raises(ExternalAPIError, match="No ChatterBox server available"):
+            await pool.generate_tts("Hello", output_path=output_path)
+
+    stats = gpu1.stats()
+    assert (stats.state, stats.requests, stats.failures, stats.outstanding) == ("open", 6, 4, 0)
+    assert stats.p95_latency_seconds == 0.0
+
+
+@pytest.mark.asyncio
+async def test_pool_balances_load_and_keeps_custom_voices_on_their_server(tmp_path: Path):
+    fake = FakeChatterBoxBackends(gpu1="ok", gpu2="ok")
+    voice_file = tmp_path / "me.wav"
+    voice_file.write_bytes(b"RIFF my voice")
+    async with httpx.AsyncClient(transport=fake.transport) as client:
+        backends = ChatterBoxBackends(client)
+        pool = backends.pool(["http://gpu1", "http://gpu2"])
+        gpu1, gpu2 = pool.backends
+
+        gpu1.outstanding = 1
+        assert pool.select() is gpu2
+        voice_name = await reference_voice_name(str(voice_file))
+        for _ in range(2):
+            await pool.generate_tts(
+                "Hello", output_path=tmp_path / "tts.wav", custom_voice_path=str(voice_file)
+            )
+        assert fake.requests == [
+            ("gpu2", "/upload_reference"),
+            ("gpu2", "/v1/audio/speech"),
+            ("gpu2", "/v1/audio/speech"),
+        ]
+        assert gpu2.reference_voices == {voice_name}
+
+        # Preferred while no busier than one request more than the others
+        gpu1.outstanding = 0
+        gpu2.outstanding = 1
+        assert pool.select(voice_name) is gpu2
+        assert pool.select() is gpu1
+        gpu2.outstanding = 2
+        assert pool.select(voice_name) is gpu1
+        gpu2.outstanding = 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_chatterbox_backends(
+    async_client: AsyncClient, test_settings: Settings
+):
+    test_settings.chatterbox_urls = ["http://gpu1:8004", "http://gpu2:8004"]
+
+    response = await async_client.get("/api/metrics")
+
+    backends = response.json()["chatterbox"]
+    assert [b["url"] for b in backends] == test_settings.chatterbox_urls
+    assert backends[0]["state"] == "closed"
+    assert backends[0]["requests"] == 0
+
+
+async def collect(stream: AsyncIterator[bytes]) -> bytes:
+    return b"".join([chunk async for chunk in stream])
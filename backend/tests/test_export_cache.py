@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.config import Settings
+from app.services.export_cache import ExportCache
+from app.utils.zip_stream import ZipStream
+
+
+@pytest.fixture
+def export_cache(tmp_path: Path) -> ExportCache:
+    return ExportCache(Settings(projects_dir=tmp_path, cache_dir=tmp_path / "cache"))
+
+
+def make_archive(tmp_path: Path, name: str, size: int) -> ZipStream:
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return ZipStream([(name, path)])
+
+
+async def store(export_cache: ExportCache, archive: ZipStream) -> bytes:
+    return b"".join([chunk async for chunk in export_cache.stream_and_store(archive)])
+
+
+@pytest.mark.asyncio
+async def test_stream_and_store(export_cache: ExportCache, tmp_path: Path):
+    archive = make_archive(tmp_path, "a.mp3", 1000)
+    key = export_cache.key_for(archive)
+    assert export_cache.lookup(key) is None
+
+    data = await store(export_cache, archive)
+
+    assert export_cache.lookup(key).read_bytes() == data
+    assert not list(export_cache.cache_dir.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_aborted_stream_is_not_cached(export_cache: ExportCache, tmp_path: Path):
+    archive = make_archive(tmp_path, "a.mp3", 1000)
+    stream = export_cache.stream_and_store(archive)
+
+    await stream.__anext__()
+    await stream.aclose()
+
+    assert export_cache.lookup(export_cache.key_for(archive)) is None
+    assert not list(export_cache.cache_dir.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_key_changes_with_content(export_cache: ExportCache, tmp_path: Path):
+    archive = make_archive(tmp_path, "a.mp3", 1000)
+    same = ZipStream([("a.mp3", tmp_path / "a.mp3")])
+    assert export_cache.key_for(archive) == export_cache.key_for(same)
+
+    changed = make_archive(tmp_path, "a.mp3", 1001)
+    assert export_cache.key_for(changed) != export_cache.key_for(archive)
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(export_cache: ExportCache, tmp_path: Path):
+    export_cache.settings.export_cache_max_mb = 1
+    half_mb = 512 * 1024
+    old = make_archive(tmp_path, "old.mp3", half_mb)
+    recent = make_archive(tmp_path, "recent.mp3", half_mb - 1000)
+    await store(export_cache, old)
+    await store(export_cache, recent)
+    old_path = export_cache.get_path(export_cache.key_for(old))
+    os.utime(old_path, (0, old_path.stat().st_mtime))
+    export_cache.lookup(export_cache.key_for(recent))
+
+    new = make_archive(tmp_path, "new.mp3", 1000)
+    await store(export_cache, new)
+
+    assert export_cache.lookup(export_cache.key_for(old)) is None
+    assert export_cache.lookup(export_cache.key_for(recent)) is not None
+    assert export_cache.lookup(export_cache.key_for(new)) is not None
@@ -1,12 +1,19 @@
+import asyncio
+import os
 import shutil
 import subprocess
+import sys
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from app.config import Settings
 from app.services.ffmpeg_service import FFmpegService
-from app.utils.exceptions import ProcessingError
+from app.services.process_scheduler import JobPriority, ProcessScheduler
+from app.services.wav_service import WavService
+from app.utils.disconnect import cancel_on_disconnect
+from app.utils.exceptions import ClientDisconnectedError, ProcessingError
 
 # Check if ffmpeg is available
 FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
@@ -117,6 +124,49 @@ class TestFFmpegService:
         with pytest.raises(ProcessingError, match="Video file not found"):
             await ffmpeg_service.extract_audio(nonexistent, output_path)
 
+    @pytest.mark.asyncio
+    async def test_extract_audio_from_stream(
+        self,
+        ffmpeg_service: FFmpegService,
+        sample_video: Path,
+        tmp_path: Path,
+    ):
+        # Matroska can be demuxed from a pipe
+        mkv_path = tmp_path / "test_video.mkv"
+        subprocess.run(
+            ["ffmpeg", "-y", "-i", str(sample_video), "-c", "copy", str(mkv_path)],
+            capture_output=True,
+            check=True,
+        )
+        output_path = tmp_path / "output" / "streamed.wav"
+        data = mkv_path.read_bytes()
+
+        async with ffmpeg_service.extract_audio_from_stream(output_path) as stream:
+            # Waiting for upload bytes does not hold a slot of the shared pool
+            assert ffmpeg_service.scheduler.running == 0
+            assert ffmpeg_service.stream_scheduler.running == 1
+            for start in range(0, len(data), 4096):
+                await stream.write(data[start : start + 4096])
+
+        assert not stream.failed
+        wav_format = WavService.read_format(output_path)
+        assert wav_format is not None
+        assert wav_format.frame_count / wav_format.sample_rate == pytest.approx(2.0, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_extract_audio_from_stream_invalid_input(
+        self,
+        ffmpeg_service: FFmpegService,
+        tmp_path: Path,
+    ):
+        output_path = tmp_path / "output" / "streamed.wav"
+
+        with pytest.raises(ProcessingError, match="FFmpeg processing failed"):
+            async with ffmpeg_service.extract_audio_from_stream(output_path) as stream:
+                await stream.write(b"definitely not a video" * 1000)
+
+        assert not output_path.exists()
+
     @pytest.mark.asyncio
     async def test_extract_segment(
         self,
@@ -170,6 +220,59 @@ class TestFFmpegService:
                 end_time=1.0,
             )
 
+    @pytest.mark.asyncio
+    async def test_extract_segments_single_pass(
+        self,
+        ffmpeg_service: FFmpegService,
+        sample_audio: Path,
+        tmp_path: Path,
+    ):
+        segments = [
+            (tmp_path / "segments" / "a.wav", 0.0, 0.5),
+            (tmp_path / "segments" / "b.wav", 0.5, 1.5),
+            (tmp_path / "segments" / "c.wav", 1.5, 2.0),
+        ]
+
+        result = await ffmpeg_service.extract_segments(sample_audio, segments)
+
+        assert result == [path for path, _, _ in segments]
+        for path, _, _ in segments:
+            assert path.exists()
+        # 1 second of 16-bit stereo at 44.1kHz is larger than half a second
+        assert segments[1][0].stat().st_size > segments[0][0].stat().st_size
+
+    @pytest.mark.asyncio
+    async def test_extract_segments_splits_large_batches(
+        self,
+        ffmpeg_service: FFmpegService,
+        sample_audio: Path,
+        tmp_path: Path,
+    ):
+        ffmpeg_service.max_outputs_per_pass = 2
+        segments = [(tmp_path / f"seg_{i}.wav", i * 0.4, (i + 1) * 0.4) for i in range(5)]
+
+        await ffmpeg_service.extract_segments(sample_audio, segments)
+
+        for path, _, _ in segments:
+            assert path.exists()
+
+    @pytest.mark.asyncio
+    async def test_extract_segments_invalid_times(
+        self,
+        ffmpeg_service: FFmpegService,
+        sample_audio: Path,
+        tmp_path: Path,
+    ):
+        segments = [
+            (tmp_path / "ok.wav", 0.0, 1.0),
+            (tmp_path / "bad.wav", 1.5, 0.5),
+        ]
+
+        with pytest.raises(ProcessingError, match="End time must be greater"):
+            await ffmpeg_service.extract_segments(sample_audio, segments)
+
+        assert not (tmp_path / "ok.wav").exists()
+
     @pytest.mark.asyncio
     async def test_get_audio_duration(
         self,
@@ -213,3 +316,137 @@ class TestSegmentFilenameFormat:
     def test_format_segment_filename_precise_milliseconds(self):
         filename = FFmpegService.format_segment_filename(0.001)
         assert filename == "segment_00m00s001ms.wav"
+
+
+def assert_reaped(pid: int) -> None:
+    """A reaped process no longer exists; a zombie would still accept signal 0."""
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+class TestProcessCleanup:
+    @pytest.fixture
+    def scheduler(self) -> ProcessScheduler:
+        return ProcessScheduler(max_concurrency=1)
+
+    @pytest.fixture
+    def service(self, tmp_path: Path, scheduler: ProcessScheduler) -> FFmpegService:
+        settings = Settings(projects_dir=tmp_path, ffmpeg_kill_grace_period=0.2)
+        return FFmpegService(settings, scheduler=scheduler)
+
+    @pytest.fixture
+    def spawned(self):
+        """Record processes started by the service."""
+        processes: list[asyncio.subprocess.Process] = []
+        original = asyncio.create_subprocess_exec
+
+        async def recording_exec(*args, **kwargs):
+            process = await original(*args, **kwargs)
+            processes.append(process)
+            return process
+
+        with patch("asyncio.create_subprocess_exec", recording_exec):
+            yield processes
+
+    @pytest.mark.asyncio
+    async def test_cancel_terminates_and_reaps(
+        self, service: FFmpegService, scheduler: ProcessScheduler, spawned: list
+    ):
+        task = asyncio.create_task(
+            service._run_process(["sleep", "30"], JobPriority.EXTRACTION, timeout=60)
+        )
+        while not spawned:
+            await asyncio.sleep(0.01)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        process = spawned[0]
+        assert process.returncode is not None
+        assert_reaped(process.pid)
+        assert scheduler.running == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_kills_process_ignoring_sigterm(
+        self, service: FFmpegService, spawned: list
+    ):
+        script = (
+            "import signal, sys, time\n"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "print('ready', flush=True)\n"
+            "time.sleep(30)\n"
+        )
+        task = asyncio.create_task(
+            service._run_process([sys.executable, "-c", script], JobPriority.EXTRACTION, 60)
+        )
+        while not spawned:
+            await asyncio.sleep(0.01)
+        # Give the child time to install its SIGTERM handler
+        await asyncio.sleep(0.5)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        process = spawned[0]
+        assert process.returncode == -9
+        assert_reaped(process.pid)
+
+    @pytest.mark.asyncio
+    async def test_timeout_reaps_process(self, service: FFmpegService, spawned: list):
+        with pytest.raises(ProcessingError, match="timed out"):
+            await service._run_process(["sleep", "30"], JobPriority.SEGMENT, timeout=0.1)
+
+        assert_reaped(spawned[0].pid)
+
+    @pytest.mark.asyncio
+    async def test_failed_run_removes_partial_outputs(self, service: FFmpegService, tmp_path: Path):
+        partial = tmp_path / "partial.wav"
+
+        async def failing_run(*args, **kwargs):
+            partial.write_bytes(b"RIFF")
+            raise asyncio.CancelledError()
+
+        with (
+            patch.object(service, "_run_process", failing_run),
+            pytest.raises(asyncio.CancelledError),
+        ):
+            await service._run_ffmpeg(["-i", "in.wav", str(partial)], outputs=[partial])
+
+        assert not partial.exists()
+
+    @pytest.mark.asyncio
+    async def test_nonzero_exit_removes_partial_outputs(
+        self, service: FFmpegService, tmp_path: Path
+    ):
+        partial = tmp_path / "partial.wav"
+
+        async def failing_run(*args, **kwargs):
+            partial.write_bytes(b"RIFF")
+            return 1, b"", b"Conversion failed"
+
+        with (
+            patch.object(service, "_run_process", failing_run),
+            pytest.raises(ProcessingError, match="Conversion failed"),
+        ):
+            await service._run_ffmpeg(["-i", "in.wav", str(partial)], outputs=[partial])
+
+        assert not partial.exists()
+
+    @pytest.mark.asyncio
+    async def test_cancel_on_disconnect(self, service: FFmpegService, spawned: list):
+        class DisconnectingRequest:
+            url = type("URL", (), {"path": "/api/projects/p/extract-audio"})()
+
+            async def is_disconnected(self) -> bool:
+                return bool(spawned)
+
+        with pytest.raises(ClientDisconnectedError):
+            await cancel_on_disconnect(
+                DisconnectingRequest(),
+                service._run_process(["sleep", "30"], JobPriority.EXTRACTION, timeout=60),
+                poll_interval=0.05,
+            )
+
+        assert_reaped(spawned[0].pid)
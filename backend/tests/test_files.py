@@ -0,0 +1,203 @@
+import io
+import os
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.models import Segment
+from app.services.project_service import ProjectService
+from app.utils.exceptions import NotFoundError
+
+
+async def create_tts_segments(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+) -> str:
+    """Create a project with TTS output for segments starting at 5s, 1s and 3s."""
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    output_dir = test_settings.projects_dir / project_id / "output"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for start in (5.0, 1.0, 3.0):
+        filename = f"tts_{int(start)}.mp3"
+        (output_dir / filename).write_bytes(f"audio at {start}".encode())
+        async_session.add(
+            Segment(
+                project_id=project_id,
+                start_time=start,
+                end_time=start + 1,
+                tts_result_file=f"{project_id}/output/{filename}",
+            )
+        )
+    # A segment without TTS output is skipped
+    async_session.add(Segment(project_id=project_id, start_time=0.0, end_time=0.5))
+    await async_session.flush()
+    async_session.expunge_all()
+    return project_id
+
+
+@pytest.mark.asyncio
+async def test_download_all_streams_zip_in_segment_order(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    project_id = await create_tts_segments(async_client, async_session, test_settings)
+
+    response = await async_client.get(f"/api/files/{project_id}/download-all")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert f"{project_id}_tts_output.zip" in response.headers["content-disposition"]
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.namelist() == ["tts_1.mp3", "tts_3.mp3", "tts_5.mp3"]
+        assert zf.read("tts_3.mp3") == b"audio at 3.0"
+
+
+@pytest.mark.asyncio
+async def test_download_all_without_tts(async_client: AsyncClient):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+
+    response = await async_client.get(f"/api/files/{project_id}/download-all")
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "No TTS audio files found"
+
+
+@pytest.mark.asyncio
+async def test_download_all_is_cached(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    project_id = await create_tts_segments(async_client, async_session, test_settings)
+    url = f"/api/files/{project_id}/download-all"
+
+    first = await async_client.get(url)
+    etag = first.headers["etag"]
+    cached = list((test_settings.cache_dir / "exports").glob("*.zip"))
+    assert [path.name for path in cached] == [f"{etag.strip(chr(34))}.zip"]
+
+    # Served from the cache, with byte ranges
+    second = await async_client.get(url, headers={"Range": "bytes=0-3"})
+    assert second.status_code == 206
+    assert second.headers["etag"] == etag
+    assert second.content == first.content[:4]
+
+    not_modified = await async_client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+@pytest.mark.asyncio
+async def test_download_all_rebuilds_after_tts_change(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    project_id = await create_tts_segments(async_client, async_session, test_settings)
+    url = f"/api/files/{project_id}/download-all"
+    first = await async_client.get(url)
+
+    (test_settings.projects_dir / project_id / "output" / "tts_3.mp3").write_bytes(b"new take")
+    second = await async_client.get(url, headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    with zipfile.ZipFile(io.BytesIO(second.content)) as zf:
+        assert zf.read("tts_3.mp3") == b"new take"
+
+
+async def create_segment_file(async_client: AsyncClient, test_settings: Settings) -> str:
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    segments_dir = test_settings.projects_dir / project_id / "segments"
+    segments_dir.mkdir(parents=True, exist_ok=True)
+    (segments_dir / "seg.wav").write_bytes(bytes(range(256)) * 4)
+    return project_id
+
+
+@pytest.mark.asyncio
+async def test_file_revalidation_skips_database(async_client: AsyncClient, test_settings: Settings):
+    project_id = await create_segment_file(async_client, test_settings)
+    url = f"/api/files/{project_id}/segments/seg.wav"
+
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+
+    with patch.object(ProjectService, "get_by_id", side_effect=AssertionError("queried")):
+        revalidated = await async_client.get(url, headers={"If-None-Match": etag})
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_file_etag_changes_when_rewritten(async_client: AsyncClient, test_settings: Settings):
+    project_id = await create_segment_file(async_client, test_settings)
+    url = f"/api/files/{project_id}/segments/seg.wav"
+    etag = (await async_client.get(url)).headers["etag"]
+
+    path = test_settings.projects_dir / project_id / "segments" / "seg.wav"
+    path.write_bytes(b"re-extracted")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1000))
+
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.content == b"re-extracted"
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_file_byte_ranges(async_client: AsyncClient, test_settings: Settings):
+    project_id = await create_segment_file(async_client, test_settings)
+    url = f"/api/files/{project_id}/segments/seg.wav"
+
+    response = await async_client.get(url, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 10-19/1024"
+    assert response.content == bytes(range(10, 20))
+
+    response = await async_client.get(url, headers={"Range": "bytes=-4"})
+    assert response.status_code == 206
+    assert response.content == bytes(range(252, 256))
+
+    response = await async_client.get(url, headers={"Range": "bytes=2000-"})
+    assert response.status_code == 416
+
+
+@pytest.mark.asyncio
+async def test_file_not_found_and_traversal(async_client: AsyncClient, test_settings: Settings):
+    project_id = await create_segment_file(async_client, test_settings)
+
+    response = await async_client.get(f"/api/files/{project_id}/segments/missing.wav")
+    assert response.status_code == 400
+
+    response = await async_client.get(f"/api/files/{project_id}/segments/..%2Faudio")
+    assert response.status_code in (400, 404)
+
+
+@pytest.mark.asyncio
+async def test_file_requires_project_owner(async_client: AsyncClient):
+    response = await async_client.get("/api/files/not-a-project/segments/seg.wav")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_wildcard_revalidation_checks_ownership(
+    async_client: AsyncClient, test_settings: Settings
+):
+    project_id = await create_segment_file(async_client, test_settings)
+    url = f"/api/files/{project_id}/segments/seg.wav"
+
+    with patch.object(ProjectService, "get_by_id", side_effect=NotFoundError("Project not found")):
+        response = await async_client.get(url, headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+    response = await async_client.get(url, headers={"If-None-Match": "*"})
+    assert response.status_code == 304
+
+    response = await async_client.get("/api/voices/missing/audio", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
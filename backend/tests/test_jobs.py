@@ -0,0 +1,283 @@
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app
+from app.models import Job, JobKind, JobStatus
+from app.repositories.job_repo import JobRepository
+from app.services.job_queue import JobQueue, utcnow
+from app.services.openai_service import OpenAIService
+from app.utils.exceptions import ExternalAPIError
+
+
+async def _create_translated_segment(async_client: AsyncClient) -> str:
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    segment_id = (
+        await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": 1.5, "end_time": 5.0},
+        )
+    ).json()["id"]
+    await async_client.put(
+        f"/api/segments/{segment_id}/translation", json={"translated_text": "Hello"}
+    )
+    await async_client.put("/api/settings", json={"openai_api_key": "sk-test-key-1234"})
+    return segment_id
+
+
+def fake_generate_tts(failures: int):
+    """OpenAI TTS stub that fails ``failures`` times before it succeeds."""
+    calls: list[str] = []
+
+    async def generate_tts(
+        self: OpenAIService,
+        text: str,
+        voice: str,
+        output_path: Path,
+        instructions: Optional[str] = None,
+    ) -> Path:
+        calls.append(voice)
+        if len(calls) <= failures:
+            raise ExternalAPIError("rate limited")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(b"ID3")
+        return output_path
+
+    return generate_tts, calls
+
+
+@pytest.mark.asyncio
+async def test_generate_tts_async_returns_job(async_client: AsyncClient):
+    segment_id = await _create_translated_segment(async_client)
+    queue: JobQueue = app.state.job_queue
+    generate_tts, calls = fake_generate_tts(failures=0)
+
+    response = await async_client.post(
+        f"/api/segments/{segment_id}/generate-tts",
+        params={"async": "true"},
+        json={"voice": "nova", "tone": "calm"},
+    )
+
+    assert response.status_code == 202
+    job = response.json()
+    assert response.headers["location"] == f"/api/jobs/{job['id']}"
+    assert (job["kind"], job["status"], job["segment_id"]) == ("generate_tts", "queued", segment_id)
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert (segment["status"], segment["tts_voice"]) == ("generating_tts", "nova")
+
+    with patch.object(OpenAIService, "generate_tts", generate_tts):
+        assert await queue.run_once()
+        assert not await queue.run_once()
+
+    assert calls == ["nova"]
+    job = (await async_client.get(f"/api/jobs/{job['id']}")).json()
+    assert (job["status"], job["attempts"]) == ("succeeded", 1)
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["status"] == "completed"
+    assert segment["tts_result_file"].endswith("tts_00m01s500ms.mp3")
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_with_backoff(async_client: AsyncClient):
+    segment_id = await _create_translated_segment(async_client)
+    queue: JobQueue = app.state.job_queue
+    generate_tts, calls = fake_generate_tts(failures=1)
+    job_id = (
+        await async_client.post(
+            f"/api/segments/{segment_id}/generate-tts", params={"async": "true"}, json={}
+        )
+    ).json()["id"]
+
+    with patch.object(OpenAIService, "generate_tts", generate_tts):
+        assert await queue.run_once()
+
+        job = (await async_client.get(f"/api/jobs/{job_id}")).json()
+        assert (job["status"], job["attempts"], job["error_message"]) == (
+            "queued",
+            1,
+            "502: rate limited",
+        )
+        # The segment stays in progress while the job waits for its retry
+        segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+        assert segment["status"] == "generating_tts"
+        assert not await queue.run_once()
+
+        queue.clock = lambda: utcnow() + timedelta(seconds=queue.retry_base_delay + 1)
+        assert await queue.run_once()
+
+    assert len(calls) == 2
+    job = (await async_client.get(f"/api/jobs/{job_id}")).json()
+    assert (job["status"], job["attempts"]) == ("succeeded", 2)
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_job_fails_after_last_attempt(async_client: AsyncClient):
+    segment_id = await _create_translated_segment(async_client)
+    queue: JobQueue = app.state.job_queue
+    queue.max_attempts = 2
+    queue.retry_base_delay = 0
+    generate_tts, calls = fake_generate_tts(failures=5)
+    job_id = (
+        await async_client.post(
+            f"/api/segments/{segment_id}/generate-tts", params={"async": "true"}, json={}
+        )
+    ).json()["id"]
+
+    with patch.object(OpenAIService, "generate_tts", generate_tts):
+        while await queue.run_once():
+            pass
+
+    assert len(calls) == 2
+    job = (await async_client.get(f"/api/jobs/{job_id}")).json()
+    assert (job["status"], job["attempts"]) == ("failed", 2)
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert (segment["status"], segment["error_message"]) == ("error", "502: rate limited")
+
+
+@pytest.mark.asyncio
+async def test_job_is_not_retried_when_retrying_cannot_help(async_client: AsyncClient):
+    segment_id = await _create_translated_segment(async_client)
+    queue: JobQueue = app.state.job_queue
+
+    response = await async_client.post(
+        f"/api/segments/{segment_id}/analyze", params={"async": "true"}
+    )
+    assert response.status_code == 202
+    assert await queue.run_once()
+
+    job = (await async_client.get(f"/api/jobs/{response.json()['id']}")).json()
+    assert (job["status"], job["attempts"]) == ("failed", 1)
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["status"] == "error"
+    assert segment["error_message"] == "500: Segment has no audio file. Extract audio first."
+
+
+@pytest.mark.asyncio
+async def test_job_with_expired_lease_runs_again(
+    async_client: AsyncClient, async_session: AsyncSession
+):
+    segment_id = await _create_translated_segment(async_client)
+    queue: JobQueue = app.state.job_queue
+    generate_tts, calls = fake_generate_tts(failures=0)
+    job_id = (
+        await async_client.post(
+            f"/api/segments/{segment_id}/generate-tts", params={"async": "true"}, json={}
+        )
+    ).json()["id"]
+
+    # Claimed by a worker that died before finishing it
+    job = await async_session.get(Job, job_id)
+    job.status = JobStatus.RUNNING
+    job.attempts = 1
+    job.locked_until = utcnow() + timedelta(seconds=60)
+    await async_session.commit()
+
+    with patch.object(OpenAIService, "generate_tts", generate_tts):
+        assert not await queue.run_once()
+        queue.clock = lambda: utcnow() + timedelta(seconds=61)
+        assert await queue.run_once()
+
+    assert len(calls) == 1
+    job = (await async_client.get(f"/api/jobs/{job_id}")).json()
+    assert (job["status"], job["attempts"]) == ("succeeded", 2)
+
+
+@pytest.mark.asyncio
+async def test_stop_returns_running_job_to_queue(async_client: AsyncClient):
+    segment_id = await _create_translated_segment(async_client)
+    started = asyncio.Event()
+
+    async def slow_extract(session: AsyncSession, job: Job) -> None:
+        started.set()
+        await asyncio.sleep(60)
+
+    queue = JobQueue(app.state.job_queue.session_factory, {JobKind.EXTRACT: slow_extract})
+    app.state.job_queue = queue
+    job_id = (
+        await async_client.post(f"/api/segments/{segment_id}/extract", params={"async": "true"})
+    ).json()["id"]
+
+    queue.start()
+    await asyncio.wait_for(started.wait(), timeout=5)
+    await queue.stop()
+
+    job = (await async_client.get(f"/api/jobs/{job_id}")).json()
+    assert (job["status"], job["attempts"]) == ("queued", 0)
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["status"] == "extracting"
+
+
+@pytest.mark.asyncio
+async def test_segment_has_one_active_job_per_kind(async_client: AsyncClient):
+    segment_id = await _create_translated_segment(async_client)
+    queue: JobQueue = app.state.job_queue
+    generate_tts, _ = fake_generate_tts(failures=0)
+    first = await async_client.post(
+        f"/api/segments/{segment_id}/generate-tts", params={"async": "true"}, json={}
+    )
+
+    response = await async_client.post(
+        f"/api/segments/{segment_id}/generate-tts",
+        params={"async": "true"},
+        json={"voice": "nova"},
+    )
+
+    assert response.status_code == 409
+    assert first.json()["id"] in response.json()["detail"]
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["tts_voice"] != "nova"
+
+    # Another kind of job, or the same kind once the first has finished, is accepted
+    response = await async_client.post(
+        f"/api/segments/{segment_id}/analyze", params={"async": "true"}
+    )
+    assert response.status_code == 202
+    with patch.object(OpenAIService, "generate_tts", generate_tts):
+        while await queue.run_once():
+            pass
+    response = await async_client.post(
+        f"/api/segments/{segment_id}/generate-tts", params={"async": "true"}, json={}
+    )
+    assert response.status_code == 202
+
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_while_job_runs(
+    async_client: AsyncClient, async_session: AsyncSession
+):
+    segment_id = await _create_translated_segment(async_client)
+    reclaimed: list[Optional[Job]] = []
+
+    async def slow_extract(session: AsyncSession, job: Job) -> None:
+        await asyncio.sleep(0.45)
+        # Past the original lease, yet no other worker may claim the job
+        reclaimed.append(await JobRepository(session).claim_next(utcnow(), timedelta(0)))
+
+    queue = JobQueue(
+        app.state.job_queue.session_factory, {JobKind.EXTRACT: slow_extract}, lease=0.3
+    )
+    app.state.job_queue = queue
+    job_id = (
+        await async_client.post(f"/api/segments/{segment_id}/extract", params={"async": "true"})
+    ).json()["id"]
+
+    assert await queue.run_once()
+
+    assert reclaimed == [None]
+    job = (await async_client.get(f"/api/jobs/{job_id}")).json()
+    assert (job["status"], job["attempts"]) == ("succeeded", 1)
+
+
+@pytest.mark.asyncio
+async def test_get_job_not_found(async_client: AsyncClient):
+    response = await async_client.get("/api/jobs/missing")
+
+    assert response.status_code == 404
@@ -1,13 +1,23 @@
 import json
+from collections.abc import Callable
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
+from openai import AsyncOpenAI
 
 from app.services.openai_service import TTS_VOICES, OpenAIService
 from app.utils.exceptions import ExternalAPIError, ProcessingError
 
 
+def tts_service(handler: Callable[[httpx.Request], httpx.Response]) -> OpenAIService:
+    """OpenAIService whose HTTP requests are answered by ``handler``."""
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = AsyncOpenAI(api_key="test-key", http_client=http_client, max_retries=0)
+    return OpenAIService(api_key="test-key", client=client)
+
+
 @pytest.fixture
 def openai_service(tmp_path: Path) -> OpenAIService:
     return OpenAIService(api_key="test-key")
@@ -149,38 +159,38 @@ class TestOpenAIService:
             await openai_service.generate_tts("Hello")
 
     @pytest.mark.asyncio
-    async def test_generate_tts_success(self, openai_service: OpenAIService, tmp_path: Path):
+    async def test_generate_tts_success(self, tmp_path: Path):
         output_path = tmp_path / "output" / "tts.mp3"
-        mock_response = MagicMock()
-        mock_response.content = b"fake mp3 data"
+        service = tts_service(lambda request: httpx.Response(200, content=b"fake mp3 data"))
 
-        with patch.object(openai_service, "_client", new_callable=MagicMock) as mock_client:
-            mock_client.audio.speech.create = AsyncMock(return_value=mock_response)
-
-            result = await openai_service.generate_tts(
-                "Hello world", voice="alloy", output_path=output_path
-            )
+        result = await service.generate_tts("Hello world", voice="alloy", output_path=output_path)
 
-            assert result == output_path
-            assert output_path.exists()
-            assert output_path.read_bytes() == b"fake mp3 data"
+        assert result == output_path
+        assert output_path.read_bytes() == b"fake mp3 data"
+        assert list(output_path.parent.iterdir()) == [output_path]
 
     @pytest.mark.asyncio
-    async def test_generate_tts_all_voices(self, openai_service: OpenAIService, tmp_path: Path):
+    async def test_generate_tts_all_voices(self, tmp_path: Path):
         """Test that all valid voices are accepted."""
+        service = tts_service(lambda request: httpx.Response(200, content=b"audio"))
         for voice in TTS_VOICES:
             output_path = tmp_path / f"{voice}.mp3"
-            mock_response = MagicMock()
-            mock_response.content = b"audio"
 
-            with patch.object(openai_service, "_client", new_callable=MagicMock) as mock_client:
-                mock_client.audio.speech.create = AsyncMock(return_value=mock_response)
+            result = await service.generate_tts("Test", voice=voice, output_path=output_path)
 
-                result = await openai_service.generate_tts(
-                    "Test", voice=voice, output_path=output_path
-                )
+            assert result == output_path
+
+    @pytest.mark.asyncio
+    async def test_generate_tts_error_keeps_previous_file(self, tmp_path: Path):
+        output_path = tmp_path / "tts.mp3"
+        output_path.write_bytes(b"previous")
+        service = tts_service(lambda request: httpx.Response(500, json={"error": "boom"}))
+
+        with pytest.raises(ExternalAPIError, match="Failed to generate TTS"):
+            await service.generate_tts("Hello", output_path=output_path)
 
-                assert result == output_path
+        assert output_path.read_bytes() == b"previous"
+        assert list(tmp_path.iterdir()) == [output_path]
 
 
 class TestTTSFilenameFormat:
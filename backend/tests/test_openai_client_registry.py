@@ -0,0 +1,92 @@
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.openai_client_registry import OpenAIClientRegistry
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestOpenAIClientRegistry:
+    @pytest.mark.asyncio
+    async def test_reuses_client_per_key(self):
+        registry = OpenAIClientRegistry(max_clients=4, idle_timeout=60)
+
+        async with registry.lease("key-a") as first:
+            pass
+        async with registry.lease("key-a") as second:
+            pass
+        async with registry.lease("key-b") as other:
+            pass
+
+        assert first is second
+        assert other is not first
+        assert len(registry) == 2
+        await registry.close()
+        assert first.is_closed() and other.is_closed()
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        registry = OpenAIClientRegistry(max_clients=2, idle_timeout=60)
+
+        async with registry.lease("key-a") as a:
+            pass
+        async with registry.lease("key-b") as b:
+            pass
+        async with registry.lease("key-a"):
+            pass
+        async with registry.lease("key-c"):
+            pass
+
+        assert len(registry) == 2
+        assert b.is_closed()
+        assert not a.is_closed()
+        await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_closes_idle_clients(self):
+        clock = FakeClock()
+        registry = OpenAIClientRegistry(max_clients=4, idle_timeout=60, clock=clock)
+
+        async with registry.lease("key-a") as a:
+            pass
+        clock.now = 61
+        async with registry.lease("key-b"):
+            pass
+
+        assert a.is_closed()
+        assert len(registry) == 1
+        await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_leased_client_closed_after_release(self):
+        registry = OpenAIClientRegistry(max_clients=4, idle_timeout=60)
+
+        async with registry.lease("key-a") as client:
+            await registry.invalidate("key-a")
+            assert not client.is_closed()
+            async with registry.lease("key-a") as replacement:
+                assert replacement is not client
+
+        assert client.is_closed()
+        await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_changing_api_key_invalidates_client(async_client: AsyncClient):
+    registry: OpenAIClientRegistry = app.state.openai_clients
+    await async_client.put("/api/settings", json={"openai_api_key": "sk-old-key-1234"})
+    async with registry.lease("sk-old-key-1234") as old_client:
+        pass
+
+    response = await async_client.put("/api/settings", json={"openai_api_key": "sk-new-key-5678"})
+
+    assert response.status_code == 200
+    assert old_client.is_closed()
+    assert len(registry) == 0
@@ -0,0 +1,224 @@
+import asyncio
+import base64
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.services.openai_client_registry import OpenAIClientRegistry
+from app.services.openai_rate_limiter import (
+    AIMDController,
+    OpenAIRateLimiter,
+    RateLimitPolicy,
+    estimate_tokens,
+    parse_duration,
+)
+from app.services.openai_service import OpenAIService
+from app.utils.exceptions import ExternalAPIError
+
+FAST_RETRIES = RateLimitPolicy(max_retries=3, retry_base_delay=0.001, retry_max_delay=0.01)
+
+
+class FakeOpenAITransport(httpx.AsyncBaseTransport):
+    """OpenAI API stand-in that throttles like the real one.
+
+    Answers with 429 while ``throttle`` is positive (counting down), or with
+    ``error`` when set; otherwise with a chat completion or MP3 audio. Every
+    response carries rate-limit headers, and in-flight requests are counted.
+    """
+
+    def __init__(self, throttle: int = 0, error: tuple[int, str] = (0, "")) -> None:
+        self.throttle = throttle
+        self.error = error
+        self.requests: list[httpx.Request] = []
+        self.active = 0
+        self.peak = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.001)
+        finally:
+            self.active -= 1
+        headers = {
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "499",
+            "x-ratelimit-reset-requests": "120ms",
+            "x-ratelimit-limit-tokens": "30000",
+            "x-ratelimit-remaining-tokens": "29000",
+            "x-ratelimit-reset-tokens": "2s",
+        }
+        if self.throttle > 0:
+            self.throttle -= 1
+            return httpx.Response(
+                429,
+                headers={**headers, "retry-after-ms": "1"},
+                json={"error": {"message": "Rate limit reached", "type": "requests"}},
+            )
+        status, error_type = self.error
+        if status:
+            return httpx.Response(
+                status, headers=headers, json={"error": {"message": "No", "type": error_type}}
+            )
+        if request.url.path.endswith("/audio/speech"):
+            return httpx.Response(200, headers=headers, content=b"ID3 audio")
+        return httpx.Response(
+            200,
+            headers=headers,
+            json={
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o-audio-preview",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": '{"transcription": "Hola"}'},
+                    }
+                ],
+            },
+        )
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def sample_audio(tmp_path: Path) -> Path:
+    path = tmp_path / "segment.wav"
+    path.write_bytes(b"RIFF" + b"\0" * 40)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_throttled_requests_are_retried(sample_audio: Path, tmp_path: Path):
+    transport = FakeOpenAITransport(throttle=2)
+    registry = OpenAIClientRegistry(4, 60, rate_limits=FAST_RETRIES, transport=transport)
+
+    async with registry.lease("sk-test") as client:
+        service = OpenAIService(api_key="sk-test", client=client)
+        assert await service.analyze_audio(sample_audio) == {"transcription": "Hola"}
+        await service.generate_tts("Hello", output_path=tmp_path / "tts.mp3")
+
+    assert len(transport.requests) == 4
+    assert (tmp_path / "tts.mp3").read_bytes() == b"ID3 audio"
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries_or_exhausted_quota(sample_audio: Path):
+    transport = FakeOpenAITransport(throttle=10)
+    registry = OpenAIClientRegistry(4, 60, rate_limits=FAST_RETRIES, transport=transport)
+
+    async with registry.lease("sk-test") as client:
+        service = OpenAIService(api_key="sk-test", client=client)
+        with pytest.raises(ExternalAPIError, match="Rate limit reached"):
+            await service.analyze_audio(sample_audio)
+        assert len(transport.requests) == 4
+
+        # Waiting does not bring back an exhausted quota
+        transport.throttle = 0
+        transport.error = (429, "insufficient_quota")
+        with pytest.raises(ExternalAPIError):
+            await service.analyze_audio(sample_audio)
+        assert len(transport.requests) == 5
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_halves_when_throttled_and_recovers(tmp_path: Path):
+    transport = FakeOpenAITransport(throttle=3)
+    registry = OpenAIClientRegistry(
+        4,
+        60,
+        rate_limits=RateLimitPolicy(retry_base_delay=0.001, max_concurrency=8),
+        transport=transport,
+    )
+
+    async with registry.lease("sk-test") as client:
+        service = OpenAIService(api_key="sk-test", client=client)
+        await asyncio.gather(
+            *(service.generate_tts("Hi", output_path=tmp_path / f"{i}.mp3") for i in range(16))
+        )
+    assert len(transport.requests) == 19
+    assert transport.peak <= 8
+    await registry.close()
+
+    controller = AIMDController(max_limit=8)
+    for _ in range(3):
+        controller.on_overload()
+    assert controller.limit == 1
+    for _ in range(6):
+        controller.on_success()
+    assert 3 <= controller.limit < 4
+
+
+@pytest.mark.asyncio
+async def test_requests_wait_for_reported_budget():
+    clock = FakeTime()
+    limiter = OpenAIRateLimiter(
+        RateLimitPolicy(retry_base_delay=1.0, retry_max_delay=8.0),
+        clock=clock,
+        sleep=clock.sleep,
+        jitter=lambda: 1.0,
+    )
+
+    # Unlimited until the server reports a budget
+    await limiter.wait_for_budget(5000)
+    limiter.observe(
+        httpx.Headers(
+            {
+                "x-ratelimit-limit-requests": "60",
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "1s",
+                "x-ratelimit-limit-tokens": "1200",
+                "x-ratelimit-remaining-tokens": "1200",
+                "x-ratelimit-reset-tokens": "0s",
+            }
+        )
+    )
+    await limiter.wait_for_budget(100)
+    # 60 requests come back within the second
+    assert clock.sleeps == [pytest.approx(1 / 60)]
+    # A request larger than the whole budget waits for a full bucket (20 tokens/s)
+    await limiter.wait_for_budget(5000)
+    assert clock.now == pytest.approx(1 / 60 + 100 / 20)
+
+    assert [limiter.retry_delay(attempt) for attempt in (1, 2, 3, 5)] == [1.0, 2.0, 4.0, 8.0]
+    assert limiter.retry_delay(1, httpx.Headers({"retry-after": "3"})) == 4.0
+
+
+def test_estimate_tokens_counts_text_and_audio():
+    one_second = base64.b64encode(b"\0" * 176400).decode()
+    body = {
+        "model": "gpt-4o-audio-preview",
+        "messages": [
+            {"role": "system", "content": "x" * 400},
+            {
+                "role": "user",
+                "content": [{"type": "input_audio", "input_audio": {"data": one_second}}],
+            },
+        ],
+    }
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions", json=body)
+
+    assert 110 <= estimate_tokens(request) <= 130
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("1.5s") == 1.5
+    assert parse_duration("20ms") == pytest.approx(0.02)
+    assert parse_duration("") is None
+    assert json.loads(request.content)["model"] == "gpt-4o-audio-preview"
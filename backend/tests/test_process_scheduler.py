@@ -0,0 +1,132 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import Settings
+from app.services.ffmpeg_service import FFmpegService
+from app.services.process_scheduler import JobPriority, ProcessScheduler
+from app.utils.exceptions import ProcessingError
+
+
+class TestProcessScheduler:
+    @pytest.mark.asyncio
+    async def test_limits_concurrency(self):
+        scheduler = ProcessScheduler(max_concurrency=2)
+        active = 0
+        peak = 0
+
+        async def job() -> None:
+            nonlocal active, peak
+            async with scheduler.slot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(job() for _ in range(6)))
+
+        assert peak == 2
+        assert scheduler.running == 0
+        assert scheduler.stats().jobs_started == 6
+
+    @pytest.mark.asyncio
+    async def test_admits_by_priority(self):
+        scheduler = ProcessScheduler(max_concurrency=1)
+        order: list[str] = []
+
+        async def job(name: str, priority: JobPriority) -> None:
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        await scheduler.acquire()
+        tasks = [
+            asyncio.create_task(job("extract", JobPriority.EXTRACTION)),
+            asyncio.create_task(job("segment-1", JobPriority.SEGMENT)),
+            asyncio.create_task(job("probe", JobPriority.PROBE)),
+            asyncio.create_task(job("segment-2", JobPriority.SEGMENT)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 4
+
+        scheduler.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["probe", "segment-1", "segment-2", "extract"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        scheduler = ProcessScheduler(max_concurrency=1)
+        await scheduler.acquire()
+
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert scheduler.queue_depth == 0
+        scheduler.release()
+        assert scheduler.running == 0
+
+        await asyncio.wait_for(scheduler.acquire(), timeout=1)
+        assert scheduler.running == 1
+
+    @pytest.mark.asyncio
+    async def test_records_wait_time(self):
+        scheduler = ProcessScheduler(max_concurrency=1)
+        await scheduler.acquire()
+
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0.05)
+        scheduler.release()
+        await waiter
+
+        stats = scheduler.stats()
+        assert stats.running == 1
+        assert stats.jobs_started == 2
+        assert stats.max_wait_seconds >= 0.04
+        assert stats.last_wait_seconds == stats.max_wait_seconds
+
+    def test_rejects_zero_concurrency(self):
+        with pytest.raises(ValueError):
+            ProcessScheduler(max_concurrency=0)
+
+
+class TestFFmpegServiceScheduling:
+    @pytest.mark.asyncio
+    async def test_run_process_timeout_kills_process(self, tmp_path: Path):
+        scheduler = ProcessScheduler(max_concurrency=1)
+        service = FFmpegService(Settings(projects_dir=tmp_path), scheduler=scheduler)
+
+        with pytest.raises(ProcessingError, match="timed out"):
+            await service._run_process(["sleep", "10"], JobPriority.SEGMENT, timeout=0.1)
+
+        stats = scheduler.stats()
+        assert stats.jobs_timed_out == 1
+        assert stats.running == 0
+
+    @pytest.mark.asyncio
+    async def test_run_process_returns_output(self, tmp_path: Path):
+        scheduler = ProcessScheduler(max_concurrency=1)
+        service = FFmpegService(Settings(projects_dir=tmp_path), scheduler=scheduler)
+
+        returncode, stdout, _ = await service._run_process(
+            ["echo", "hello"], JobPriority.PROBE, timeout=5
+        )
+
+        assert returncode == 0
+        assert stdout.strip() == b"hello"
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(async_client: AsyncClient):
+    response = await async_client.get("/api/metrics")
+
+    assert response.status_code == 200
+    pools = {pool["scheduler"]: pool for pool in response.json()["ffmpeg"]}
+    assert pools.keys() == {"shared", "stream"}
+    for pool in pools.values():
+        assert pool["max_concurrency"] >= 1
+        assert {"running", "queue_depth", "avg_wait_seconds"} <= pool.keys()
@@ -1,8 +1,15 @@
 import io
+import wave
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from httpx import AsyncClient
 
+from app.config import Settings
+from app.services.ffmpeg_service import FFmpegService
+
 
 @pytest.mark.asyncio
 async def test_create_project(async_client: AsyncClient):
@@ -101,3 +108,138 @@ async def test_upload_video_invalid_extension(async_client: AsyncClient):
         files={"file": ("test.txt", fake_file, "text/plain")},
     )
     assert response.status_code == 400
+
+
+class AudioRecorder:
+    """Stand-in for the FFmpeg stdin writer that records piped bytes."""
+
+    def __init__(self) -> None:
+        self.received = bytearray()
+
+    async def write(self, chunk: bytes) -> None:
+        self.received.extend(chunk)
+
+
+@pytest.fixture
+def stream_extraction():
+    """Replace streaming FFmpeg extraction with one second of silence."""
+    recorder = AudioRecorder()
+
+    @asynccontextmanager
+    async def fake_extract(self, output_path: Path):
+        # Like FFmpeg: the output is created up front and removed on failure
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(b"")
+        try:
+            yield recorder
+        except BaseException:
+            output_path.unlink(missing_ok=True)
+            raise
+        with wave.open(str(output_path), "wb") as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(44100)
+            f.writeframes(b"\x00" * 44100 * 4)
+
+    with patch.object(FFmpegService, "extract_audio_from_stream", fake_extract):
+        yield recorder
+
+
+@pytest.mark.asyncio
+async def test_upload_video_stream(
+    async_client: AsyncClient, test_settings: Settings, stream_extraction: AudioRecorder
+):
+    create_response = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = create_response.json()["id"]
+    body = b"fake video content" * 10000
+
+    response = await async_client.post(
+        f"/api/projects/{project_id}/upload/stream",
+        params={"filename": "clip.MKV"},
+        content=body,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source_video"] == f"{project_id}/source/video.mkv"
+    assert data["extracted_audio"] == f"{project_id}/audio/full_audio.wav"
+    assert (test_settings.projects_dir / data["source_video"]).read_bytes() == body
+    assert stream_extraction.received == body
+    assert (test_settings.projects_dir / project_id / "audio" / "full_audio_peaks").is_dir()
+
+
+@pytest.mark.asyncio
+async def test_upload_video_stream_invalid_extension(async_client: AsyncClient):
+    create_response = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = create_response.json()["id"]
+
+    response = await async_client.post(
+        f"/api/projects/{project_id}/upload/stream",
+        params={"filename": "notes.txt"},
+        content=b"not a video",
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_upload_video_stream_too_large(
+    async_client: AsyncClient, test_settings: Settings, stream_extraction: AudioRecorder
+):
+    test_settings.max_upload_size_mb = 1
+    create_response = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = create_response.json()["id"]
+
+    response = await async_client.post(
+        f"/api/projects/{project_id}/upload/stream",
+        params={"filename": "clip.mp4"},
+        content=b"\x00" * (1024 * 1024 + 1),
+    )
+
+    assert response.status_code == 400
+    assert not list((test_settings.projects_dir / project_id / "source").iterdir())
+    project = (await async_client.get(f"/api/projects/{project_id}")).json()
+    assert project["source_video"] is None
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_video_stream_keeps_audio(
+    async_client: AsyncClient, test_settings: Settings, stream_extraction: AudioRecorder
+):
+    create_response = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = create_response.json()["id"]
+    response = await async_client.post(
+        f"/api/projects/{project_id}/upload/stream",
+        params={"filename": "clip.mp4"},
+        content=b"first video",
+    )
+    assert response.status_code == 200
+    audio_dir = test_settings.projects_dir / project_id / "audio"
+    previous_audio = (audio_dir / "full_audio.wav").read_bytes()
+
+    test_settings.max_upload_size_mb = 1
+    response = await async_client.post(
+        f"/api/projects/{project_id}/upload/stream",
+        params={"filename": "clip.mp4"},
+        content=b"\x00" * (1024 * 1024 + 1),
+    )
+
+    assert response.status_code == 400
+    assert (audio_dir / "full_audio.wav").read_bytes() == previous_audio
+    assert not list(audio_dir.glob("*.part"))
+    project = (await async_client.get(f"/api/projects/{project_id}")).json()
+    assert project["extracted_audio"] == f"{project_id}/audio/full_audio.wav"
+
+
+@pytest.mark.asyncio
+async def test_upload_video_too_large(async_client: AsyncClient, test_settings: Settings):
+    test_settings.max_upload_size_mb = 1
+    create_response = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = create_response.json()["id"]
+
+    response = await async_client.post(
+        f"/api/projects/{project_id}/upload",
+        files={"file": ("test.mp4", io.BytesIO(b"\x00" * (1024 * 1024 + 1)), "video/mp4")},
+    )
+
+    assert response.status_code == 400
+    assert not (test_settings.projects_dir / project_id / "source" / "video.mp4").exists()
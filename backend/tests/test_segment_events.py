@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Segment, SegmentStatus
+from app.repositories.segment_repo import SegmentRepository
+from app.services.segment_events import (
+    SegmentEvent,
+    SegmentEventHub,
+    get_segment_events,
+    stream_project_events,
+)
+
+
+def _event(project_id: str = "p1", **changes) -> SegmentEvent:
+    return SegmentEvent(type="updated", project_id=project_id, segment_id="s1", changes=changes)
+
+
+def _data(chunk: str) -> dict:
+    return json.loads(chunk.split("data: ", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_hub_delivers_replays_and_resyncs() -> None:
+    forwarded = []
+    hub = SegmentEventHub(history=2, queue_size=2, forward=forwarded.append)
+
+    async with hub.subscribe("p1") as queue:
+        hub.publish(_event(status="analyzing"))
+        hub.publish(_event("p2", status="analyzing"))
+        first = queue.get_nowait()
+        assert first.changes == {"status": "analyzing"}
+        assert queue.empty()
+
+        hub.deliver(_event(status="analyzed"))
+        assert [e.changes for e in hub.since("p1", first.id)] == [{"status": "analyzed"}]
+        assert len(forwarded) == 2
+
+        # A subscriber that falls behind is told to resync instead of blocking
+        for _ in range(2):
+            hub.publish(_event(status="error"))
+        assert queue.get_nowait() is None
+        assert queue.empty()
+
+    assert hub.subscriber_count("p1") == 0
+    # Trimmed from the history, or issued by another hub
+    assert hub.since("p1", first.id) is None
+    assert hub.since("p1", "0000-1") is None
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_from_last_event_id() -> None:
+    hub = SegmentEventHub()
+    hub.publish(_event(status="analyzing"))
+    last_id = hub.since("p1", f"{hub.instance}-0")[0].id
+    hub.publish(_event(status="analyzed", analysis_json={"mood": "calm"}))
+
+    stream = stream_project_events(hub, "p1", last_id, heartbeat=0.01)
+    assert await stream.__anext__() == "retry: 3000\n\n"
+    replayed = await stream.__anext__()
+    assert "event: updated" in replayed
+    assert _data(replayed) == {
+        "segment_id": "s1",
+        "status": "analyzed",
+        "analysis_json": {"mood": "calm"},
+    }
+    assert await stream.__anext__() == ": ping\n\n"
+
+    hub.publish(_event(translated_text="Hola"))
+    assert _data(await stream.__anext__())["translated_text"] == "Hola"
+    await stream.aclose()
+    assert hub.subscriber_count("p1") == 0
+
+    stream = stream_project_events(hub, "p1", "unknown-1")
+    await stream.__anext__()
+    assert (await stream.__anext__()).startswith("event: resync")
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_repository_publishes_changed_fields_on_commit(
+    async_client: AsyncClient, async_session: AsyncSession
+) -> None:
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    hub = get_segment_events()
+
+    async with hub.subscribe(project_id) as queue:
+        segment_id = (
+            await async_client.post(
+                f"/api/projects/{project_id}/segments",
+                json={"start_time": 1.0, "end_time": 2.5},
+            )
+        ).json()["id"]
+        assert queue.empty()
+        # Committed by the request's session dependency
+        await async_session.commit()
+        created = queue.get_nowait()
+        assert created.type == "created"
+        assert created.changes["end_time"] == 2.5
+
+        repo = SegmentRepository(async_session)
+        segment = await async_session.get(Segment, segment_id)
+        await repo.update(segment, status=SegmentStatus.ANALYZING, translated_text=None)
+        assert queue.empty()
+        await repo.commit()
+        updated = queue.get_nowait()
+        assert updated.segment_id == segment_id
+        assert set(updated.changes) == {"status", "updated_at"}
+
+        await repo.update(segment, status=SegmentStatus.ERROR)
+        await async_session.rollback()
+        await repo.commit()
+        assert queue.empty()
+
+        response = await async_client.delete(f"/api/segments/{segment_id}")
+        assert response.status_code == 204
+        await async_session.commit()
+        assert queue.get_nowait().type == "deleted"
+
+
+@pytest.mark.asyncio
+async def test_project_events_requires_owned_project(async_client: AsyncClient) -> None:
+    response = await async_client.get("/api/projects/missing/events")
+    assert response.status_code == 404
@@ -0,0 +1,167 @@
+import os
+from datetime import timedelta, timezone
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.main import app
+from app.models import Job, JobKind, Segment, SegmentStatus
+from app.services.job_queue import utcnow
+from app.services.openai_service import OpenAIService
+from app.services.segment_reconciler import SegmentReconciler
+from app.services.tts_cache import TTSCache
+from app.services.wav_service import SEGMENT_SAMPLE_RATE, WavFormat, WavService
+
+STEREO_16_BIT = WavFormat(
+    channels=2,
+    sample_rate=SEGMENT_SAMPLE_RATE,
+    bits_per_sample=16,
+    block_align=4,
+    data_offset=44,
+    data_size=0,
+)
+
+
+def write_wav(path: Path, seconds: float) -> None:
+    data_size = round(seconds * SEGMENT_SAMPLE_RATE) * STEREO_16_BIT.block_align
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(WavService.build_header(STEREO_16_BIT, data_size) + b"\0" * data_size)
+
+
+@pytest.fixture
+def reconciler(async_client: AsyncClient, test_settings: Settings) -> SegmentReconciler:
+    queue = app.state.job_queue
+    return SegmentReconciler(queue.session_factory, queue, test_settings, stale_after=600)
+
+
+async def _create_segments(
+    async_client: AsyncClient, async_session: AsyncSession, statuses: list[SegmentStatus]
+) -> tuple[str, list[Segment]]:
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    segments = []
+    for i, status in enumerate(statuses):
+        segment_id = (
+            await async_client.post(
+                f"/api/projects/{project_id}/segments",
+                json={"start_time": float(i), "end_time": i + 1.0},
+            )
+        ).json()["id"]
+        segment = await async_session.get(Segment, segment_id)
+        segment.status = status
+        segment.updated_at = utcnow() - timedelta(hours=2)
+        segments.append(segment)
+    await async_session.commit()
+    return project_id, segments
+
+
+@pytest.mark.asyncio
+async def test_reconcile_resolves_stuck_segments(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    test_settings: Settings,
+    reconciler: SegmentReconciler,
+):
+    project_id, segments = await _create_segments(
+        async_client,
+        async_session,
+        [
+            SegmentStatus.EXTRACTING,  # Extracted before the restart
+            SegmentStatus.EXTRACTING,  # Cut short
+            SegmentStatus.ANALYZING,  # Has audio
+            SegmentStatus.ANALYZING,  # Has none
+            SegmentStatus.GENERATING_TTS,  # New audio saved
+            SegmentStatus.GENERATING_TTS,  # Only older audio
+        ],
+    )
+    segments_dir = test_settings.projects_dir / project_id / "segments"
+    write_wav(segments_dir / "segment_00m00s000ms.wav", 1.0)
+    write_wav(segments_dir / "segment_00m01s000ms.wav", 0.5)
+    write_wav(segments_dir / "segment_00m02s000ms.wav", 1.0)
+    output_dir = test_settings.projects_dir / project_id / "output"
+    output_dir.mkdir(parents=True)
+    (output_dir / "tts_00m04s000ms.wav").write_bytes(b"RIFF")
+    older = output_dir / "tts_00m05s000ms.mp3"
+    older.write_bytes(b"ID3")
+    three_hours_ago = (utcnow() - timedelta(hours=3)).replace(tzinfo=timezone.utc).timestamp()
+    os.utime(older, (three_hours_ago, three_hours_ago))
+    segments[2].audio_file = f"{project_id}/segments/segment_00m02s000ms.wav"
+    segments[5].tts_result_file = f"{project_id}/output/tts_00m05s000ms.mp3"
+    for segment in segments:
+        segment.updated_at = utcnow() - timedelta(hours=2)
+    await async_session.commit()
+
+    result = await reconciler.reconcile()
+
+    assert (result.completed, result.requeued, result.failed) == (2, 2, 2)
+    by_id = {
+        s["id"]: s for s in (await async_client.get(f"/api/projects/{project_id}/segments")).json()
+    }
+    states = [by_id[s.id] for s in segments]
+    assert [s["status"] for s in states] == [
+        "extracted",
+        "extracting",
+        "analyzing",
+        "error",
+        "completed",
+        "error",
+    ]
+    assert states[0]["audio_file"] == f"{project_id}/segments/segment_00m00s000ms.wav"
+    assert states[4]["tts_result_file"] == f"{project_id}/output/tts_00m04s000ms.wav"
+    assert states[5]["error_message"] == "TTS generation was interrupted; generate it again"
+
+    jobs = (await async_session.execute(select(Job))).scalars().all()
+    assert sorted((j.segment_id, j.kind) for j in jobs) == sorted(
+        [(segments[1].id, JobKind.EXTRACT), (segments[2].id, JobKind.ANALYZE)]
+    )
+
+    # Queued segments are the job queue's business now
+    assert (await reconciler.reconcile(utcnow() + timedelta(hours=1))).total == 0
+
+
+@pytest.mark.asyncio
+async def test_reconcile_leaves_recent_segments_alone(
+    async_client: AsyncClient, async_session: AsyncSession, reconciler: SegmentReconciler
+):
+    _, segments = await _create_segments(
+        async_client, async_session, [SegmentStatus.GENERATING_TTS, SegmentStatus.ANALYZED]
+    )
+    segments[0].updated_at = utcnow() - timedelta(seconds=60)
+    segments[1].updated_at = utcnow() - timedelta(hours=5)
+    await async_session.commit()
+
+    result = await reconciler.reconcile()
+
+    assert result.total == 0
+    await async_session.refresh(segments[0])
+    assert segments[0].status == SegmentStatus.GENERATING_TTS
+
+
+@pytest.mark.asyncio
+async def test_reconcile_completes_tts_restored_from_cache(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    test_settings: Settings,
+    reconciler: SegmentReconciler,
+):
+    project_id, segments = await _create_segments(
+        async_client, async_session, [SegmentStatus.GENERATING_TTS]
+    )
+    cache = TTSCache(test_settings)
+    entry = cache.get_path("key", ".mp3")
+    entry.parent.mkdir(parents=True)
+    entry.write_bytes(b"ID3")
+    three_hours_ago = (utcnow() - timedelta(hours=3)).replace(tzinfo=timezone.utc).timestamp()
+    os.utime(entry, (three_hours_ago, three_hours_ago))
+    # Restored, then the process died before the segment was saved
+    output_dir = test_settings.projects_dir / project_id / "output"
+    assert cache.restore("key", output_dir / OpenAIService.format_tts_filename(0.0))
+
+    result = await reconciler.reconcile()
+
+    assert result.completed == 1
+    await async_session.refresh(segments[0])
+    assert segments[0].status == SegmentStatus.COMPLETED
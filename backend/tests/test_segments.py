@@ -1,5 +1,29 @@
+import asyncio
+import wave
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.models import Project, Segment
+from app.models.segment import SegmentStatus
+from app.repositories.segment_repo import SegmentRepository
+from app.services.ffmpeg_service import FFmpegService
+from app.services.openai_service import OpenAIService
+from app.services.segment_service import SegmentService, TTSInputs
+from app.services.tts_cache import TTSCache
+from app.utils.exceptions import ExternalAPIError, ProcessingError
+
+
+async def _set_extracted_audio(session: AsyncSession, project_id: str) -> None:
+    project = await session.get(Project, project_id)
+    project.extracted_audio = f"{project_id}/audio/full_audio.wav"
+    await session.flush()
 
 
 @pytest.mark.asyncio
@@ -169,3 +193,488 @@ async def test_segments_deleted_with_project(async_client: AsyncClient):
     # Segment should be gone too (cascade delete)
     get_resp = await async_client.get(f"/api/segments/{segment_id}")
     assert get_resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_extract_all_segments(async_client: AsyncClient, async_session: AsyncSession):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    for start, end in [(5.0, 10.0), (0.0, 5.0)]:
+        await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": start, "end_time": end},
+        )
+    await _set_extracted_audio(async_session, project_id)
+
+    calls = []
+
+    async def fake_extract_segments(
+        self: FFmpegService, audio_path: Path, segments: list[tuple[Path, float, float]]
+    ) -> list[Path]:
+        calls.append(segments)
+        return [path for path, _, _ in segments]
+
+    with patch.object(FFmpegService, "extract_segments", fake_extract_segments):
+        response = await async_client.post(f"/api/projects/{project_id}/segments/extract-all")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(calls) == 1
+    assert [(start, end) for _, start, end in calls[0]] == [(0.0, 5.0), (5.0, 10.0)]
+    assert [s["status"] for s in data] == ["extracted", "extracted"]
+    assert data[0]["audio_file"] == f"{project_id}/segments/segment_00m00s000ms.wav"
+    assert data[1]["audio_file"] == f"{project_id}/segments/segment_00m05s000ms.wav"
+
+
+@pytest.mark.asyncio
+async def test_extract_all_segments_failure_marks_error(
+    async_client: AsyncClient, async_session: AsyncSession
+):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    create_resp = await async_client.post(
+        f"/api/projects/{project_id}/segments",
+        json={"start_time": 0.0, "end_time": 5.0},
+    )
+    segment_id = create_resp.json()["id"]
+    await _set_extracted_audio(async_session, project_id)
+
+    async def failing_extract_segments(self: FFmpegService, *args: object) -> list[Path]:
+        raise ProcessingError("FFmpeg processing failed: boom")
+
+    with patch.object(FFmpegService, "extract_segments", failing_extract_segments):
+        response = await async_client.post(f"/api/projects/{project_id}/segments/extract-all")
+
+    assert response.status_code == 500
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["status"] == "error"
+    assert "boom" in segment["error_message"]
+
+
+@pytest.mark.asyncio
+async def test_extract_all_segments_requires_project_audio(async_client: AsyncClient):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+
+    response = await async_client.post(f"/api/projects/{project_id}/segments/extract-all")
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Project has no extracted audio"
+
+
+@pytest.mark.asyncio
+async def test_create_segment_slices_pcm_audio_in_process(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    audio_path = test_settings.projects_dir / project_id / "audio" / "full_audio.wav"
+    audio_path.parent.mkdir(parents=True)
+    with wave.open(str(audio_path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        f.writeframes(b"\x01\x00" * 2 * 44100 * 2)
+    await _set_extracted_audio(async_session, project_id)
+
+    with patch.object(FFmpegService, "extract_segment") as ffmpeg_extract:
+        response = await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": 0.5, "end_time": 1.0},
+        )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["status"] == "extracted"
+    ffmpeg_extract.assert_not_called()
+    with wave.open(str(test_settings.projects_dir / data["audio_file"]), "rb") as f:
+        assert f.getnframes() == 22050
+
+
+async def _create_translated_segment(async_client: AsyncClient) -> tuple[str, str]:
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    segment_id = (
+        await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": 1.5, "end_time": 5.0},
+        )
+    ).json()["id"]
+    await async_client.put(
+        f"/api/segments/{segment_id}/translation", json={"translated_text": "Hello"}
+    )
+    await async_client.put("/api/settings", json={"openai_api_key": "sk-test-key-1234"})
+    return project_id, segment_id
+
+
+@pytest.mark.asyncio
+async def test_stream_tts_saves_result(async_client: AsyncClient, test_settings: Settings):
+    project_id, segment_id = await _create_translated_segment(async_client)
+    requests: list[tuple[str, str, Optional[str]]] = []
+
+    async def fake_stream_tts(
+        self: OpenAIService, text: str, voice: str, instructions: Optional[str]
+    ) -> AsyncIterator[bytes]:
+        requests.append((text, voice, instructions))
+        for chunk in (b"ID3", b"frame-1", b"frame-2"):
+            yield chunk
+
+    with patch.object(OpenAIService, "stream_tts", fake_stream_tts):
+        response = await async_client.get(
+            f"/api/segments/{segment_id}/tts/stream",
+            params={"voice": "nova", "tone": "calm", "emphasis": ["fish", "lake"]},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.content == b"ID3frame-1frame-2"
+    text, voice, instructions = requests[0]
+    assert (text, voice) == ("Hello", "nova")
+    assert "Tone: calm." in instructions and "fish, lake" in instructions
+
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["status"] == "completed"
+    assert segment["tts_voice"] == "nova"
+    assert segment["tts_result_file"] == f"{project_id}/output/tts_00m01s500ms.mp3"
+    result_path = test_settings.projects_dir / segment["tts_result_file"]
+    assert result_path.read_bytes() == b"ID3frame-1frame-2"
+    assert list(result_path.parent.iterdir()) == [result_path]
+
+
+@pytest.mark.asyncio
+async def test_stream_tts_provider_error_before_audio(async_client: AsyncClient):
+    _, segment_id = await _create_translated_segment(async_client)
+
+    async def failing_stream_tts(self: OpenAIService, *args: object) -> AsyncIterator[bytes]:
+        raise ExternalAPIError("Failed to generate TTS: boom")
+        yield b""
+
+    with patch.object(OpenAIService, "stream_tts", failing_stream_tts):
+        response = await async_client.post(
+            f"/api/segments/{segment_id}/tts/stream", json={"voice": "alloy"}
+        )
+
+    assert response.status_code == 502
+    segment = (await async_client.get(f"/api/segments/{segment_id}")).json()
+    assert segment["status"] == "error"
+    assert "boom" in segment["error_message"]
+
+
+@pytest.mark.asyncio
+async def test_stream_tts_stopped_early_keeps_previous_state(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    _, segment_id = await _create_translated_segment(async_client)
+
+    async def endless_audio() -> AsyncIterator[bytes]:
+        while True:
+            yield b"chunk"
+
+    openai = MagicMock(spec=OpenAIService)
+    openai.stream_tts.return_value = endless_audio()
+    service = SegmentService(
+        SegmentRepository(async_session), FFmpegService(test_settings), test_settings
+    )
+    segment = await service.get_by_id(segment_id)
+
+    stream = service.stream_tts(segment, voice="alloy", openai=openai)
+    assert await stream.__anext__() == b"chunk"
+    assert segment.status == SegmentStatus.GENERATING_TTS
+    await stream.aclose()
+
+    assert segment.status == SegmentStatus.CREATED
+    assert segment.tts_result_file is None
+    assert not any((test_settings.projects_dir / segment.project_id / "output").iterdir())
+
+
+@pytest.mark.asyncio
+async def test_generate_tts_reuses_cached_audio(
+    async_client: AsyncClient, test_settings: Settings, tmp_path: Path
+):
+    project_id, segment_id = await _create_translated_segment(async_client)
+    # Same text at another position
+    other_id = (
+        await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": 7.0, "end_time": 9.0},
+        )
+    ).json()["id"]
+    await async_client.put(
+        f"/api/segments/{other_id}/translation", json={"translated_text": "Hello"}
+    )
+    calls: list[str] = []
+
+    async def fake_generate_tts(
+        self: OpenAIService,
+        text: str,
+        voice: str,
+        output_path: Path,
+        instructions: Optional[str] = None,
+    ) -> Path:
+        calls.append(voice)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Replaced, never rewritten in place, like the real service does
+        tmp_path = output_path.with_suffix(".tmp")
+        tmp_path.write_bytes(f"ID3 {voice} {len(calls)}".encode())
+        tmp_path.replace(output_path)
+        return output_path
+
+    with patch.object(OpenAIService, "generate_tts", fake_generate_tts):
+        # A/B comparison: alloy, nova, then back to alloy
+        for segment, voice in [(segment_id, "alloy"), (segment_id, "nova"), (other_id, "alloy")]:
+            response = await async_client.post(
+                f"/api/segments/{segment}/generate-tts", json={"voice": voice}
+            )
+            assert response.json()["status"] == "completed"
+        assert calls == ["alloy", "nova"]
+
+        result = (await async_client.get(f"/api/segments/{other_id}")).json()["tts_result_file"]
+        assert (test_settings.projects_dir / result).read_bytes() == b"ID3 alloy 1"
+
+        response = await async_client.post(
+            f"/api/segments/{other_id}/generate-tts", json={"voice": "alloy", "force": True}
+        )
+        assert calls == ["alloy", "nova", "alloy"]
+        assert (test_settings.projects_dir / result).read_bytes() == b"ID3 alloy 3"
+
+    # Custom voices are identified by their file content
+    cache = TTSCache(test_settings)
+    voice_file = tmp_path / "voice.wav"
+    voice_file.write_bytes(b"RIFF 1")
+    inputs = TTSInputs("chatterbox", "custom:v1:Me", custom_voice_path=str(voice_file))
+    key = cache.key_for(inputs, "Hello")
+    voice_file.write_bytes(b"RIFF 22")
+    assert cache.key_for(inputs, "Hello") != key
+
+
+@pytest.mark.asyncio
+async def test_analyze_project(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    test_settings.analysis_concurrency = 2
+    await async_client.put("/api/settings", json={"openai_api_key": "sk-test-key-1234"})
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    segment_ids = []
+    for i in range(6):
+        response = await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": float(i), "end_time": i + 0.5},
+        )
+        segment_ids.append(response.json()["id"])
+
+    # 0-3 are extracted, 3 fails, 4 is already analyzed and 5 has no audio
+    for i, segment_id in enumerate(segment_ids[:5]):
+        segment = await async_session.get(Segment, segment_id)
+        segment.audio_file = f"{project_id}/segments/segment_{i}.wav"
+        segment.status = SegmentStatus.EXTRACTED
+    done = await async_session.get(Segment, segment_ids[4])
+    done.status = SegmentStatus.ANALYZED
+    done.analysis_json = {"transcription": "done"}
+    await async_session.flush()
+
+    services: set[int] = set()
+    active = 0
+    peak = 0
+
+    async def fake_analyze_audio(self: OpenAIService, audio_path: Path) -> dict:
+        nonlocal active, peak
+        services.add(id(self))
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if audio_path.name == "segment_3.wav":
+            raise ExternalAPIError("rate limited")
+        return {"transcription": audio_path.stem, "translated_text": f"EN {audio_path.stem}"}
+
+    with patch.object(OpenAIService, "analyze_audio", fake_analyze_audio):
+        response = await async_client.post(f"/api/projects/{project_id}/analyze")
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["total"], summary["analyzed"], summary["failed"], summary["skipped"]) == (
+        6,
+        3,
+        2,
+        1,
+    )
+    failures = {f["segment_id"]: f["error"] for f in summary["failures"]}
+    assert failures == {
+        segment_ids[3]: "502: rate limited",
+        segment_ids[5]: "500: Segment has no audio file. Extract audio first.",
+    }
+    assert [s["id"] for s in summary["segments"]] == segment_ids[:4] + [segment_ids[5]]
+    assert peak == 2
+    assert len(services) == 1
+
+    segments = (await async_client.get(f"/api/projects/{project_id}/segments")).json()
+    assert [s["status"] for s in segments] == [
+        "analyzed",
+        "analyzed",
+        "analyzed",
+        "error",
+        "analyzed",
+        "error",
+    ]
+    assert segments[1]["translated_text"] == "EN segment_1"
+    assert segments[4]["analysis_json"] == {"transcription": "done"}
+
+
+@pytest.mark.asyncio
+async def test_analyze_segment_reuses_cached_analysis(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    await async_client.put("/api/settings", json={"openai_api_key": "sk-test-key-1234"})
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+    segment_ids = []
+    for i in range(2):
+        audio_file = f"{project_id}/segments/segment_{i}.wav"
+        audio_path = test_settings.projects_dir / audio_file
+        audio_path.parent.mkdir(parents=True, exist_ok=True)
+        audio_path.write_bytes(b"RIFF same audio")
+        segment_id = (
+            await async_client.post(
+                f"/api/projects/{project_id}/segments",
+                json={"start_time": float(i), "end_time": i + 0.5},
+            )
+        ).json()["id"]
+        segment = await async_session.get(Segment, segment_id)
+        segment.audio_file = audio_file
+        segment.status = SegmentStatus.EXTRACTED
+        segment_ids.append(segment_id)
+    await async_session.flush()
+
+    calls = []
+
+    async def fake_analyze_audio(self: OpenAIService, audio_path: Path) -> dict:
+        calls.append(audio_path.name)
+        return {"transcription": "Hola", "translated_text": f"Hello {len(calls)}"}
+
+    with patch.object(OpenAIService, "analyze_audio", fake_analyze_audio):
+        # The second segment has the same audio and prompts
+        for segment_id in segment_ids:
+            response = await async_client.post(f"/api/segments/{segment_id}/analyze")
+            assert response.json()["translated_text"] == "Hello 1"
+        assert calls == ["segment_0.wav"]
+
+        response = await async_client.post(
+            f"/api/segments/{segment_ids[1]}/analyze", params={"force": "true"}
+        )
+        assert response.json()["translated_text"] == "Hello 2"
+
+        # Different prompts miss the cache
+        await async_client.put("/api/settings", json={"context_description": "A river"})
+        response = await async_client.post(f"/api/segments/{segment_ids[0]}/analyze")
+        assert response.json()["translated_text"] == "Hello 3"
+
+    # Beyond the size limit, the least recently used entries are dropped
+    service = SegmentService(
+        SegmentRepository(async_session), FFmpegService(test_settings), test_settings
+    )
+    cache = service.analysis_cache
+    assert await cache.evict(max_bytes=60) == 1
+    assert await cache.evict(max_bytes=0) == 1
+    assert await cache.evict(max_bytes=0) == 0
+
+
+@pytest.mark.asyncio
+async def test_analyze_project_requires_api_key(async_client: AsyncClient):
+    project_id = (await async_client.post("/api/projects", json={"name": "P"})).json()["id"]
+
+    response = await async_client.post(f"/api/projects/{project_id}/analyze")
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "OpenAI API key not configured in settings"
+
+
+@pytest.mark.asyncio
+async def test_generate_project_tts(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    test_settings.openai_tts_concurrency = 2
+    await async_client.put("/api/settings", json={"openai_api_key": "sk-test-key-1234"})
+    project_id = (
+        await async_client.post("/api/projects", json={"name": "P", "target_language": "German"})
+    ).json()["id"]
+    segment_ids = []
+    for i in range(5):
+        response = await async_client.post(
+            f"/api/projects/{project_id}/segments",
+            json={"start_time": float(i), "end_time": i + 0.5},
+        )
+        segment_ids.append(response.json()["id"])
+
+    # 0-3 are translated, 1 has an analysis and voice, 3 fails, 4 has no text
+    for i, segment_id in enumerate(segment_ids[:4]):
+        segment = await async_session.get(Segment, segment_id)
+        segment.translated_text = f"Text {i}"
+    analyzed = await async_session.get(Segment, segment_ids[1])
+    analyzed.analysis_json = {"tone": "calm", "emphasis": ["fish"]}
+    analyzed.tts_voice = "nova"
+    await async_session.flush()
+
+    requests: dict[str, tuple[str, Optional[str]]] = {}
+    active = 0
+    peak = 0
+
+    async def fake_generate_tts(
+        self: OpenAIService,
+        text: str,
+        voice: str,
+        output_path: Path,
+        instructions: Optional[str] = None,
+    ) -> Path:
+        nonlocal active, peak
+        requests[text] = (voice, instructions)
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if text == "Text 3":
+            raise ExternalAPIError("rate limited")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(b"ID3")
+        return output_path
+
+    with patch.object(OpenAIService, "generate_tts", fake_generate_tts):
+        response = await async_client.post(f"/api/projects/{project_id}/generate-tts", json={})
+
+        assert response.status_code == 200
+        summary = response.json()
+        assert [summary[k] for k in ("total", "generated", "failed", "unchanged", "skipped")] == [
+            5,
+            3,
+            1,
+            0,
+            1,
+        ]
+        assert summary["failures"] == [{"segment_id": segment_ids[3], "error": "502: rate limited"}]
+        assert [s["id"] for s in summary["segments"]] == segment_ids[:4]
+        assert peak == 2
+        assert requests["Text 0"] == ("alloy", "Speak in German.")
+        assert requests["Text 1"] == (
+            "nova",
+            "Speak in German. Tone: calm. Emphasize these words: fish.",
+        )
+
+        segments = (await async_client.get(f"/api/projects/{project_id}/segments")).json()
+        assert [s["status"] for s in segments[:4]] == ["completed"] * 3 + ["error"]
+        assert segments[1]["tts_result_file"] == f"{project_id}/output/tts_00m01s000ms.mp3"
+
+        # Only the failed segment and the one whose text changed are generated again
+        await async_client.put(
+            f"/api/segments/{segment_ids[0]}/translation", json={"translated_text": "New 0"}
+        )
+        requests.clear()
+        response = await async_client.post(f"/api/projects/{project_id}/generate-tts", json={})
+
+        summary = response.json()
+        assert (summary["generated"], summary["failed"], summary["unchanged"]) == (1, 1, 2)
+        assert sorted(requests) == ["New 0", "Text 3"]
+
+        # force regenerates up-to-date segments too
+        requests.clear()
+        response = await async_client.post(
+            f"/api/projects/{project_id}/generate-tts", json={"force": True}
+        )
+
+        assert response.json()["unchanged"] == 0
+        assert len(requests) == 4
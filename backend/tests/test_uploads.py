@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import Settings
+from app.services.file_service import FileService
+from app.services.upload_service import UploadService
+from app.utils.exceptions import NotFoundError
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@pytest.fixture
+def video_bytes() -> bytes:
+    return os.urandom(2 * CHUNK_SIZE + 12345)
+
+
+@pytest.fixture
+async def project_id(async_client: AsyncClient, test_settings: Settings) -> str:
+    test_settings.upload_chunk_size_mb = 1
+    response = await async_client.post("/api/projects", json={"name": "Test Project"})
+    return response.json()["id"]
+
+
+async def start_upload(async_client: AsyncClient, project_id: str, data: bytes) -> dict:
+    response = await async_client.post(
+        f"/api/projects/{project_id}/uploads",
+        json={"filename": "movie.mov", "size": len(data)},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def put_chunk(
+    async_client: AsyncClient, project_id: str, upload_id: str, index: int, data: bytes
+) -> int:
+    chunk = data[index * CHUNK_SIZE : (index + 1) * CHUNK_SIZE]
+    response = await async_client.put(
+        f"/api/projects/{project_id}/uploads/{upload_id}/chunks/{index}", content=chunk
+    )
+    return response.status_code
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload(
+    async_client: AsyncClient, test_settings: Settings, project_id: str, video_bytes: bytes
+):
+    upload = await start_upload(async_client, project_id, video_bytes)
+    assert upload["chunk_size"] == CHUNK_SIZE
+    assert upload["chunk_count"] == 3
+    assert upload["received_chunks"] == []
+
+    statuses = await asyncio.gather(
+        *(put_chunk(async_client, project_id, upload["id"], i, video_bytes) for i in (2, 0, 1))
+    )
+    assert statuses == [204, 204, 204]
+
+    response = await async_client.post(
+        f"/api/projects/{project_id}/uploads/{upload['id']}/commit",
+        json={"sha256": hashlib.sha256(video_bytes).hexdigest()},
+    )
+
+    assert response.status_code == 200
+    source_video = response.json()["source_video"]
+    assert source_video == f"{project_id}/source/video.mov"
+    assert (test_settings.projects_dir / source_video).read_bytes() == video_bytes
+    assert not list((test_settings.projects_dir / project_id / "uploads").iterdir())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_commits(
+    async_client: AsyncClient, test_settings: Settings, project_id: str, video_bytes: bytes
+):
+    upload = await start_upload(async_client, project_id, video_bytes)
+    for i in range(3):
+        await put_chunk(async_client, project_id, upload["id"], i, video_bytes)
+    service = UploadService(test_settings, FileService(test_settings))
+    sha256 = hashlib.sha256(video_bytes).hexdigest()
+
+    results = await asyncio.gather(
+        *(service.commit(project_id, upload["id"], sha256) for _ in range(2)),
+        return_exceptions=True,
+    )
+
+    assert results[0] == f"{project_id}/source/video.mov"
+    assert isinstance(results[1], NotFoundError)
+    assert (test_settings.projects_dir / results[0]).read_bytes() == video_bytes
+
+
+@pytest.mark.asyncio
+async def test_resume_reports_received_chunks(
+    async_client: AsyncClient, project_id: str, video_bytes: bytes
+):
+    upload = await start_upload(async_client, project_id, video_bytes)
+    await put_chunk(async_client, project_id, upload["id"], 1, video_bytes)
+
+    response = await async_client.get(f"/api/projects/{project_id}/uploads/{upload['id']}")
+    assert response.json()["received_chunks"] == [1]
+
+    response = await async_client.post(
+        f"/api/projects/{project_id}/uploads/{upload['id']}/commit",
+        json={"sha256": hashlib.sha256(video_bytes).hexdigest()},
+    )
+    assert response.status_code == 400
+    assert "2 chunks missing" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_rejects_wrong_chunk_size(
+    async_client: AsyncClient, project_id: str, video_bytes: bytes
+):
+    upload = await start_upload(async_client, project_id, video_bytes)
+    url = f"/api/projects/{project_id}/uploads/{upload['id']}/chunks"
+
+    assert (await async_client.put(f"{url}/0", content=b"short")).status_code == 400
+    assert (await async_client.put(f"{url}/2", content=b"x" * CHUNK_SIZE)).status_code == 400
+    assert (await async_client.put(f"{url}/3", content=b"x")).status_code == 400
+
+    response = await async_client.get(f"/api/projects/{project_id}/uploads/{upload['id']}")
+    assert response.json()["received_chunks"] == []
+
+
+@pytest.mark.asyncio
+async def test_commit_rejects_checksum_mismatch(
+    async_client: AsyncClient, project_id: str, video_bytes: bytes
+):
+    upload = await start_upload(async_client, project_id, video_bytes)
+    for index in range(upload["chunk_count"]):
+        await put_chunk(async_client, project_id, upload["id"], index, video_bytes)
+
+    response = await async_client.post(
+        f"/api/projects/{project_id}/uploads/{upload['id']}/commit",
+        json={"sha256": hashlib.sha256(b"something else").hexdigest()},
+    )
+
+    assert response.status_code == 400
+    project = (await async_client.get(f"/api/projects/{project_id}")).json()
+    assert project["source_video"] is None
+
+
+@pytest.mark.asyncio
+async def test_create_enforces_size_limit(
+    async_client: AsyncClient, test_settings: Settings, project_id: str
+):
+    response = await async_client.post(
+        f"/api/projects/{project_id}/uploads",
+        json={"filename": "movie.mp4", "size": test_settings.max_upload_size_bytes + 1},
+    )
+    assert response.status_code == 400
+
+    response = await async_client.post(
+        f"/api/projects/{project_id}/uploads",
+        json={"filename": "movie.txt", "size": 100},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_abort_upload(
+    async_client: AsyncClient, test_settings: Settings, project_id: str, video_bytes: bytes
+):
+    upload = await start_upload(async_client, project_id, video_bytes)
+
+    response = await async_client.delete(f"/api/projects/{project_id}/uploads/{upload['id']}")
+    assert response.status_code == 204
+
+    response = await async_client.get(f"/api/projects/{project_id}/uploads/{upload['id']}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_invalid_upload_id(async_client: AsyncClient, project_id: str):
+    response = await async_client.get(f"/api/projects/{project_id}/uploads/..%2F..%2Fsource")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_capped_and_expire(
+    async_client: AsyncClient, test_settings: Settings, project_id: str, video_bytes: bytes
+):
+    test_settings.upload_max_sessions_per_project = 2
+    uploads = [await start_upload(async_client, project_id, video_bytes) for _ in range(2)]
+    uploads_path = test_settings.projects_dir / project_id / "uploads"
+    # The first one stays active, so the second is the least recently used
+    os.utime(uploads_path / uploads[1]["id"] / "chunks", (0, 1))
+    await put_chunk(async_client, project_id, uploads[0]["id"], 0, video_bytes)
+
+    third = await start_upload(async_client, project_id, video_bytes)
+
+    assert {path.name for path in uploads_path.iterdir()} == {uploads[0]["id"], third["id"]}
+    # Space is only taken by the chunks that arrived
+    data_path = uploads_path / uploads[0]["id"] / "data"
+    assert data_path.stat().st_size == len(video_bytes)
+    assert data_path.stat().st_blocks * 512 < 2 * CHUNK_SIZE
+
+    os.utime(uploads_path / third["id"] / "chunks", (0, 1))
+    service = UploadService(test_settings, FileService(test_settings))
+    assert service.sweep_stale() == 1
+    assert [path.name for path in uploads_path.iterdir()] == [uploads[0]["id"]]
@@ -0,0 +1,146 @@
+import struct
+import wave
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.services.wav_service import WavService
+from app.utils.exceptions import ProcessingError
+
+
+def write_wav(
+    path: Path,
+    seconds: float,
+    sample_rate: int = 44100,
+    channels: int = 2,
+) -> bytes:
+    """Write a WAV file whose frames count upwards and return the raw frames."""
+    frame_count = int(seconds * sample_rate)
+    frames = b"".join(struct.pack("<h", i % 32768) * channels for i in range(frame_count))
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(frames)
+    return frames
+
+
+@pytest.fixture
+def wav_service() -> WavService:
+    return WavService()
+
+
+@pytest.fixture
+def project_audio(tmp_path: Path) -> tuple[Path, bytes]:
+    path = tmp_path / "full_audio.wav"
+    frames = write_wav(path, 2.0)
+    return path, frames
+
+
+class TestWavFormat:
+    def test_read_format(self, wav_service: WavService, project_audio: tuple[Path, bytes]):
+        path, frames = project_audio
+
+        wav_format = wav_service.read_format(path)
+
+        assert wav_format is not None
+        assert wav_format.channels == 2
+        assert wav_format.sample_rate == 44100
+        assert wav_format.bits_per_sample == 16
+        assert wav_format.data_offset == 44
+        assert wav_format.data_size == len(frames)
+
+    def test_read_format_skips_extra_chunks(self, wav_service: WavService, tmp_path: Path):
+        path = tmp_path / "with_list.wav"
+        write_wav(path, 0.5)
+        raw = path.read_bytes()
+        # Insert a LIST chunk with odd size between fmt and data, as FFmpeg does
+        list_chunk = b"LIST" + struct.pack("<I", 5) + b"INFO1" + b"\x00"
+        patched = raw[:36] + list_chunk + raw[36:]
+        patched = patched[:4] + struct.pack("<I", len(patched) - 8) + patched[8:]
+        path.write_bytes(patched)
+
+        wav_format = wav_service.read_format(path)
+
+        assert wav_format is not None
+        assert wav_format.data_offset == 44 + len(list_chunk)
+
+    def test_read_format_not_wav(self, wav_service: WavService, tmp_path: Path):
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(b"ID3" + b"\x00" * 100)
+
+        assert wav_service.read_format(path) is None
+
+    def test_can_slice_requires_segment_format(self, wav_service: WavService, tmp_path: Path):
+        mono = tmp_path / "mono.wav"
+        write_wav(mono, 0.5, channels=1)
+        low_rate = tmp_path / "low_rate.wav"
+        write_wav(low_rate, 0.5, sample_rate=22050)
+
+        assert not wav_service.can_slice(mono)
+        assert not wav_service.can_slice(low_rate)
+        assert not wav_service.can_slice(tmp_path / "missing.wav")
+
+
+class TestWavSlicing:
+    @pytest.mark.asyncio
+    async def test_extract_segment(
+        self, wav_service: WavService, project_audio: tuple[Path, bytes], tmp_path: Path
+    ):
+        path, frames = project_audio
+        output_path = tmp_path / "segments" / "segment.wav"
+
+        result = await wav_service.extract_segment(path, output_path, 0.5, 1.5)
+
+        assert result == output_path
+        with wave.open(str(output_path), "rb") as f:
+            assert f.getnchannels() == 2
+            assert f.getframerate() == 44100
+            assert f.getnframes() == 44100
+            assert f.readframes(f.getnframes()) == frames[22050 * 4 : 66150 * 4]
+
+    @pytest.mark.asyncio
+    async def test_extract_segment_clamped_to_end(
+        self, wav_service: WavService, project_audio: tuple[Path, bytes], tmp_path: Path
+    ):
+        path, frames = project_audio
+        output_path = tmp_path / "segment.wav"
+
+        await wav_service.extract_segment(path, output_path, 1.5, 5.0)
+
+        with wave.open(str(output_path), "rb") as f:
+            assert f.readframes(f.getnframes()) == frames[66150 * 4 :]
+
+    @pytest.mark.asyncio
+    async def test_extract_segments_without_copy_file_range(
+        self, wav_service: WavService, project_audio: tuple[Path, bytes], tmp_path: Path
+    ):
+        path, frames = project_audio
+        segments = [(tmp_path / "a.wav", 0.0, 1.0), (tmp_path / "b.wav", 1.0, 2.0)]
+
+        with patch("os.copy_file_range", side_effect=OSError(18, "Invalid cross-device link")):
+            await wav_service.extract_segments(path, segments)
+
+        with wave.open(str(tmp_path / "a.wav"), "rb") as f:
+            assert f.readframes(f.getnframes()) == frames[: 44100 * 4]
+        with wave.open(str(tmp_path / "b.wav"), "rb") as f:
+            assert f.readframes(f.getnframes()) == frames[44100 * 4 :]
+
+    @pytest.mark.asyncio
+    async def test_extract_segment_invalid_times(
+        self, wav_service: WavService, project_audio: tuple[Path, bytes], tmp_path: Path
+    ):
+        path, _ = project_audio
+
+        with pytest.raises(ProcessingError, match="End time must be greater"):
+            await wav_service.extract_segment(path, tmp_path / "segment.wav", 1.5, 0.5)
+        with pytest.raises(ProcessingError, match="Start time cannot be negative"):
+            await wav_service.extract_segment(path, tmp_path / "segment.wav", -1.0, 0.5)
+
+    @pytest.mark.asyncio
+    async def test_extract_segment_file_not_found(self, wav_service: WavService, tmp_path: Path):
+        with pytest.raises(ProcessingError, match="Audio file not found"):
+            await wav_service.extract_segment(
+                tmp_path / "missing.wav", tmp_path / "segment.wav", 0.0, 1.0
+            )
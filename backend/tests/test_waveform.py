@@ -0,0 +1,184 @@
+import asyncio
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.models import Project
+from app.services.waveform_service import PEAK_LEVELS, WaveformService
+from app.utils.exceptions import ProcessingError
+
+
+def write_wav(path: Path, samples: np.ndarray, sample_rate: int = 44100) -> None:
+    """Write (frames, channels) int16 samples as a PCM WAV file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.astype("<i2").tobytes())
+
+
+@pytest.fixture
+def waveform_service() -> WaveformService:
+    return WaveformService()
+
+
+@pytest.fixture
+def ramp_audio(tmp_path: Path) -> tuple[Path, np.ndarray]:
+    """Two seconds of stereo audio with distinct values in each channel."""
+    frames = np.arange(88200, dtype=np.int64)
+    samples = np.stack([frames % 30000, -(frames % 20000)], axis=1).astype(np.int16)
+    path = tmp_path / "audio" / "full_audio.wav"
+    write_wav(path, samples)
+    return path, samples
+
+
+class TestWaveformService:
+    @pytest.mark.asyncio
+    async def test_generate_peaks_writes_all_levels(
+        self, waveform_service: WaveformService, ramp_audio: tuple[Path, np.ndarray]
+    ):
+        path, samples = ramp_audio
+
+        peaks_dir = await waveform_service.generate_peaks(path)
+
+        assert peaks_dir == path.parent / "full_audio_peaks"
+        for spp in PEAK_LEVELS:
+            level = np.load(peaks_dir / f"{spp}.npy")
+            assert level.shape == (-(-len(samples) // spp), 2)
+            assert level.dtype == np.int16
+
+    @pytest.mark.asyncio
+    async def test_peaks_match_samples(
+        self, waveform_service: WaveformService, ramp_audio: tuple[Path, np.ndarray]
+    ):
+        path, samples = ramp_audio
+        peaks_dir = await waveform_service.generate_peaks(path)
+
+        for spp in PEAK_LEVELS:
+            level = np.load(peaks_dir / f"{spp}.npy")
+            for i in (0, len(level) // 2, len(level) - 1):
+                block = samples[i * spp : (i + 1) * spp]
+                assert level[i, 0] == block.min()
+                assert level[i, 1] == block.max()
+
+    @pytest.mark.asyncio
+    async def test_get_peaks_window(
+        self, waveform_service: WaveformService, ramp_audio: tuple[Path, np.ndarray]
+    ):
+        path, samples = ramp_audio
+
+        # Peaks are built lazily when missing
+        result = await waveform_service.get_peaks(
+            path, start_time=0.5, end_time=1.0, samples_per_peak=1024
+        )
+
+        assert result.samples_per_peak == 1024
+        assert result.sample_rate == 44100
+        assert result.duration == pytest.approx(2.0)
+        first = 22050 // 1024
+        assert result.start_time == pytest.approx(first * 1024 / 44100)
+        assert result.length == -(-44100 // 1024) - first
+        assert len(result.data) == 2 * result.length
+        block = samples[first * 1024 : (first + 1) * 1024]
+        assert result.data[:2] == [block.min(), block.max()]
+
+    @pytest.mark.asyncio
+    async def test_get_peaks_picks_closest_level(
+        self, waveform_service: WaveformService, ramp_audio: tuple[Path, np.ndarray]
+    ):
+        path, _ = ramp_audio
+
+        result = await waveform_service.get_peaks(path, samples_per_peak=3000)
+        assert result.samples_per_peak == 1024
+
+        result = await waveform_service.get_peaks(path, samples_per_peak=1)
+        assert result.samples_per_peak == PEAK_LEVELS[0]
+
+    @pytest.mark.asyncio
+    async def test_get_peaks_rebuilds_for_replaced_audio(
+        self, waveform_service: WaveformService, ramp_audio: tuple[Path, np.ndarray]
+    ):
+        path, _ = ramp_audio
+        await waveform_service.get_peaks(path)
+
+        # Replaced the way extraction does it, without regenerating peaks
+        replacement = path.with_name("new.wav")
+        write_wav(replacement, np.full((44100, 2), 1000, dtype=np.int16))
+        replacement.replace(path)
+
+        result = await waveform_service.get_peaks(path)
+
+        assert result.duration == pytest.approx(1.0)
+        assert set(result.data) == {1000}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_generation(
+        self, waveform_service: WaveformService, ramp_audio: tuple[Path, np.ndarray]
+    ):
+        path, samples = ramp_audio
+
+        results = await asyncio.gather(*(waveform_service.generate_peaks(path) for _ in range(4)))
+
+        peaks_dir = results[0]
+        assert not list(peaks_dir.glob("*.tmp"))
+        level = np.load(peaks_dir / f"{PEAK_LEVELS[0]}.npy")
+        assert level.shape == (-(-len(samples) // PEAK_LEVELS[0]), 2)
+
+    @pytest.mark.asyncio
+    async def test_get_peaks_invalid_window(
+        self, waveform_service: WaveformService, ramp_audio: tuple[Path, np.ndarray]
+    ):
+        path, _ = ramp_audio
+
+        with pytest.raises(ProcessingError, match="End time must be greater"):
+            await waveform_service.get_peaks(path, start_time=1.0, end_time=0.5)
+
+    @pytest.mark.asyncio
+    async def test_generate_peaks_rejects_non_wav(
+        self, waveform_service: WaveformService, tmp_path: Path
+    ):
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(b"ID3" + b"\x00" * 100)
+
+        with pytest.raises(ProcessingError, match="16-bit PCM"):
+            await waveform_service.generate_peaks(path)
+
+
+@pytest.mark.asyncio
+async def test_peaks_endpoint(
+    async_client: AsyncClient, async_session: AsyncSession, test_settings: Settings
+):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+    write_wav(
+        test_settings.projects_dir / project_id / "audio" / "full_audio.wav",
+        np.zeros((44100, 2), dtype=np.int16),
+    )
+    project = await async_session.get(Project, project_id)
+    project.extracted_audio = f"{project_id}/audio/full_audio.wav"
+    await async_session.flush()
+
+    response = await async_client.get(
+        f"/api/files/{project_id}/peaks", params={"start": 0, "samples_per_peak": 4096}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["samples_per_peak"] == 4096
+    assert data["length"] == -(-44100 // 4096)
+    assert set(data["data"]) == {0}
+
+
+@pytest.mark.asyncio
+async def test_peaks_endpoint_requires_audio(async_client: AsyncClient):
+    project_resp = await async_client.post("/api/projects", json={"name": "Test Project"})
+    project_id = project_resp.json()["id"]
+
+    response = await async_client.get(f"/api/files/{project_id}/peaks")
+    assert response.status_code == 500
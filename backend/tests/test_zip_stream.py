@@ -0,0 +1,58 @@
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from app.utils.zip_stream import ZipStream
+
+
+async def collect(archive: ZipStream) -> bytes:
+    return b"".join([chunk async for chunk in archive])
+
+
+@pytest.fixture
+def audio_files(tmp_path: Path) -> list[Path]:
+    paths = []
+    for name, size in (("b.mp3", 200_000), ("a.wav", 0), ("ü.mp3", 1234)):
+        path = tmp_path / name
+        path.write_bytes(bytes(i % 251 for i in range(size)))
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.asyncio
+async def test_archive_is_readable(audio_files: list[Path]):
+    archive = ZipStream([(path.name, path) for path in audio_files])
+
+    data = await collect(archive)
+
+    assert len(data) == archive.content_length
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["b.mp3", "a.wav", "ü.mp3"]
+        for info, path in zip(zf.infolist(), audio_files):
+            assert info.compress_type == zipfile.ZIP_STORED
+            assert zf.read(info) == path.read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_empty_archive():
+    archive = ZipStream([])
+
+    data = await collect(archive)
+
+    assert len(data) == archive.content_length
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.namelist() == []
+
+
+@pytest.mark.asyncio
+async def test_file_shrinking_during_stream_fails(tmp_path: Path):
+    path = tmp_path / "a.mp3"
+    path.write_bytes(b"x" * 1000)
+    archive = ZipStream([("a.mp3", path)])
+    path.write_bytes(b"x" * 10)
+
+    with pytest.raises(OSError, match="shrank"):
+        await collect(archive)
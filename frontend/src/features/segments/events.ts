@@ -0,0 +1,49 @@
+import { useQueryClient } from "@tanstack/react-query";
+import { useEffect } from "react";
+import { getApiBaseUrl } from "../../lib/api-client";
+import { useAuthStore } from "../../stores/authStore";
+import type { ProjectWithSegments, Segment } from "../../types";
+import { projectKeys } from "../projects/api";
+import { segmentKeys } from "./api";
+
+type SegmentDelta = Partial<Segment> & { segment_id: string };
+
+/**
+ * Keep a project's cached segments up to date from the server-sent change stream,
+ * so the editor does not have to poll while segments are processed.
+ */
+export function useProjectEvents(projectId: string | undefined) {
+  const queryClient = useQueryClient();
+  const token = useAuthStore((s) => s.token);
+
+  useEffect(() => {
+    if (!projectId || !token) return;
+
+    const source = new EventSource(`${getApiBaseUrl()}/projects/${projectId}/events?token=${token}`);
+
+    const reload = () => {
+      queryClient.invalidateQueries({ queryKey: projectKeys.detail(projectId) });
+      queryClient.invalidateQueries({ queryKey: segmentKeys.list(projectId) });
+    };
+
+    const applyUpdate = (event: MessageEvent<string>) => {
+      const { segment_id, ...changes } = JSON.parse(event.data) as SegmentDelta;
+      const patch = (segment: Segment) => (segment.id === segment_id ? { ...segment, ...changes } : segment);
+
+      queryClient.setQueryData<ProjectWithSegments>(projectKeys.detail(projectId), (project) =>
+        project ? { ...project, segments: project.segments.map(patch) } : project
+      );
+      queryClient.setQueryData<Segment[]>(segmentKeys.list(projectId), (segments) => segments?.map(patch));
+      queryClient.setQueryData<Segment>(segmentKeys.detail(segment_id), (segment) =>
+        segment ? patch(segment) : segment
+      );
+    };
+
+    source.addEventListener("updated", applyUpdate);
+    source.addEventListener("created", reload);
+    source.addEventListener("deleted", reload);
+    source.addEventListener("resync", reload);
+
+    return () => source.close();
+  }, [projectId, token, queryClient]);
+}
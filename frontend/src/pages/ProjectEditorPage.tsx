@@ -8,6 +8,7 @@ import { LanguageListbox } from "../components/ui/LanguageListbox";
 import { Spinner } from "../components/ui/Spinner";
 import { WaveformPlayer } from "../components/waveform/WaveformPlayer";
 import { useExtractAudio, useProject, useUpdateProject } from "../features/projects/api";
+import { useProjectEvents } from "../features/segments/events";
 import { fetchAuthenticatedAudio } from "../lib/api-client";
 import { buttonStyles, cn } from "../lib/styles";
 import { useEditorStore } from "../stores/editorStore";
@@ -16,6 +17,7 @@ import { SOURCE_LANGUAGES, SUPPORTED_LANGUAGES, TARGET_LANGUAGES } from "../type
 export function ProjectEditorPage() {
   const { projectId } = useParams<{ projectId: string }>();
   const { data: project, isLoading, error } = useProject(projectId!);
+  useProjectEvents(projectId);
   const setCurrentProjectId = useEditorStore((s) => s.setCurrentProjectId);
   const extractAudio = useExtractAudio();
   const hasTriggeredExtractionRef = useRef(false);
@@ -180,11 +180,13 @@ export interface AppSettings {
   context_description: string;
   tts_provider: TTSProvider;
   chatterbox_available: boolean;
+  chatterbox_checked_at: string | null;
 }
 
 export interface ChatterBoxHealth {
   available: boolean;
   url: string;
+  checked_at: string | null;
 }
 
 export interface UpdateSettingsRequest {